@@ -0,0 +1,175 @@
+"""
+IX-Vibe band analysis (v0.1)
+
+Purpose:
+- Band tables (max / RMS / energy per band) for SRS, acoustic and FRF curves, from four
+  coarse user bands up to 1/12-octave sets, for one curve or a whole stack of
+  runs x channels at once.
+
+Band sets:
+- User bands: "20-100,100-500,..." (half-open [f1, f2) as in the original SRS table)
+- Fractional octave: "octave", "1/3", "1/6", "1/12" (also "1/3-octave"). Base-10 exact
+  mid-band frequencies per ANSI S1.11 / IEC 61260: fm = 1000 * G^(x/b), G = 10^(3/10),
+  band edges fm * G^(+/-1/(2b)); x integer for odd b, half-integer for even b.
+
+Method:
+- Band edges are turned into index ranges once with searchsorted on the (ascending)
+  frequency array.
+- max:    np.maximum.reduceat over the edge indices, along the last axis
+- rms:    sqrt(mean(v^2)) over the bins in the band, np.add.reduceat of v^2
+- energy: integral of v over the band, sum(v * df) with df = np.gradient(freq), by
+  np.add.reduceat (band power when v is a PSD)
+- values may be (n,), (runs, n), (runs, channels, n), ...: every leading axis is kept.
+
+Notes:
+- Bands with no frequency bin are NaN (dropped from the delta tables).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+STATS = ("max", "rms", "energy")
+_G = 10.0 ** 0.3
+_FRACTION_RE = re.compile(r"^(?:1/(\d+)|octave)(?:[-_ ]?octave)?$", re.IGNORECASE)
+
+Curve = Tuple[np.ndarray, np.ndarray]
+
+
+@dataclass(frozen=True)
+class BandSet:
+    lower: np.ndarray
+    upper: np.ndarray
+    labels: Tuple[str, ...]
+
+    @property
+    def center(self) -> np.ndarray:
+        return np.sqrt(self.lower * self.upper)
+
+    def __len__(self) -> int:
+        return self.lower.size
+
+
+def _sig(x: float, digits: int = 4) -> float:
+    return float(f"{x:.{digits}g}")
+
+
+def user_bands(bands: Sequence[Tuple[float, float]]) -> BandSet:
+    edges = np.asarray(bands, dtype=float).reshape(-1, 2)
+    return BandSet(edges[:, 0], edges[:, 1], tuple(f"{f1:g}-{f2:g}" for f1, f2 in edges))
+
+
+def fractional_octave_bands(fraction: int, f_min: float, f_max: float) -> BandSet:
+    """1/fraction-octave bands (base 10) whose mid-band frequency lies in [f_min, f_max]."""
+    if fraction < 1:
+        raise ValueError(f"Band fraction must be >= 1, got {fraction}")
+    if not 0 < f_min < f_max:
+        raise ValueError(f"Need 0 < f_min < f_max, got {f_min}, {f_max}")
+    b = float(fraction)
+    offset = 0.0 if fraction % 2 else 0.5
+    x_lo = np.ceil(b * np.log(f_min / 1000.0) / np.log(_G) - offset)
+    x_hi = np.floor(b * np.log(f_max / 1000.0) / np.log(_G) - offset)
+    x = np.arange(x_lo, x_hi + 1) + offset
+    fm = 1000.0 * _G ** (x / b)
+    lower, upper = fm * _G ** (-0.5 / b), fm * _G ** (0.5 / b)
+    return BandSet(lower, upper, tuple(f"{_sig(lo):g}-{_sig(hi):g}" for lo, hi in zip(lower, upper)))
+
+
+def parse_bands(spec: str, f_min: Optional[float] = None, f_max: Optional[float] = None) -> BandSet:
+    """"1/3" / "octave" (needs the frequency range) or comma-separated "f1-f2" bands."""
+    m = _FRACTION_RE.match(spec.strip())
+    if m:
+        if f_min is None or f_max is None:
+            raise ValueError(f"Fractional-octave bands {spec!r} need a frequency range")
+        return fractional_octave_bands(int(m.group(1) or 1), f_min, f_max)
+    bands = []
+    for seg in spec.split(","):
+        seg = seg.strip()
+        if not seg:
+            continue
+        f1s, f2s = seg.split("-")
+        bands.append((float(f1s), float(f2s)))
+    return user_bands(bands)
+
+
+def band_indices(freq: np.ndarray, bands: BandSet) -> Tuple[np.ndarray, np.ndarray]:
+    """[lo, hi) bin ranges of every band on an ascending frequency array."""
+    return np.searchsorted(freq, bands.lower, side="left"), np.searchsorted(freq, bands.upper, side="left")
+
+
+def band_stats(freq: np.ndarray, values: np.ndarray, bands: BandSet, stats: Sequence[str] = STATS) -> Dict[str, np.ndarray]:
+    """Per-band statistics of values (..., n) on freq (n,); each result has shape (..., n_bands)."""
+    unknown = set(stats) - set(STATS)
+    if unknown:
+        raise ValueError(f"Unknown band statistics: {sorted(unknown)} (choose from {', '.join(STATS)})")
+    freq = np.asarray(freq, dtype=float)
+    values = np.asarray(values, dtype=float)
+    lo, hi = band_indices(freq, bands)
+    ok = hi > lo
+    lo_ok, hi_ok = lo[ok], hi[ok]
+    lead = values.shape[:-1]
+    out: Dict[str, np.ndarray] = {}
+
+    def _alloc() -> np.ndarray:
+        return np.full(lead + (len(bands),), np.nan)
+
+    if "max" in stats:
+        res = _alloc()
+        if lo_ok.size:
+            # Interleaved [lo, hi) starts; even slots are the bands. One extra column
+            # keeps hi == n a valid reduceat index.
+            starts = np.column_stack([lo_ok, hi_ok]).ravel()
+            padded = np.concatenate([values, values[..., -1:]], axis=-1)
+            res[..., ok] = np.maximum.reduceat(padded, starts, axis=-1)[..., ::2]
+        out["max"] = res
+
+    def _band_sums(v: np.ndarray) -> np.ndarray:
+        # Same interleaved reduceat as "max": each band is summed on its own, so a quiet
+        # band after a loud one keeps its digits (a global cumsum difference would not).
+        starts = np.column_stack([lo_ok, hi_ok]).ravel()
+        padded = np.concatenate([v, np.zeros(lead + (1,))], axis=-1)
+        return np.add.reduceat(padded, starts, axis=-1)[..., ::2]
+
+    if "rms" in stats:
+        res = _alloc()
+        res[..., ok] = np.sqrt(_band_sums(values * values) / (hi_ok - lo_ok))
+        out["rms"] = res
+    if "energy" in stats:
+        res = _alloc()
+        df = np.gradient(freq) if freq.size > 1 else np.ones_like(freq)
+        res[..., ok] = _band_sums(values * df)
+        out["energy"] = res
+    return out
+
+
+def _delta_pct(b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b != 0, (t / b - 1.0) * 100.0, np.nan)
+
+
+def band_table(bands: BandSet, baseline: Curve, treated: Curve, stats: Sequence[str] = STATS) -> pd.DataFrame:
+    """
+    Baseline-vs-treated band table: band_hz, center_hz, then per statistic
+    baseline_<s>, treated_<s>, delta_<s>, delta_<s>_percent. Empty bands are dropped.
+    """
+    sb = band_stats(baseline[0], baseline[1], bands, stats)
+    st = band_stats(treated[0], treated[1], bands, stats)
+    cols: Dict[str, np.ndarray] = {"band_hz": np.asarray(bands.labels, dtype=object), "center_hz": bands.center}
+    keep = np.ones(len(bands), dtype=bool)
+    for s in stats:
+        b, t = sb[s], st[s]
+        cols.update(
+            {
+                f"baseline_{s}": b,
+                f"treated_{s}": t,
+                f"delta_{s}": t - b,
+                f"delta_{s}_percent": _delta_pct(b, t),
+            }
+        )
+        keep &= ~(np.isnan(b) | np.isnan(t))
+    return pd.DataFrame(cols)[keep].reset_index(drop=True)
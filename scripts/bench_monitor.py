@@ -0,0 +1,132 @@
+"""
+IX-Vibe health monitor benchmark (v0.1)
+
+Purpose:
+- How many channels at what sample rate health_monitor.py sustains, on one core and
+  with the channels split across a worker pool.
+
+Method:
+- A signature is learned from a short synthetic baseline (noise + two tones) per case.
+- Each case feeds --duration_s of synthetic blocks straight into HealthMonitor.process
+  (no file / socket I/O) and records wall time and per-block processing time.
+- Worker pool: channels are split into W groups, each group monitored in its own
+  process on its own data (as it would be with one DAQ stream per worker); wall time is
+  the slowest worker's.
+
+Reported per case:
+- realtime_factor   seconds of data processed per wall-clock second (>= 1 keeps up)
+- block_ms_p99/max  processing time per block vs the block period
+- sustained         realtime_factor >= 1 and block_ms_max < block period
+
+Usage example:
+python scripts/bench_monitor.py --channels 4,16,64 --sample_rates 10240,51200 --workers 1,4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from bands import parse_bands
+from common_io import ensure_dir
+from health_monitor import HealthMonitor, learn_signature
+
+
+class _SyntheticSource:
+    def __init__(self, n_channels: int, fs: float, seconds: float, block_size: int, seed: int):
+        self.fs = fs
+        self.channels = [f"ch{i + 1}" for i in range(n_channels)]
+        self.n_blocks = max(1, int(seconds * fs) // block_size)
+        rng = np.random.default_rng(seed)
+        t = np.arange(block_size * 8) / fs
+        tones = np.sin(2 * np.pi * 0.05 * fs * t) + 0.5 * np.sin(2 * np.pi * 0.21 * fs * t)
+        pool = rng.standard_normal((n_channels, t.size)) + tones
+        self._blocks = [pool[:, i * block_size : (i + 1) * block_size] for i in range(8)]
+
+    def __iter__(self):
+        for i in range(self.n_blocks):
+            yield self._blocks[i % 8]
+
+
+def _run_case(n_channels: int, fs: float, seconds: float, block_size: int, nfft: int, bands: str, seed: int) -> dict:
+    base = _SyntheticSource(n_channels, fs, max(2.0 * nfft / fs, 1.0), block_size, seed)
+    sig = learn_signature(base, parse_bands(bands, fs / nfft, fs / 2.0), nfft)
+    monitor = HealthMonitor(sig, emit=lambda event: None)
+    source = _SyntheticSource(n_channels, fs, seconds, block_size, seed + 1)
+    t0 = time.perf_counter()
+    monitor.run(source)
+    wall = time.perf_counter() - t0
+    s = monitor.latency_summary()
+    return {"wall_s": wall, "data_s": source.n_blocks * block_size / fs, **s}
+
+
+def run_case(n_channels: int, fs: float, workers: int, seconds: float, block_size: int, nfft: int, bands: str) -> dict:
+    groups = [len(g) for g in np.array_split(np.arange(n_channels), min(workers, n_channels))]
+    if len(groups) == 1:
+        parts = [_run_case(n_channels, fs, seconds, block_size, nfft, bands, 0)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+            futures = [pool.submit(_run_case, g, fs, seconds, block_size, nfft, bands, i) for i, g in enumerate(groups)]
+            parts = [f.result() for f in futures]
+    wall = max(p["wall_s"] for p in parts)
+    block_period_ms = block_size / fs * 1e3
+    block_max = max(p["block_ms_max"] for p in parts)
+    rtf = parts[0]["data_s"] / wall
+    return {
+        "channels": n_channels,
+        "sample_rate_hz": fs,
+        "workers": len(groups),
+        "block_size": block_size,
+        "nfft": nfft,
+        "realtime_factor": rtf,
+        "channel_samples_per_s": n_channels * parts[0]["data_s"] * fs / wall,
+        "block_period_ms": block_period_ms,
+        "block_ms_p99": max(p["block_ms_p99"] for p in parts),
+        "block_ms_max": block_max,
+        "detection_delay_bound_s": parts[0]["detection_delay_bound_s"],
+        "sustained": bool(rtf >= 1.0 and block_max < block_period_ms),
+    }
+
+
+def _list(arg: str, cast=float) -> List:
+    return [cast(float(x)) for x in arg.split(",") if x.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Throughput / latency benchmark of the streaming health monitor.")
+    ap.add_argument("--channels", default="4,16,64", help="Comma-separated channel counts")
+    ap.add_argument("--sample_rates", default="10240,51200", help="Comma-separated sample rates (Hz)")
+    ap.add_argument("--workers", default="1", help="Comma-separated worker-pool sizes (channels split across them)")
+    ap.add_argument("--duration_s", type=float, default=5.0, help="Seconds of data per case")
+    ap.add_argument("--block_size", type=int, default=1024, help="Samples per block")
+    ap.add_argument("--nfft", type=int, default=4096, help="FFT frame length")
+    ap.add_argument("--bands", default="1/3", help="Band set")
+    ap.add_argument("--out", default="results/output/bench_monitor.json", help="JSON results path")
+    args = ap.parse_args(argv)
+
+    results = []
+    for fs in _list(args.sample_rates):
+        for n_ch in _list(args.channels, int):
+            for w in _list(args.workers, int):
+                r = run_case(n_ch, fs, w, args.duration_s, args.block_size, args.nfft, args.bands)
+                results.append(r)
+                print(
+                    f"[IX-Vibe] fs={fs:>8g} ch={n_ch:>4d} workers={r['workers']:>2d}  x{r['realtime_factor']:7.1f} realtime  "
+                    f"block p99 {r['block_ms_p99']:7.2f} ms / max {r['block_ms_max']:7.2f} ms "
+                    f"(period {r['block_period_ms']:.1f} ms)  {'sustained' if r['sustained'] else 'FALLS BEHIND'}"
+                )
+
+    ensure_dir(os.path.dirname(args.out) or ".")
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump({"cpus": os.cpu_count(), "results": results}, fh, indent=2)
+    print(f"[IX-Vibe] Wrote monitor benchmark: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
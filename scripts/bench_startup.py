@@ -0,0 +1,94 @@
+"""
+IX-Vibe CLI startup benchmark (v0.1)
+
+Purpose:
+- Keep `ixvibe` cheap to start: measure `ixvibe --help` against a bare interpreter
+  and fail (--check) if the overhead exceeds --target_ms.
+- Show what `ixvibe batch` saves: N small delta summaries as N interpreters vs one.
+
+Usage example:
+python scripts/bench_startup.py --repeat 7 --jobs 10 --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+IXVIBE = os.path.join(HERE, "ixvibe.py")
+
+
+def _wall(cmd: List[str], repeat: int) -> float:
+    """Median wall time (s) of a command over `repeat` runs (after one warm-up run)."""
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def _write_frf(path: str, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    f = np.linspace(10.0, 2000.0, 2000)
+    mag = sum(1.0 / np.abs(1.0 - (f / fn) ** 2 + 2j * 0.02 * f / fn) for fn in (150.0, 620.0, 1400.0))
+    mag = mag * (1.0 + 0.02 * rng.standard_normal(f.size))
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("freq_hz,mag\n")
+        fh.writelines(f"{a:.6f},{b:.6g}\n" for a, b in zip(f, mag))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Benchmark ixvibe startup and batch mode.")
+    ap.add_argument("--repeat", type=int, default=7, help="Timed runs per measurement (median reported)")
+    ap.add_argument("--jobs", type=int, default=10, help="Delta summaries for the batch comparison")
+    ap.add_argument("--target_ms", type=float, default=100.0, help="Allowed `ixvibe --help` overhead over bare python")
+    ap.add_argument("--check", action="store_true", help="Exit non-zero if the startup target is missed")
+    args = ap.parse_args(argv)
+
+    py = sys.executable
+    bare = _wall([py, "-c", "pass"], args.repeat)
+    cli = _wall([py, IXVIBE, "--help"], args.repeat)
+    sub = _wall([py, IXVIBE, "deltas", "--help"], args.repeat)
+    overhead_ms = (cli - bare) * 1e3
+    print(f"[IX-Vibe] python -c pass:        {bare * 1e3:7.1f} ms")
+    print(f"[IX-Vibe] ixvibe --help:         {cli * 1e3:7.1f} ms (overhead {overhead_ms:.1f} ms, target {args.target_ms:g} ms)")
+    print(f"[IX-Vibe] ixvibe deltas --help:  {sub * 1e3:7.1f} ms (numpy/pandas/scipy imported)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lines = []
+        for i in range(args.jobs):
+            b, t = os.path.join(tmp, f"b{i}.csv"), os.path.join(tmp, f"t{i}.csv")
+            _write_frf(b, 2 * i)
+            _write_frf(t, 2 * i + 1)
+            lines.append(f"deltas --baseline {b} --treated {t} --out {os.path.join(tmp, f'd{i}.csv')}")
+        jobfile = os.path.join(tmp, "jobs.txt")
+        with open(jobfile, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+
+        t0 = time.perf_counter()
+        for line in lines:
+            subprocess.run([py, IXVIBE, *line.split()], check=True, stdout=subprocess.DEVNULL)
+        separate = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        subprocess.run([py, IXVIBE, "batch", jobfile], check=True, stdout=subprocess.DEVNULL)
+        batched = time.perf_counter() - t0
+    print(f"[IX-Vibe] {args.jobs} delta jobs, one process each: {separate:6.2f} s")
+    print(f"[IX-Vibe] {args.jobs} delta jobs, ixvibe batch:     {batched:6.2f} s ({separate / batched:.1f}x)")
+
+    if args.check and overhead_ms > args.target_ms:
+        raise SystemExit(f"ixvibe startup overhead {overhead_ms:.1f} ms exceeds target {args.target_ms:g} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+IX-Vibe benchmark suite (v0.1)
+
+Purpose:
+- Time each spectrum-pipeline stage across size sweeps on synthetic data and record
+  throughput and peak memory in a JSON baseline.
+- Compare a new run against a saved baseline to catch performance regressions.
+
+Stages:
+- read       read_spectrum_csv on one file of N points (cache disabled)
+- aggregate  aggregate_spectra over R runs of N points on per-run jittered grids
+- agg_files  aggregate_files over the same R runs written as CSVs (parse + grid + fold)
+             (N * R <= --max_file_cells)
+- peaks      modal.detect_run_peaks + half_power_damping on an N-point dB curve
+- bands      bands.band_table (max, rms, energy) on N points
+- stats      bootstrap CI + permutation p-value (1000 each) for N metric columns, R vs R runs
+             (N <= --max_stats_columns)
+
+Measurements:
+- seconds:    best of at least --repeats wall-clock runs (small cases repeat for >= 0.2 s)
+- throughput: points processed per second (N, or N * R for aggregate / agg_files)
+- peak_mb:    tracemalloc peak during one extra run (numpy buffers are included)
+
+Usage example:
+python scripts/bench_suite.py --out results/output/bench_baseline.json
+python scripts/bench_suite.py --points 1000,10000,100000,1000000,10000000 --runs 3,30,500
+python scripts/bench_suite.py --compare results/output/bench_baseline.json --tolerance 0.25
+
+Notes:
+- Timings are machine-specific: compare baselines recorded on the same machine.
+- --out defaults to results/output/bench_results.json; record a baseline with an explicit
+  --out and compare later runs against it (--out must differ from --compare).
+- --max_cells skips aggregate cases with more than N * R points (memory guard);
+  --max_file_cells does the same for agg_files, whose CSVs are written per case.
+"""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ.pop("IXVIBE_CACHE_DIR", None)  # measure parsing, not cache hits
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from aggregate import aggregate_files, aggregate_spectra
+from bands import band_table, user_bands
+from common_io import ensure_dir, read_spectrum_csv
+from modal import detect_run_peaks, half_power_damping
+from significance import delta_significance
+from synth_data import modal_frf, random_modes, synth_frf
+
+BANDS = user_bands([(20.0, 100.0), (100.0, 500.0), (500.0, 2000.0), (2000.0, 5000.0)])
+
+
+def _int_list(arg: str) -> List[int]:
+    return [int(float(x)) for x in arg.split(",") if x.strip()]
+
+
+def _measure(fn: Callable[[], object], repeats: int, min_total_s: float = 0.2) -> Dict[str, float]:
+    # Small cases are repeated until min_total_s has elapsed, so their best time is stable.
+    best = np.inf
+    count, start = 0, time.perf_counter()
+    while count < repeats or (time.perf_counter() - start < min_total_s and count < 1000):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+        count += 1
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_mb": peak / 1e6}
+
+
+class _Data:
+    """Synthetic FRF curves shared by every stage (one set of modes per benchmark)."""
+
+    def __init__(self, seed: int):
+        self.rng = np.random.default_rng(seed)
+        self.modes = random_modes(12, 30.0, 4000.0, self.rng)
+        self.zeta = np.full(self.modes.size, 0.02)
+        self.gains = self.rng.uniform(0.5, 2.0, self.modes.size)
+
+    def freq(self, n: int) -> np.ndarray:
+        return np.linspace(10.0, 5000.0, n)
+
+    def mag(self, freq: np.ndarray) -> np.ndarray:
+        return np.abs(synth_frf(freq, self.modes, self.zeta, self.gains, 0.03, self.rng))
+
+    def runs(self, n: int, r: int) -> List[tuple]:
+        out = []
+        for _ in range(r):
+            f = np.sort(self.freq(n) * (1.0 + 1e-4 * self.rng.standard_normal()))  # jittered grid
+            out.append((f, np.abs(modal_frf(f, self.modes, self.zeta, self.gains))))
+        return out
+
+
+def _peaks(freq: np.ndarray, db: np.ndarray) -> pd.DataFrame:
+    """Peak picking + half-power damping, as plot_frf does on a dB curve."""
+    run_idx, bin_idx = detect_run_peaks(db, prominence=3.0)
+    return half_power_damping(freq, db, run_idx, bin_idx)
+
+
+def run_suite(
+    points: Sequence[int],
+    runs: Sequence[int],
+    repeats: int,
+    max_cells: float,
+    seed: int,
+    max_stats_columns: int = 10000,
+    max_file_cells: float = 5e6,
+) -> List[dict]:
+    data = _Data(seed)
+    results: List[dict] = []
+
+    def record(stage: str, n: int, r: int, m: Dict[str, float]) -> None:
+        row = {"stage": stage, "points": n, "runs": r, **m, "throughput": n * r / max(m["seconds"], 1e-12)}
+        results.append(row)
+        print(
+            f"[IX-Vibe] {stage:9s} N={n:>9d} R={r:>4d}  {m['seconds'] * 1e3:9.2f} ms  "
+            f"{row['throughput']:12.3g} pts/s  {m['peak_mb']:8.1f} MB"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in points:
+            f = data.freq(n)
+            v = data.mag(f)
+            path = os.path.join(tmp, f"frf_{n}.csv")
+            pd.DataFrame({"freq_hz": f, "mag": v}).to_csv(path, index=False)
+            record("read", n, 1, _measure(lambda: read_spectrum_csv(path), repeats))
+            os.remove(path)
+
+            db = 20.0 * np.log10(v)
+            record("peaks", n, 1, _measure(lambda: _peaks(f, db), repeats))
+            record("bands", n, 1, _measure(lambda: band_table(BANDS, (f, v), (f, 0.7 * v)), repeats))
+
+            for r in runs:
+                if n * r > max_cells:
+                    continue
+                spectra = data.runs(n, r)
+                # Bind spectra as a default: the closure must not refer to the name deleted below.
+                agg = _measure(lambda spectra=spectra: aggregate_spectra(spectra, max_points=n), repeats)
+                record("aggregate", n, r, agg)
+                if n * r <= max_file_cells:
+                    paths = [os.path.join(tmp, f"run_{n}_{i}.csv") for i in range(r)]
+                    for p, (fx, vx) in zip(paths, spectra):
+                        pd.DataFrame({"freq_hz": fx, "mag": vx}).to_csv(p, index=False)
+                    record("agg_files", n, r, _measure(lambda: aggregate_files(paths, max_points=n), repeats))
+                    for p in paths:
+                        os.remove(p)
+                del spectra
+
+                if n <= max_stats_columns:
+                    base = data.rng.standard_normal((r, n))
+                    treat = data.rng.standard_normal((r, n)) + 0.1
+                    record("stats", n, r, _measure(lambda: delta_significance(base, treat, 1000, 1000), repeats))
+    return results
+
+
+def compare(results: Sequence[dict], baseline: Sequence[dict], tolerance: float, slack_s: float = 0.002) -> List[str]:
+    """Cases slower than baseline by more than `tolerance` (fraction) and by more than slack_s."""
+    base = {(b["stage"], b["points"], b["runs"]): b for b in baseline}
+    slower = []
+    for r in results:
+        b = base.get((r["stage"], r["points"], r["runs"]))
+        if b is None:
+            continue
+        ratio = r["seconds"] / max(b["seconds"], 1e-12)
+        regressed = ratio > 1.0 + tolerance and r["seconds"] - b["seconds"] > slack_s
+        mark = "REGRESSION" if regressed else "ok"
+        print(f"[IX-Vibe] {r['stage']:9s} N={r['points']:>9d} R={r['runs']:>4d}  x{ratio:5.2f} vs baseline  {mark}")
+        if mark != "ok":
+            slower.append(f"{r['stage']} N={r['points']} R={r['runs']}: x{ratio:.2f}")
+    return slower
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Benchmark IX-Vibe pipeline stages across size sweeps.")
+    ap.add_argument("--points", default="1000,10000,100000,1000000", help="Comma-separated frequency point counts")
+    ap.add_argument("--runs", default="3,30,100", help="Comma-separated run counts (aggregate stage)")
+    ap.add_argument("--repeats", type=int, default=3, help="Timed repetitions (best is reported)")
+    ap.add_argument("--max_cells", type=float, default=2e7, help="Skip aggregate cases with more points x runs")
+    ap.add_argument("--max_stats_columns", type=int, default=10000, help="Largest N for the stats stage")
+    ap.add_argument("--max_file_cells", type=float, default=5e6, help="Skip agg_files cases with more points x runs")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed")
+    ap.add_argument("--out", default="results/output/bench_results.json", help="JSON results path")
+    ap.add_argument("--compare", default="", help="Baseline JSON to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown fraction before flagging")
+    ap.add_argument("--slack_ms", type=float, default=2.0, help="Ignore slowdowns smaller than this (timer noise)")
+    args = ap.parse_args(argv)
+    baseline = None
+    if args.compare:
+        if os.path.realpath(args.compare) == os.path.realpath(args.out):
+            raise ValueError(f"--out must differ from --compare (would overwrite the baseline): {args.out}")
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+
+    results = run_suite(
+        _int_list(args.points),
+        _int_list(args.runs),
+        args.repeats,
+        args.max_cells,
+        args.seed,
+        args.max_stats_columns,
+        args.max_file_cells,
+    )
+    report = {
+        "created_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "results": results,
+    }
+    ensure_dir(os.path.dirname(args.out) or ".")
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"[IX-Vibe] Wrote benchmark results: {args.out}")
+
+    if baseline is not None:
+        slower = compare(results, baseline, args.tolerance, slack_s=args.slack_ms / 1e3)
+        if slower:
+            raise SystemExit("Performance regressions:\n  " + "\n  ".join(slower))
+
+
+if __name__ == "__main__":
+    main()
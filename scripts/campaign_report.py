@@ -0,0 +1,633 @@
+"""
+IX-Vibe campaign report builder (v0.1)
+
+Purpose:
+- Fill in templates/analysis_summary.md for a whole campaign in one process, instead of by
+  hand from four separately invoked scripts that each re-load, re-grid and re-detect.
+- Render it as Markdown and / or self-contained HTML with plots and trace lines.
+
+Inputs:
+- tests/runs/<RUN_ID>/metadata.yml for every run (as run_campaign.py), raw spectrum CSVs
+  found through raw_data_files (run directory, then --data_dir).
+
+Method:
+- One ArtifactStore holds every intermediate product, keyed by its inputs: parsed spectra,
+  common grids, aggregates, baseline-vs-configuration stacks, peak and band tables. Each is
+  computed once on first use and shared by every later section that needs it: the delta
+  section re-uses the FRF section's parsed runs, the trade-off and conclusion sections
+  re-use the FRF / SRS / acoustic tables.
+- Per stage: FRF (dominant modes, peak dB, half-power zeta, mode shift), paired-run FRF
+  deltas (01 vs 01, ... as summarize_deltas.py), SRS (critical bands by baseline band
+  max), acoustic (band RMS), trade-offs (added mass, mode shifts, increases elsewhere)
+  and a bounded conclusion in the docs/01 section 4 wording.
+- All configurations of a stage are compared against the baseline on one grid
+  (compare_configs.py functions), so the baseline is aggregated once per stage and type.
+
+Outputs:
+- --out (Markdown) and/or the .html next to it (--format), plots under --plots_dir
+  (referenced from the Markdown, embedded as data URIs in the HTML)
+- "Build time" section: wall / CPU time, files and points per section, plus computed vs
+  re-used count and exclusive time per artifact kind, so large campaigns show where the
+  time goes. --perf also writes <out>.perf.json (instrument.py format).
+
+Notes:
+- Wording is limited to measured statements ("Measured FRF peak reduction of X dB at
+  Y Hz on configuration Z."); the report never claims more than the tables show.
+- Runs with missing metadata or raw files are listed under "Problems", not merged.
+
+Usage example:
+python scripts/campaign_report.py --runs_dir tests/runs --data_dir data/raw --out results/output/campaign_report.md
+"""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import argparse
+import base64
+import glob
+import html
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import yaml
+
+from aggregate import DEFAULT_MAX_POINTS, Aggregate, aggregate_spectra, common_grid, load_spectra
+from bands import BandSet, band_stats, parse_bands
+from common_io import TraceInfo, ensure_dir, trace_line
+from compare_configs import baseline_peaks, band_deltas, peak_deltas
+from decimate import minmax_envelope, pixel_columns
+from instrument import Instrumentation, add_perf_arguments
+from modal import half_power_damping
+from run_campaign import BASELINE_CONFIG, RunRecord, scan_runs
+
+Curve = Tuple[np.ndarray, np.ndarray]
+Block = Tuple[str, object]  # ("h1" | "h2" | "h3" | "p" | "list" | "table" | "image" | "trace", payload)
+
+
+class ArtifactStore:
+    """
+    In-process memo of intermediate products, keyed by kind and inputs.
+
+    stats[kind] counts computed / re-used artifacts and their exclusive build time (time
+    spent building nested artifacts, e.g. the spectra an aggregate needs, is booked to
+    their own kind).
+    """
+
+    def __init__(self, scale: str = "linear", max_points: int = DEFAULT_MAX_POINTS):
+        self.scale = scale
+        self.max_points = max_points
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"computed": 0, "reused": 0, "seconds": 0.0})
+        self._items: Dict[Tuple[str, Hashable], object] = {}
+        self._nested = 0.0
+
+    def get(self, kind: str, key: Hashable, build: Callable[[], object]):
+        k = (kind, key)
+        if k in self._items:
+            self.stats[kind]["reused"] += 1
+            return self._items[k]
+        outer, self._nested = self._nested, 0.0
+        t0 = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - t0
+        st = self.stats[kind]
+        st["computed"] += 1
+        st["seconds"] += elapsed - self._nested
+        self._nested = outer + elapsed
+        self._items[k] = value
+        return value
+
+    def spectrum(self, path: str) -> Curve:
+        return self.get("spectrum", path, lambda: load_spectra([path])[0])
+
+    def grid(self, paths: Sequence[str]) -> np.ndarray:
+        key = tuple(sorted(paths))
+        return self.get(
+            "grid",
+            key,
+            lambda: common_grid([self.spectrum(p) for p in key], scale=self.scale, max_points=self.max_points),
+        )
+
+    def aggregate(self, paths: Sequence[str], grid_paths: Sequence[str]) -> Aggregate:
+        key = (tuple(paths), tuple(sorted(grid_paths)))
+        return self.get(
+            "aggregate", key, lambda: aggregate_spectra([self.spectrum(p) for p in paths], grid=self.grid(grid_paths))
+        )
+
+    def bands(self, spec: str, f_lo: float, f_hi: float) -> BandSet:
+        return self.get("band_set", (spec, f_lo, f_hi), lambda: parse_bands(spec, f_lo, f_hi))
+
+
+class Stack:
+    """Baseline (row 0) and every configuration's mean on one grid."""
+
+    def __init__(
+        self, store: ArtifactStore, base: Sequence[Tuple[str, str]], treated: Dict[str, List[Tuple[str, str]]]
+    ):
+        self.configs = sorted(treated)
+        self.base = list(base)
+        self.treated = treated
+        self.files = [f for _, f in base] + [f for c in self.configs for _, f in treated[c]]
+        aggs = [store.aggregate([f for _, f in base], self.files)]
+        aggs += [store.aggregate([f for _, f in treated[c]], self.files) for c in self.configs]
+        self.freq = aggs[0].freq_hz
+        self.lin = np.vstack([a.mean for a in aggs])
+        self.n_runs = [a.n_runs for a in aggs]
+        self.points = int(sum(store.spectrum(f)[0].size for f in self.files))
+        self.use_db = bool(np.nanmin(self.lin) >= 0)
+        self.db = 20.0 * np.log10(np.maximum(np.abs(self.lin), 1e-12))
+
+    def traces(self) -> List[str]:
+        lines = [f"BASELINE: {trace_line(TraceInfo([r for r, _ in self.base], [f for _, f in self.base]))}"]
+        for c in self.configs:
+            runs = self.treated[c]
+            lines.append(f"{c}: {trace_line(TraceInfo([r for r, _ in runs], [f for _, f in runs]))}")
+        return lines
+
+
+def _run_metadata(runs_dir: str) -> Dict[str, dict]:
+    meta: Dict[str, dict] = {}
+    for path in sorted(glob.glob(os.path.join(runs_dir, "*", "metadata.yml"))):
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                doc = yaml.safe_load(fh) or {}
+        except yaml.YAMLError:
+            continue  # reported by scan_runs
+        meta[str(doc.get("run_id") or os.path.basename(os.path.dirname(path))).strip()] = doc
+    return meta
+
+
+Grouped = Dict[str, Dict[str, Dict[str, List[Tuple[str, str]]]]]
+
+
+def _group(runs: Sequence[RunRecord]) -> Grouped:
+    """stage -> acquisition type -> config -> sorted [(run_id, file)]."""
+    out: Grouped = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    for run in runs:
+        for acq, paths in run.files.items():
+            for p in paths:
+                out[run.stage][acq][run.config].append((run.run_id, p))
+    for by_acq in out.values():
+        for by_config in by_acq.values():
+            for runs_ in by_config.values():
+                runs_.sort()
+    return out
+
+
+def frf_modes(stack: Stack, top_n: int, prominence: float, window: float) -> pd.DataFrame:
+    """Dominant baseline modes vs every configuration: level, half-power zeta and frequency shift."""
+    freq, y = stack.freq, stack.db if stack.use_db else stack.lin
+    bins = baseline_peaks(freq, y[0], top_n, prominence)
+    if bins.size == 0:
+        return pd.DataFrame()
+    table = peak_deltas(freq, y, stack.lin, stack.configs, bins, window, "dB" if stack.use_db else "linear")
+    n_cfg, n_pk = len(stack.configs), bins.size
+    f0 = freq[bins]
+    lo = np.searchsorted(freq, f0 * (1.0 - window))
+    hi = np.maximum(np.searchsorted(freq, f0 * (1.0 + window)), lo + 1)
+    t_bins = np.empty((n_cfg, n_pk), dtype=int)
+    for i in range(n_pk):
+        t_bins[:, i] = lo[i] + np.argmax(y[1:, lo[i] : hi[i]], axis=1)
+    hp_b = half_power_damping(freq, stack.db[0], np.zeros(n_pk, dtype=int), bins)
+    hp_t = half_power_damping(freq, stack.db[1:], np.repeat(np.arange(n_cfg), n_pk), t_bins.ravel())
+    zeta_b = np.tile(hp_b["zeta_half_power"].to_numpy(), n_cfg)
+    fn_b = np.tile(hp_b["fn_hz"].to_numpy(), n_cfg)
+    table["zeta_baseline"] = zeta_b
+    table["zeta_treated"] = hp_t["zeta_half_power"].to_numpy()
+    table["delta_zeta"] = table["zeta_treated"] - zeta_b
+    table["mode_shift_percent"] = (hp_t["fn_hz"].to_numpy() / fn_b - 1.0) * 100.0
+    return table
+
+
+def paired_deltas(
+    store: ArtifactStore,
+    base: Sequence[Tuple[str, str]],
+    treated: Dict[str, List[Tuple[str, str]]],
+    top_n: int,
+    prominence: float,
+) -> pd.DataFrame:
+    """Run-by-run FRF peak deltas (baseline 01 vs treated 01, ...), as summarize_deltas.py."""
+
+    def run_peaks(path: str) -> Tuple[np.ndarray, np.ndarray]:
+        f, v = store.spectrum(path)
+        db = 20.0 * np.log10(np.maximum(np.abs(v), 1e-12))
+        bins = baseline_peaks(f, db, top_n, prominence)
+        return f[bins], db[bins]
+
+    rows = []
+    for config in sorted(treated):
+        for (b_id, b_f), (t_id, t_f) in zip(base, treated[config]):
+            f_pk, b_db = store.get("run_peaks", (b_f, top_n, prominence), lambda: run_peaks(b_f))
+            if f_pk.size == 0:
+                continue
+            ft, vt = store.spectrum(t_f)
+            t_db = 20.0 * np.log10(np.maximum(np.abs(np.interp(f_pk, ft, vt)), 1e-12))
+            rows.append(
+                {
+                    "config": config,
+                    "baseline_run": b_id,
+                    "treated_run": t_id,
+                    "dominant_freq_hz": f_pk[0],
+                    "dominant_delta_db": t_db[0] - b_db[0],
+                    "mean_delta_db": float(np.mean(t_db - b_db)),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def plot_stack(stack: Stack, path: str, title: str, log_axes: bool) -> str:
+    fig = plt.figure(figsize=(10, 6))
+    n_px = pixel_columns(fig, dpi=150)
+    y = stack.db if (stack.use_db and not log_axes) else stack.lin
+    for i, label in enumerate(["BASELINE (mean)"] + [f"{c} (mean)" for c in stack.configs]):
+        plt.plot(*minmax_envelope(stack.freq, y[i], n_px), label=label, **({"color": "k"} if i == 0 else {}))
+    if log_axes:
+        plt.xscale("log")
+        plt.yscale("log")
+    plt.xlabel("Frequency (Hz)")
+    plt.ylabel("Magnitude (dB)" if y is stack.db else "Magnitude (linear)")
+    plt.title(title)
+    plt.legend(fontsize=8)
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close(fig)
+    return path
+
+
+def _fmt(v: object) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, (float, np.floating)):
+        return "" if not np.isfinite(v) else f"{v:.4g}"
+    return str(v)
+
+
+def _md_table(df: pd.DataFrame) -> str:
+    head = "| " + " | ".join(map(str, df.columns)) + " |"
+    rule = "|" + "---|" * len(df.columns)
+    body = ["| " + " | ".join(_fmt(v) for v in row) + " |" for row in df.itertuples(index=False)]
+    return "\n".join([head, rule, *body])
+
+
+def render_markdown(blocks: Sequence[Block], out_path: str) -> str:
+    base = os.path.dirname(os.path.abspath(out_path))
+    parts: List[str] = []
+    for kind, payload in blocks:
+        if kind in ("h1", "h2", "h3"):
+            parts.append(f"{'#' * int(kind[1])} {payload}")
+        elif kind == "p":
+            parts.append(str(payload))
+        elif kind == "list":
+            parts.append("\n".join(f"- {item}" for item in payload))
+        elif kind == "table":
+            parts.append(_md_table(payload) if len(payload) else "_(no rows)_")
+        elif kind == "image":
+            parts.append(f"![]({os.path.relpath(os.path.abspath(payload), base)})")
+        elif kind == "trace":
+            parts.append("\n".join(f"<sub>{line}</sub><br>" for line in payload))
+    return "\n\n".join(parts) + "\n"
+
+
+def render_html(blocks: Sequence[Block], title: str) -> str:
+    parts = [
+        "<!DOCTYPE html>",
+        f"<html><head><meta charset='utf-8'><title>{html.escape(title)}</title>",
+        "<style>body{font-family:sans-serif;max-width:1100px;margin:auto}table{border-collapse:collapse;font-size:13px}"
+        "td,th{border:1px solid #bbb;padding:2px 6px;text-align:right}img{max-width:100%}"
+        ".trace{font-size:11px;color:#555;word-break:break-all}</style></head><body>",
+    ]
+    for kind, payload in blocks:
+        if kind in ("h1", "h2", "h3"):
+            parts.append(f"<{kind}>{html.escape(str(payload))}</{kind}>")
+        elif kind == "p":
+            parts.append(f"<p>{html.escape(str(payload))}</p>")
+        elif kind == "list":
+            parts.append("<ul>" + "".join(f"<li>{html.escape(str(i))}</li>" for i in payload) + "</ul>")
+        elif kind == "table":
+            if len(payload):
+                parts.append(payload.to_html(index=False, na_rep="", float_format=lambda v: f"{v:.4g}"))
+            else:
+                parts.append("<p><i>(no rows)</i></p>")
+        elif kind == "image":
+            with open(payload, "rb") as fh:
+                data = base64.b64encode(fh.read()).decode("ascii")
+            parts.append(f"<img src='data:image/png;base64,{data}'>")
+        elif kind == "trace":
+            parts.append("<div class='trace'>" + "<br>".join(html.escape(line) for line in payload) + "</div>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def _treatment(meta: Dict[str, dict], run_ids: Sequence[str]) -> Tuple[str, Optional[float]]:
+    """Treatment description and mean added mass (g) of a configuration's runs."""
+    descs, masses = [], []
+    for run_id in run_ids:
+        treatment = (meta.get(run_id) or {}).get("treatment") or {}
+        if treatment.get("description"):
+            descs.append(str(treatment["description"]))
+        if treatment.get("added_mass_g") is not None:
+            masses.append(float(treatment["added_mass_g"]))
+    return "; ".join(sorted(set(descs))) or "(not recorded)", (float(np.mean(masses)) if masses else None)
+
+
+class CampaignReport:
+    """Builds the report blocks stage by stage; every section draws on one ArtifactStore."""
+
+    def __init__(
+        self, args: argparse.Namespace, store: ArtifactStore, inst: Instrumentation, runs: Sequence[RunRecord]
+    ):
+        self.args = args
+        self.store = store
+        self.inst = inst
+        self.grouped = _group(runs)
+        self.meta = _run_metadata(args.runs_dir)
+        self.summaries: List[str] = []
+        self.conclusions: List[str] = []
+
+    def stack(self, stage: str, acq: str) -> Optional[Stack]:
+        by_config = self.grouped[stage].get(acq) or {}
+        base = by_config.get(BASELINE_CONFIG)
+        treated = {c: r for c, r in by_config.items() if c != BASELINE_CONFIG}
+        if not base or not treated:
+            return None
+        return self.store.get("stack", (stage, acq), lambda: Stack(self.store, base, treated))
+
+    def section(self, name: str, stack: Optional[Stack] = None):
+        return self.inst.stage(name, **({"files": len(stack.files), "points": stack.points} if stack else {}))
+
+    def plot(self, stack: Stack, stage: str, acq: str, log_axes: bool) -> str:
+        path = os.path.join(self.args.plots_dir, f"{acq.lower()}_{stage.lower()}.png")
+        return self.store.get("plot", (stage, acq), lambda: plot_stack(stack, path, f"{stage} {acq}", log_axes))
+
+    def runs_table(self, stage: str) -> pd.DataFrame:
+        run_ids: Dict[str, set] = defaultdict(set)
+        for by_config in self.grouped[stage].values():
+            for config, runs in by_config.items():
+                run_ids[config].update(r for r, _ in runs)
+        rows = []
+        for config in sorted(run_ids):
+            ids = sorted(run_ids[config])
+            desc, mass = _treatment(self.meta, ids)
+            rows.append(
+                {"config": config, "runs": len(ids), "run_ids": ", ".join(ids), "treatment": desc, "added_mass_g": mass}
+            )
+        return pd.DataFrame(rows)
+
+    def frf(self, stage: str, blocks: List[Block]) -> pd.DataFrame:
+        stack = self.stack(stage, "FRF")
+        if stack is None:
+            return pd.DataFrame()
+        a = self.args
+        with self.section(f"{stage}:frf", stack) as st:
+            modes = self.store.get(
+                "frf_modes",
+                (stage, a.top_n, a.prominence),
+                lambda: frf_modes(stack, a.top_n, a.prominence, a.peak_window),
+            )
+            png = self.plot(stack, stage, "FRF", log_axes=False)
+            st["sizes"].update(modes=len(modes))
+        blocks += [("h3", "FRF results"), ("image", png), ("trace", stack.traces())]
+        if len(modes):
+            cols = ["config", "peak_rank", "peak_freq_hz", "baseline_value", "treated_value", "delta"]
+            cols += ["zeta_baseline", "zeta_treated", "delta_zeta", "mode_shift_percent"]
+            modes_view = modes[cols].rename(columns={"baseline_value": "baseline", "treated_value": "treated"})
+            blocks.append(("table", modes_view))
+        else:
+            blocks.append(("p", f"No baseline peaks with prominence >= {a.prominence} dB."))
+
+        with self.section(f"{stage}:deltas", stack) as st:
+            by_config = self.grouped[stage]["FRF"]
+            treated = {c: r for c, r in by_config.items() if c != BASELINE_CONFIG}
+            pairs = paired_deltas(self.store, by_config[BASELINE_CONFIG], treated, a.top_n, a.prominence)
+            st["sizes"].update(pairs=len(pairs))
+        blocks += [("h3", "FRF deltas, paired runs"), ("table", pairs)]
+        if len(pairs):
+            spread = pairs.groupby("config")["dominant_delta_db"].agg(["count", "mean", "std"]).reset_index()
+            blocks.append(
+                (
+                    "list",
+                    [
+                        f"{r['config']}: dominant-peak delta {r['mean']:+.2f} dB over {r['count']} pairs"
+                        f" (std {r['std']:.2f} dB)"
+                        for _, r in spread.iterrows()
+                    ],
+                )
+            )
+        return modes
+
+    def srs(self, stage: str, blocks: List[Block]) -> pd.DataFrame:
+        stack = self.stack(stage, "SRS")
+        if stack is None:
+            return pd.DataFrame()
+        a = self.args
+        with self.section(f"{stage}:srs", stack) as st:
+            band_set = self.store.bands(a.srs_bands, float(stack.freq[0]), float(stack.freq[-1]))
+            by_stat = self.store.get(
+                "band_stats", (stage, "SRS", a.srs_bands), lambda: band_stats(stack.freq, stack.lin, band_set, ("max",))
+            )
+            table = band_deltas(by_stat, band_set, stack.configs)
+            top = table.groupby("band_hz")["baseline_max"].first().nlargest(a.critical_bands).index
+            critical = table[table["band_hz"].isin(top)].reset_index(drop=True)
+            png = self.plot(stack, stage, "SRS", log_axes=True)
+            st["sizes"].update(bands=len(band_set))
+        blocks += [("h3", "Shock (SRS) results"), ("image", png), ("trace", stack.traces())]
+        blocks.append(("p", f"Critical bands (highest baseline band max): {', '.join(top)} Hz"))
+        cols = ["config", "band_hz", "baseline_max", "treated_max", "delta_max", "delta_max_percent"]
+        blocks.append(("table", critical[cols]))
+        return critical
+
+    def acoustic(self, stage: str, blocks: List[Block]) -> pd.DataFrame:
+        stack = self.stack(stage, "ACOUSTIC")
+        if stack is None:
+            return pd.DataFrame()
+        a = self.args
+        with self.section(f"{stage}:acoustic", stack) as st:
+            band_set = self.store.bands(a.acoustic_bands, float(stack.freq[0]), float(stack.freq[-1]))
+            by_stat = self.store.get(
+                "band_stats",
+                (stage, "ACOUSTIC", a.acoustic_bands),
+                lambda: band_stats(stack.freq, stack.lin, band_set, ("max", "rms")),
+            )
+            table = band_deltas(by_stat, band_set, stack.configs)
+            png = self.plot(stack, stage, "ACOUSTIC", log_axes=False)
+            st["sizes"].update(bands=len(band_set))
+        rms = np.sqrt(np.mean(stack.lin**2, axis=1))
+        changes = [
+            f"{c}: broadband RMS change {20.0 * np.log10(rms[i] / rms[0]):+.2f} dB"
+            for i, c in enumerate(stack.configs, start=1)
+        ]
+        cols = ["config", "band_hz", "baseline_rms", "treated_rms", "delta_rms", "delta_rms_percent"]
+        blocks += [("h3", "Acoustic response results"), ("image", png), ("trace", stack.traces())]
+        blocks += [("list", changes), ("table", table[cols])]
+        return table
+
+    def tradeoffs(
+        self, runs: pd.DataFrame, modes: pd.DataFrame, srs: pd.DataFrame, acoustic: pd.DataFrame
+    ) -> List[str]:
+        items = []
+        for _, run in runs[runs["config"] != BASELINE_CONFIG].iterrows():
+            c, mass = run["config"], run["added_mass_g"]
+            recorded = mass is not None and np.isfinite(mass)
+            text = f"{c}: added mass {mass:g} g" if recorded else f"{c}: added mass not recorded"
+            if len(modes):
+                m = modes[modes["config"] == c]
+                text += f"; largest FRF mode shift {m['mode_shift_percent'].abs().max():.1f}%"
+                worse = m[m["delta"] > 0]
+                if len(worse):
+                    text += f"; FRF peak increase at {', '.join(f'{f:.0f} Hz' for f in worse['peak_freq_hz'])}"
+            for label, table, col in (("SRS", srs, "delta_max"), ("acoustic", acoustic, "delta_rms")):
+                if len(table):
+                    up = table[(table["config"] == c) & (table[col] > 0)]
+                    if len(up):
+                        worst = up.loc[up[col].idxmax(), "band_hz"]
+                        text += f"; {label} increase in {len(up)} band(s) (largest in {worst} Hz)"
+            items.append(text)
+        return items
+
+    def conclude(self, stage: str, runs: pd.DataFrame, modes: pd.DataFrame, srs: pd.DataFrame) -> None:
+        """Bounded statements in the docs/01 section 4 wording."""
+        if len(modes):
+            dom = modes[modes["peak_rank"] == 1]
+            for _, r in dom.iterrows():
+                word = "reduction" if r["delta"] < 0 else "increase"
+                unit = "dB" if r["units"] == "dB" else "(linear)"
+                self.conclusions.append(
+                    f"Measured FRF peak {word} of {abs(r['delta']):.1f} {unit} at {r['peak_freq_hz']:.0f} Hz"
+                    f" on configuration {r['config']} ({stage})."
+                )
+                if np.isfinite(r["delta_zeta"]) and r["delta_zeta"] > 0:
+                    self.conclusions.append(
+                        f"Measured Δζ increase from {r['zeta_baseline']:.4f} to {r['zeta_treated']:.4f}"
+                        f" at the dominant mode on configuration {r['config']} ({stage})."
+                    )
+            best = dom.loc[dom["delta"].idxmin()]
+            self.summaries.append(
+                f"{stage}: largest measured dominant-peak change {best['delta']:+.1f} {best['units']}"
+                f" at {best['peak_freq_hz']:.0f} Hz on {best['config']}."
+            )
+        for c, rows in srs.groupby("config") if len(srs) else ():
+            r = rows.loc[rows["delta_max_percent"].idxmin()]
+            if r["delta_max_percent"] < 0:
+                self.conclusions.append(
+                    f"Observed SRS reduction of {-r['delta_max_percent']:.0f}% in band [{r['band_hz']}] Hz"
+                    f" under test condition {c} ({stage})."
+                )
+        few = runs.loc[runs["runs"] < 3, "config"].tolist()
+        if few:
+            self.conclusions.append(
+                f"Fewer than 3 repeated runs for {', '.join(few)} ({stage}): repeatability (R7) not demonstrated."
+            )
+
+    def stage_blocks(self, stage: str) -> List[Block]:
+        blocks: List[Block] = [("h2", f"Stage {stage}")]
+        with self.inst.stage(f"{stage}:runs"):
+            runs = self.runs_table(stage)
+        blocks += [("h3", "Runs used"), ("table", runs)]
+        modes = self.frf(stage, blocks)
+        srs = self.srs(stage, blocks)
+        acoustic = self.acoustic(stage, blocks)
+        with self.inst.stage(f"{stage}:summary"):
+            blocks += [("h3", "Trade-offs / side effects"), ("list", self.tradeoffs(runs, modes, srs, acoustic))]
+            self.conclude(stage, runs, modes, srs)
+        return blocks
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Build the campaign analysis summary (Markdown / HTML) in one pass.")
+    ap.add_argument("--runs_dir", default="tests/runs", help="Directory of <RUN_ID>/metadata.yml folders")
+    ap.add_argument("--data_dir", default="data/raw", help="Fallback directory for raw data files")
+    ap.add_argument("--stage", default="", help="Only this stage (default: all)")
+    ap.add_argument("--out", default="results/output/campaign_report.md", help="Markdown report path")
+    ap.add_argument("--format", default="md,html", help="Comma-separated: md, html")
+    ap.add_argument("--plots_dir", default="results/plots/report", help="Output directory for report plots")
+    ap.add_argument("--title", default="IX-Vibe Analysis Summary", help="Report title")
+    ap.add_argument("--top_n", type=int, default=3, help="Dominant FRF modes per stage")
+    ap.add_argument("--prominence", type=float, default=3.0, help="FRF peak prominence (dB)")
+    ap.add_argument("--peak_window", type=float, default=0.1, help="Treated peak search window (+/- fraction)")
+    ap.add_argument("--srs_bands", default="20-100,100-500,500-2000,2000-5000", help="SRS bands (as plot_srs.py)")
+    ap.add_argument("--critical_bands", type=int, default=2, help="SRS bands reported as critical (highest baseline)")
+    ap.add_argument("--acoustic_bands", default="octave", help="Acoustic bands (as plot_acoustic.py)")
+    ap.add_argument("--grid", choices=("linear", "log"), default="linear", help="Common frequency grid spacing")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS, help="Upper bound on common grid size")
+    add_perf_arguments(ap)
+    args = ap.parse_args(argv)
+    inst = Instrumentation("campaign_report", enabled=args.perf or None, profile_stage=args.profile_stage)
+    formats = {f.strip().lower() for f in args.format.split(",") if f.strip()}
+    if not formats or formats - {"md", "html"}:
+        raise ValueError(f"--format must list md and/or html, got: {args.format}")
+
+    store = ArtifactStore(scale=args.grid, max_points=args.max_points)
+    with inst.stage("scan") as st:
+        runs, problems = scan_runs(args.runs_dir, args.data_dir)
+        report = CampaignReport(args, store, inst, runs)
+        st["sizes"].update(runs=len(runs))
+    stages = [s for s in sorted(report.grouped) if not args.stage or s == args.stage.upper()]
+    if not stages:
+        raise ValueError(f"No runs found for stage {args.stage!r} in {args.runs_dir}")
+    ensure_dir(args.plots_dir)
+    ensure_dir(os.path.dirname(args.out) or ".")
+
+    body: List[Block] = []
+    for stage in stages:
+        body += report.stage_blocks(stage)
+
+    blocks: List[Block] = [
+        ("h1", f"{args.title}: {args.runs_dir}"),
+        ("p", f"Generated {time.strftime('%Y-%m-%d %H:%M')} from {len(runs)} runs by campaign_report.py."),
+        ("h2", "Summary"),
+        ("list", report.summaries or ["No baseline-vs-treated FRF comparison available."]),
+        *body,
+        ("h2", "Conclusion (bounded)"),
+        ("list", report.conclusions or ["No measured deltas to report."]),
+        ("p", "Wording follows docs/01_Requirements_and_Metrics.md section 4: measured statements only."),
+    ]
+    if problems:
+        blocks += [("h2", "Problems"), ("list", problems)]
+
+    timing = pd.DataFrame(
+        [
+            {
+                "section": s["stage"],
+                "wall_s": s["wall_s"],
+                "cpu_s": s["cpu_s"],
+                "files": s["sizes"].get("files"),
+                "points": s["sizes"].get("points"),
+            }
+            for s in inst.stages
+        ]
+    )
+    artifacts = pd.DataFrame([{"artifact": k, **v} for k, v in store.stats.items()])
+    artifacts = artifacts.rename(columns={"seconds": "build_s"})
+    blocks += [("h2", "Build time"), ("table", timing), ("table", artifacts)]
+
+    outputs = []
+    if "md" in formats:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(render_markdown(blocks, args.out))
+        outputs.append(args.out)
+    if "html" in formats:
+        html_path = os.path.splitext(args.out)[0] + ".html"
+        with open(html_path, "w", encoding="utf-8") as fh:
+            fh.write(render_html(blocks, args.title))
+        outputs.append(html_path)
+
+    for path in outputs:
+        print(f"[IX-Vibe] Wrote report: {path}")
+    for _, r in timing.iterrows():
+        print(f"[IX-Vibe]   {r['section']:20s} {r['wall_s']:7.2f} s")
+    for _, r in artifacts.iterrows():
+        counts = f"computed {int(r['computed']):4d}, re-used {int(r['reused']):4d}"
+        print(f"[IX-Vibe]   {r['artifact']:12s} {counts}, {r['build_s']:.2f} s")
+    sidecar = inst.write_sidecar(outputs[0], outputs=outputs, run_ids=[r.run_id for r in runs])
+    if sidecar:
+        print(f"[IX-Vibe] Wrote perf: {sidecar}")
+
+
+if __name__ == "__main__":
+    main()
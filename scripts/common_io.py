@@ -11,10 +11,13 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Optional, Sequence, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
+from spectrum_cache import SpectrumCache, default_cache
+
 
 @dataclass(frozen=True)
 class TraceInfo:
@@ -23,9 +26,13 @@ class TraceInfo:
     notes: str = ""
 
 
+def _normalize_name(col: object) -> str:
+    return str(col).strip().lower().replace(" ", "_")
+
+
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    # Callers pass freshly parsed frames, so rename in place instead of copying.
+    df.columns = [_normalize_name(c) for c in df.columns]
     return df
 
 
@@ -33,56 +40,279 @@ def read_spectrum_csv(
     path: str,
     freq_col_candidates: Sequence[str] = ("freq_hz", "frequency_hz", "frequency", "freq"),
     value_col_candidates: Sequence[str] = ("mag", "magnitude", "value", "resp", "response", "srs", "srs_g", "g"),
+    cache: Optional[SpectrumCache] = None,
 ) -> Tuple[pd.Series, pd.Series, pd.DataFrame]:
     """
-    Read a generic spectrum CSV and return (freq_hz, value, full_df).
+    Read a generic spectrum CSV and return (freq_hz, value, df), df holding only the two
+    resolved columns.
 
     The CSV can be produced by various tools. We attempt common column names first.
     If columns are not found, we fall back to:
       - first numeric column as frequency
       - second numeric column as value
 
+    Only the header is read to resolve the two columns; then just those columns are
+    parsed, as float64, with the fastest available engine (pyarrow if installed).
+    Use read_spectrum_columns to pull several channels out of one file in one parse.
+
+    Caching:
+      If a SpectrumCache is passed (or IXVIBE_CACHE_DIR is set), the resolved arrays are
+      stored in binary form and later calls on the unchanged file skip CSV parsing.
+
     Returns:
       freq: pd.Series (float, Hz)
       val:  pd.Series (float)
-      df:   normalized full dataframe
+      df:   the resolved frequency/value columns (normalized names; on a parse, rows
+            with blanks are kept, while freq / val have them dropped)
     """
     if not os.path.exists(path):
         raise FileNotFoundError(f"CSV not found: {path}")
 
-    df = pd.read_csv(path)
-    df = _normalize_columns(df)
-
-    freq_col = next((c for c in freq_col_candidates if c in df.columns), None)
-    val_col = next((c for c in value_col_candidates if c in df.columns), None)
-
-    if freq_col and val_col:
-        freq = pd.to_numeric(df[freq_col], errors="coerce")
-        val = pd.to_numeric(df[val_col], errors="coerce")
-        mask = freq.notna() & val.notna()
-        return freq[mask], val[mask], df
-
-    # Fallback: infer numeric columns
-    numeric_cols = []
-    for c in df.columns:
-        try:
-            _ = pd.to_numeric(df[c], errors="coerce")
-            numeric_cols.append(c)
-        except Exception:
-            continue
-
-    if len(numeric_cols) < 2:
-        raise ValueError(
-            f"Could not infer frequency/value columns from {path}. "
-            f"Expected at least 2 numeric columns."
-        )
-
-    freq = pd.to_numeric(df[numeric_cols[0]], errors="coerce")
-    val = pd.to_numeric(df[numeric_cols[1]], errors="coerce")
+    cache = cache if cache is not None else default_cache()
+    key = None
+    if cache is not None:
+        key = cache.key(path, freq_col_candidates, value_col_candidates)
+        hit = cache.get(key)
+        if hit is not None:
+            freq_col, f_arr, val_col, v_arr = hit
+            freq = pd.Series(f_arr, name=freq_col)
+            val = pd.Series(v_arr, name=val_col)
+            return freq, val, pd.DataFrame({freq_col: freq, val_col: val})
+
+    freq, val, df = _parse_spectrum_csv(path, freq_col_candidates, value_col_candidates)
+    if cache is not None and key is not None:
+        cache.put(key, str(freq.name), freq.to_numpy(dtype=float), str(val.name), val.to_numpy(dtype=float))
+    return freq, val, df
+
+
+def _csv_engine() -> str:
+    """Fastest installed pandas CSV engine (pyarrow is optional, the C engine always exists)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+_ENGINE = _csv_engine()
+_SNIFF_ROWS = 200
+
+
+def _read_float_columns(path: str, raw_cols: Sequence[str]) -> pd.DataFrame:
+    """Read only raw_cols as float64; non-numeric cells (unit rows, blanks) become NaN."""
+    try:
+        df = pd.read_csv(path, usecols=list(raw_cols), dtype={c: "float64" for c in raw_cols}, engine=_ENGINE)
+    except ValueError:
+        # Some cell is not a number: read those columns as text and coerce instead.
+        df = pd.read_csv(path, usecols=list(raw_cols), dtype=str)
+        df = df.apply(pd.to_numeric, errors="coerce")
+    return df[list(raw_cols)]
+
+
+def _sniff_numeric(path: str, raw_cols: Sequence[str]) -> List[str]:
+    """Columns (in file order) that hold at least one number in the first rows."""
+    head = pd.read_csv(path, nrows=_SNIFF_ROWS, dtype=str)
+    return [c for c in raw_cols if pd.to_numeric(head[c], errors="coerce").notna().any()]
+
+
+def _resolve_spectrum_columns(
+    path: str,
+    freq_col_candidates: Sequence[str],
+    value_col_candidates: Sequence[str],
+) -> Tuple[Dict[str, str], str, str]:
+    """(raw_by_name, freq_col, val_col) from the header, sniffing numeric columns as a fallback."""
+    raw_by_name = {_normalize_name(c): c for c in pd.read_csv(path, nrows=0).columns}
+    freq_col = next((c for c in freq_col_candidates if c in raw_by_name), None)
+    val_col = next((c for c in value_col_candidates if c in raw_by_name), None)
+
+    if not (freq_col and val_col):
+        # Fallback: first two columns that actually hold numbers
+        numeric = _sniff_numeric(path, list(raw_by_name.values()))
+        if len(numeric) < 2:
+            raise ValueError(
+                f"Could not infer frequency/value columns from {path}. "
+                f"Expected at least 2 numeric columns."
+            )
+        freq_col, val_col = _normalize_name(numeric[0]), _normalize_name(numeric[1])
+    return raw_by_name, freq_col, val_col
+
+
+def _parse_spectrum_csv(
+    path: str,
+    freq_col_candidates: Sequence[str],
+    value_col_candidates: Sequence[str],
+) -> Tuple[pd.Series, pd.Series, pd.DataFrame]:
+    # Resolve columns from the header alone, then parse just those two as floats.
+    raw_by_name, freq_col, val_col = _resolve_spectrum_columns(path, freq_col_candidates, value_col_candidates)
+    df = _normalize_columns(_read_float_columns(path, [raw_by_name[freq_col], raw_by_name[val_col]]))
+    freq, val = df[freq_col], df[val_col]
     mask = freq.notna() & val.notna()
     return freq[mask], val[mask], df
 
 
+def read_spectrum_freq(
+    path: str,
+    freq_col_candidates: Sequence[str] = ("freq_hz", "frequency_hz", "frequency", "freq"),
+    value_col_candidates: Sequence[str] = ("mag", "magnitude", "value", "resp", "response", "srs", "srs_g", "g"),
+    cache: Optional[SpectrumCache] = None,
+) -> np.ndarray:
+    """
+    Frequency column (Hz, blanks dropped) of the spectrum read_spectrum_csv would resolve,
+    parsing only that column. Served from the spectrum cache when the file is in it.
+
+    Meant for sizing a common grid before the full read; rows whose value is blank are
+    still counted here, while read_spectrum_csv drops them.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV not found: {path}")
+
+    cache = cache if cache is not None else default_cache()
+    if cache is not None:
+        hit = cache.get(cache.key(path, freq_col_candidates, value_col_candidates))
+        if hit is not None:
+            return hit[1]
+
+    raw_by_name, freq_col, _ = _resolve_spectrum_columns(path, freq_col_candidates, value_col_candidates)
+    freq = _read_float_columns(path, [raw_by_name[freq_col]]).iloc[:, 0].to_numpy(dtype=float)
+    return freq[~np.isnan(freq)]
+
+
+def read_spectrum_columns(
+    path: str,
+    value_cols: Optional[Sequence[str]] = None,
+    freq_col_candidates: Sequence[str] = ("freq_hz", "frequency_hz", "frequency", "freq"),
+) -> Tuple[pd.Series, pd.DataFrame]:
+    """
+    Read several value columns of one multi-channel spectrum export in a single parse.
+
+    value_cols: column names to return (default: every numeric column except frequency).
+
+    Returns:
+      freq:   pd.Series (float, Hz), rows without a frequency dropped
+      values: pd.DataFrame (float), one column per requested channel (may contain NaN)
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV not found: {path}")
+
+    raw_by_name = {_normalize_name(c): c for c in pd.read_csv(path, nrows=0).columns}
+    freq_col = next((c for c in freq_col_candidates if c in raw_by_name), None)
+    if freq_col is None:
+        numeric = _sniff_numeric(path, list(raw_by_name.values()))
+        if not numeric:
+            raise ValueError(f"Could not infer a frequency column from {path}.")
+        freq_col = _normalize_name(numeric[0])
+    if value_cols is None:
+        others = [raw for name, raw in raw_by_name.items() if name != freq_col]
+        value_cols = [_normalize_name(c) for c in _sniff_numeric(path, others)]
+    else:
+        value_cols = [_normalize_name(c) for c in value_cols]
+        missing = [c for c in value_cols if c not in raw_by_name]
+        if missing:
+            raise ValueError(f"Columns not found in {path}: {', '.join(missing)}")
+    if not value_cols:
+        raise ValueError(f"No numeric value columns found in {path}.")
+
+    df = _normalize_columns(_read_float_columns(path, [raw_by_name[c] for c in [freq_col, *value_cols]]))
+    mask = df[freq_col].notna()
+    return df.loc[mask, freq_col], df.loc[mask, value_cols]
+
+
+def read_time_history_csv(
+    path: str,
+    sample_rate_hz: Optional[float] = None,
+    time_col_candidates: Sequence[str] = ("time_s", "time", "t", "seconds"),
+) -> Tuple[float, List[str], np.ndarray]:
+    """
+    Read a raw multi-channel time-history CSV and return (sample_rate_hz, channel_names, data).
+
+    Layout:
+      - optional time column (seconds); sample rate is taken from its median step
+      - every other numeric column is one channel
+
+    If there is no time column, sample_rate_hz must be provided.
+
+    Returns:
+      fs:       float (Hz)
+      channels: list of normalized channel names
+      data:     np.ndarray, shape (n_channels, n_samples), float64
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV not found: {path}")
+
+    df = _normalize_columns(pd.read_csv(path))
+    time_col = next((c for c in time_col_candidates if c in df.columns), None)
+
+    fs = sample_rate_hz
+    if time_col is not None:
+        t = pd.to_numeric(df[time_col], errors="coerce").to_numpy(dtype=float)
+        step = np.nanmedian(np.diff(t)) if t.size > 1 else np.nan
+        if fs is None:
+            if not np.isfinite(step) or step <= 0:
+                raise ValueError(f"Could not infer sample rate from time column '{time_col}' in {path}.")
+            fs = 1.0 / step
+        df = df.drop(columns=[time_col])
+
+    if fs is None or fs <= 0:
+        raise ValueError(f"No time column in {path}; a positive sample rate must be provided.")
+
+    numeric = df.apply(pd.to_numeric, errors="coerce")
+    channels = [c for c in numeric.columns if numeric[c].notna().any()]
+    if not channels:
+        raise ValueError(f"No numeric channel columns found in {path}.")
+
+    data = numeric[channels].to_numpy(dtype=float).T
+    data = np.nan_to_num(data, nan=0.0)
+    return float(fs), channels, data
+
+
+def iter_time_history_csv(
+    path: str,
+    chunk_rows: int = 65536,
+    sample_rate_hz: Optional[float] = None,
+    channels: Optional[Sequence[str]] = None,
+    time_col_candidates: Sequence[str] = ("time_s", "time", "t", "seconds"),
+) -> Iterator[Tuple[float, List[str], np.ndarray]]:
+    """
+    Stream a raw time-history CSV in fixed-size row chunks (bounded memory).
+
+    Only the time column and the requested channels are parsed. The sample rate is
+    inferred from the time column of the first chunk unless sample_rate_hz is given.
+
+    Yields:
+      fs:       float (Hz)
+      channels: list of normalized channel names (same every chunk)
+      data:     np.ndarray, shape (n_channels, <= chunk_rows), float64
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV not found: {path}")
+
+    raw_by_name = {_normalize_name(c): c for c in pd.read_csv(path, nrows=0).columns}
+    time_col = next((c for c in time_col_candidates if c in raw_by_name), None)
+    if channels is None:
+        channels = [c for c in raw_by_name if c != time_col]
+    channels = [_normalize_name(c) for c in channels]
+    missing = [c for c in channels if c not in raw_by_name]
+    if missing:
+        raise ValueError(f"Channels not found in {path}: {', '.join(missing)}")
+    if not channels:
+        raise ValueError(f"No channel columns found in {path}.")
+
+    wanted = ([time_col] if time_col else []) + channels
+    fs = sample_rate_hz
+    for chunk in pd.read_csv(path, usecols=[raw_by_name[c] for c in wanted], chunksize=chunk_rows):
+        chunk = _normalize_columns(chunk)
+        if fs is None:
+            if time_col is None:
+                raise ValueError(f"No time column in {path}; a positive sample rate must be provided.")
+            t = pd.to_numeric(chunk[time_col], errors="coerce").to_numpy(dtype=float)
+            step = np.nanmedian(np.diff(t)) if t.size > 1 else np.nan
+            if not np.isfinite(step) or step <= 0:
+                raise ValueError(f"Could not infer sample rate from time column '{time_col}' in {path}.")
+            fs = 1.0 / step
+        data = chunk[channels].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float).T
+        yield float(fs), list(channels), np.nan_to_num(data, nan=0.0)
+
+
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
@@ -0,0 +1,384 @@
+"""
+IX-Vibe multi-configuration comparison (v0.1)
+
+Purpose:
+- Compare many treatment configurations (TREATED_A ... TREATED_F) against one shared
+  baseline in a single run. plot_*.py / summarize_deltas.py compare one baseline set with
+  one treated set, so N configurations re-load and re-grid the baseline N times; here it
+  is loaded and aggregated once.
+
+Inputs:
+- One baseline set and any number of treated sets of spectrum CSVs (FRF, SRS or acoustic).
+- --treated CONFIG=file1,file2 (repeatable), or plain file lists grouped by the config in
+  their run-ID file names (20260122_PANEL_TREATED_A_01_FRF_accelsetA.csv -> TREATED_A).
+
+Method:
+- Every file is parsed once. One common grid is built over the overlap of all files, the
+  baseline and each configuration are aggregated onto it (aggregate.py, streaming mean),
+  and the means are stacked as one (1 + n_configs, n_grid) array.
+- Peaks: the baseline's --top_n peaks (dB for FRF, as plot_frf.py) with at least
+  --prominence (default 3 dB for FRF, as campaign_report.py, so noise ripple on one mode
+  is not counted as several peaks); every configuration is read at the same grid bins in
+  one fancy-index and its local maximum within +/- --peak_window of each peak frequency
+  comes from one reduceat over the whole stack.
+- Bands: bands.band_stats on the whole stack at once (edge indices computed once).
+- Runtime grows with the number of files, not baseline x configurations.
+
+Outputs:
+- --peaks_out:   config, peak_rank, peak_freq_hz, baseline_value, treated_value, delta,
+                 delta_percent (linear magnitude), treated_window_max, delta_window_max, units
+- --bands_out:   config, band_hz, center_hz, baseline_<s>, treated_<s>, delta_<s>,
+                 delta_<s>_percent per statistic (as plot_frf.py --bands)
+- --ranking_out: one row per configuration, ranked by --rank_by (most negative first):
+                 n_runs, peak_delta_mean, peak_delta_worst, dominant_peak_delta,
+                 band_max_delta_db_mean, bands_worse, broadband_rms_delta_db
+- PNG: baseline and every configuration overlaid, plus the dB change of each vs baseline.
+
+Notes:
+- Peak deltas are in dB when the FRF data are non-negative magnitudes (as plot_frf.py),
+  else in data units; band and broadband columns always use the linear values.
+
+Usage example:
+python scripts/compare_configs.py --kind frf --baseline b_01.csv,b_02.csv \
+  --treated TREATED_A=a_01.csv,a_02.csv --treated TREATED_B=b_01.csv,b_02.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from scipy.signal import find_peaks
+
+from aggregate import DEFAULT_MAX_POINTS, aggregate_spectra, common_grid, load_spectra
+from bands import band_stats, parse_bands, user_bands
+from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, trace_line
+from decimate import minmax_envelope, pixel_columns
+from instrument import Instrumentation, add_perf_arguments
+from results_index import index_path, parse_run_name, record_result
+
+KINDS = ("frf", "srs", "acoustic")
+RANK_COLUMNS = (
+    "peak_delta_mean",
+    "peak_delta_worst",
+    "dominant_peak_delta",
+    "band_max_delta_db_mean",
+    "broadband_rms_delta_db",
+)
+DEFAULT_PROMINENCE_DB = 3.0
+
+
+def parse_treated(specs: Sequence[str]) -> Dict[str, List[str]]:
+    """CONFIG=files specs (or plain file lists grouped by run-ID config) -> {config: files}."""
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for spec in specs:
+        name, sep, files = spec.partition("=")
+        if sep:
+            groups[name.strip().upper()].extend(parse_csv_list(files))
+            continue
+        for f in parse_csv_list(spec):
+            config = parse_run_name(f).get("config")
+            if not config:
+                raise ValueError(f"Cannot tell the configuration of {f}; use --treated CONFIG={f}")
+            groups[str(config)].append(f)
+    if not groups:
+        raise ValueError("No treated files given")
+    return dict(groups)
+
+
+def _run_ids(files: Sequence[str], given: str) -> List[str]:
+    ids = list(parse_run_ids(given))
+    if ids:
+        return ids
+    return sorted({str(parse_run_name(f)["run_id"]) for f in files if parse_run_name(f)})
+
+
+def baseline_peaks(freq: np.ndarray, y: np.ndarray, top_n: int, prominence: float) -> np.ndarray:
+    """Grid bins of the top_n highest baseline peaks, in descending level."""
+    peaks, _ = find_peaks(y, prominence=prominence)
+    return peaks[np.argsort(y[peaks])[::-1][:top_n]]
+
+
+def peak_deltas(
+    freq: np.ndarray,
+    y: np.ndarray,
+    lin: np.ndarray,
+    configs: Sequence[str],
+    bins: np.ndarray,
+    window: float,
+    units: str,
+) -> pd.DataFrame:
+    """Long peak table for all configurations; y / lin are (1 + n_configs, n_grid)."""
+    if bins.size == 0:
+        return pd.DataFrame()
+    f0 = freq[bins]
+    windows = user_bands(list(zip(f0 * (1.0 - window), f0 * (1.0 + window))))
+    window_max = band_stats(freq, y[1:], windows, stats=("max",))["max"]
+    at_peak = y[:, bins]
+    lin_at_peak = lin[:, bins]
+    n_cfg, n_pk = len(configs), bins.size
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(lin_at_peak[0] != 0, (lin_at_peak[1:] / lin_at_peak[0] - 1.0) * 100.0, np.nan)
+    return pd.DataFrame(
+        {
+            "config": np.repeat(np.asarray(configs, dtype=object), n_pk),
+            "peak_rank": np.tile(np.arange(1, n_pk + 1), n_cfg),
+            "peak_freq_hz": np.tile(f0, n_cfg),
+            "baseline_value": np.tile(at_peak[0], n_cfg),
+            "treated_value": at_peak[1:].ravel(),
+            "delta": (at_peak[1:] - at_peak[0]).ravel(),
+            "delta_percent": pct.ravel(),
+            "treated_window_max": window_max.ravel(),
+            "delta_window_max": (window_max - at_peak[0]).ravel(),
+            "units": units,
+        }
+    )
+
+
+def band_deltas(stats_by_name: Dict[str, np.ndarray], bands, configs: Sequence[str]) -> pd.DataFrame:
+    """Long band table for all configurations from band_stats of the (1 + n_configs) stack."""
+    frames = []
+    for i, config in enumerate(configs, start=1):
+        cols: Dict[str, np.ndarray] = {"band_hz": np.asarray(bands.labels, dtype=object), "center_hz": bands.center}
+        keep = np.ones(len(bands), dtype=bool)
+        for s, v in stats_by_name.items():
+            b, t = v[0], v[i]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pct = np.where(b != 0, (t / b - 1.0) * 100.0, np.nan)
+            cols.update({f"baseline_{s}": b, f"treated_{s}": t, f"delta_{s}": t - b, f"delta_{s}_percent": pct})
+            keep &= ~(np.isnan(b) | np.isnan(t))
+        frames.append(pd.DataFrame(cols)[keep].assign(config=config))
+    out = pd.concat(frames, ignore_index=True)
+    return out[["config", *[c for c in out.columns if c != "config"]]]
+
+
+def ranking_table(
+    configs: Sequence[str],
+    n_runs: Sequence[int],
+    lin: np.ndarray,
+    peaks: pd.DataFrame,
+    band_max: Optional[np.ndarray],
+    rank_by: str,
+) -> pd.DataFrame:
+    """One row per configuration, best (most negative rank_by) first."""
+    tiny = np.finfo(float).tiny
+    rms = np.sqrt(np.mean(lin * lin, axis=1))
+    table = pd.DataFrame(
+        {
+            "config": list(configs),
+            "n_runs": list(n_runs),
+            "broadband_rms_delta_db": 20.0 * np.log10(np.maximum(rms[1:], tiny) / max(rms[0], tiny)),
+        }
+    )
+    if not peaks.empty:
+        by_cfg = peaks.groupby("config", sort=False)["delta"]
+        table["peak_delta_mean"] = table["config"].map(by_cfg.mean())
+        table["peak_delta_worst"] = table["config"].map(by_cfg.max())
+        table["dominant_peak_delta"] = table["config"].map(peaks[peaks["peak_rank"] == 1].set_index("config")["delta"])
+    if band_max is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            db = 20.0 * np.log10(band_max[1:] / band_max[0])
+        db = np.where(np.isfinite(db), db, np.nan)
+        table["band_max_delta_db_mean"] = np.nanmean(db, axis=1) if db.shape[1] else np.nan
+        table["bands_worse"] = np.sum(db > 0, axis=1)
+    if rank_by not in table:
+        raise ValueError(f"Cannot rank by {rank_by}: no such column (no peaks / bands?)")
+    table = table.sort_values(rank_by, kind="stable", na_position="last").reset_index(drop=True)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Compare many treatment configurations against one shared baseline.")
+    ap.add_argument("--kind", choices=KINDS, default="frf", help="What the spectra are (units, dB, default labels)")
+    ap.add_argument("--baseline", required=True, help="Comma-separated baseline CSV files")
+    ap.add_argument(
+        "--treated",
+        action="append",
+        required=True,
+        help="CONFIG=comma-separated files (repeatable), or files named by run ID",
+    )
+    ap.add_argument(
+        "--run_ids_baseline", default="", help="Comma-separated baseline run IDs (default: from file names)"
+    )
+    ap.add_argument("--title", default="", help="Plot title")
+    ap.add_argument("--outdir", default="results/plots", help="Output directory for plots")
+    ap.add_argument("--outfile", default="", help="Output plot filename (default <kind>_all_configs.png)")
+    ap.add_argument(
+        "--peaks_out", default="", help="Peak delta table CSV (default results/output/<kind>_config_peaks.csv)"
+    )
+    ap.add_argument(
+        "--bands_out", default="", help="Band delta table CSV (default results/output/<kind>_config_bands.csv)"
+    )
+    ap.add_argument(
+        "--ranking_out", default="", help="Ranking table CSV (default results/output/<kind>_config_ranking.csv)"
+    )
+    ap.add_argument("--top_n", type=int, default=5, help="Number of dominant baseline peaks compared")
+    ap.add_argument(
+        "--prominence",
+        type=float,
+        default=None,
+        help=f"Peak prominence threshold (default {DEFAULT_PROMINENCE_DB:g} dB for FRF, 0 in data units else)",
+    )
+    ap.add_argument(
+        "--peak_window", type=float, default=0.1, help="Treated local-max window around each peak (+/- fraction)"
+    )
+    ap.add_argument(
+        "--bands", default="1/3", help='Band set: comma bands f1-f2 or octave, 1/3, 1/6, 1/12 ("" = none)'
+    )
+    ap.add_argument("--stats", default="max,rms", help="Band statistics: max, rms, energy")
+    ap.add_argument(
+        "--rank_by",
+        default="",
+        choices=("",) + RANK_COLUMNS,
+        help="Ranking column (default: peaks for FRF, bands else)",
+    )
+    ap.add_argument("--grid", choices=("linear", "log"), default="linear", help="Common frequency grid spacing")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS, help="Upper bound on common grid size")
+    ap.add_argument(
+        "--full_res_plot", action="store_true", help="Draw every point (no per-pixel min/max decimation)"
+    )
+    add_perf_arguments(ap)
+    args = ap.parse_args(argv)
+    inst = Instrumentation("compare_configs", enabled=args.perf or None, profile_stage=args.profile_stage)
+
+    kind = args.kind
+    outfile = args.outfile or f"{kind}_all_configs.png"
+    peaks_out = args.peaks_out or f"results/output/{kind}_config_peaks.csv"
+    bands_out = args.bands_out or f"results/output/{kind}_config_bands.csv"
+    ranking_out = args.ranking_out or f"results/output/{kind}_config_ranking.csv"
+    rank_by = args.rank_by or ("peak_delta_mean" if kind == "frf" else "band_max_delta_db_mean")
+    baseline_files = list(parse_csv_list(args.baseline))
+    treated = parse_treated(args.treated)
+    configs = sorted(treated)
+
+    with inst.stage("load") as st:
+        spectra_b = load_spectra(baseline_files)
+        spectra_t = {c: load_spectra(treated[c]) for c in configs}
+        all_spectra = spectra_b + [s for c in configs for s in spectra_t[c]]
+        st["sizes"].update(files=len(all_spectra), configs=len(configs), points=sum(f.size for f, _ in all_spectra))
+    with inst.stage("aggregate") as st:
+        grid = common_grid(all_spectra, scale=args.grid, max_points=args.max_points)
+        aggs = [aggregate_spectra(spectra_b, grid=grid)] + [aggregate_spectra(spectra_t[c], grid=grid) for c in configs]
+        lin = np.vstack([a.mean for a in aggs])
+        st["sizes"].update(grid_points=grid.size)
+    freq = grid
+
+    use_db = kind == "frf" and np.nanmin(lin) >= 0
+    y = 20.0 * np.log10(np.maximum(np.abs(lin), 1e-12)) if use_db else lin
+    units = "dB" if use_db else "linear"
+
+    with inst.stage("detect") as st:
+        prominence = args.prominence if args.prominence is not None else (DEFAULT_PROMINENCE_DB if use_db else 0.0)
+        bins = baseline_peaks(freq, y[0], args.top_n, prominence)
+        peaks = peak_deltas(freq, y, lin, configs, bins, args.peak_window, units)
+        band_set = parse_bands(args.bands, freq[0], freq[-1]) if args.bands else None
+        stats = tuple(parse_csv_list(args.stats))
+        by_stat = band_stats(freq, lin, band_set, stats) if band_set is not None else {}
+        bands = band_deltas(by_stat, band_set, configs) if band_set is not None else pd.DataFrame()
+        st["sizes"].update(peaks=int(bins.size), bands=0 if band_set is None else len(band_set))
+
+    ranking = ranking_table(configs, [a.n_runs for a in aggs[1:]], lin, peaks, by_stat.get("max"), rank_by)
+
+    ensure_dir(args.outdir)
+    for path in (peaks_out, bands_out, ranking_out):
+        ensure_dir(os.path.dirname(path) or ".")
+
+    ids_b = _run_ids(baseline_files, args.run_ids_baseline)
+    ids_t = {c: _run_ids(treated[c], "") for c in configs}
+    with inst.stage("render") as st:
+        fig, (ax, ax_d) = plt.subplots(
+            2, 1, figsize=(10, 8 + 0.15 * len(configs)), sharex=True, gridspec_kw={"height_ratios": [2, 1]}
+        )
+        n_px = 0 if args.full_res_plot else pixel_columns(fig, dpi=200)
+        y_plot = y if use_db else lin
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change_db = 20.0 * np.log10(np.abs(lin[1:]) / np.abs(lin[0]))
+        plotted = 0
+        for i, label in enumerate(["Baseline (mean)"] + [f"{c} (mean)" for c in configs]):
+            fx, fy = minmax_envelope(freq, y_plot[i], n_px)
+            ax.plot(fx, fy, label=label, **({"color": "k"} if i == 0 else {}))
+            plotted += fx.size
+            if i:
+                fx, fy = minmax_envelope(freq, change_db[i - 1], n_px)
+                ax_d.plot(fx, fy, label=configs[i - 1])
+        st["sizes"].update(plotted_points=plotted)
+        ax.set_ylabel("Magnitude (dB)" if use_db else "Magnitude (linear)")
+        ax.set_title(args.title or f"IX-Vibe {kind.upper()}: BASELINE vs {len(configs)} configurations")
+        ax.legend(fontsize=8)
+        ax_d.axhline(0.0, color="k", linewidth=0.8)
+        ax_d.set_xlabel("Frequency (Hz)")
+        ax_d.set_ylabel("Change vs baseline (dB)")
+        trace_b = TraceInfo(run_ids=ids_b, raw_files=baseline_files)
+        lines = [f"BASELINE: {trace_line(trace_b)}"]
+        lines += [f"{c}: {trace_line(TraceInfo(run_ids=ids_t[c], raw_files=treated[c]))}" for c in configs]
+        fig.text(0.01, 0.01, "\n".join(lines), fontsize=7, va="bottom")
+        outpath = os.path.join(args.outdir, outfile)
+        fig.tight_layout(rect=(0, 0.02 + 0.018 * len(lines), 1, 1))
+        fig.savefig(outpath, dpi=200)
+        plt.close(fig)
+
+    outputs = [outpath, peaks_out, ranking_out]
+    with inst.stage("tabulate"):
+        peaks.to_csv(peaks_out, index=False)
+        ranking.to_csv(ranking_out, index=False)
+        if band_set is not None:
+            bands.to_csv(bands_out, index=False)
+            outputs.append(bands_out)
+
+    if index_path():
+        # One index result per configuration, so queries by treated config find each of them.
+        for c in configs:
+            deltas, peak_rows = [], []
+            if not peaks.empty:
+                rows = peaks[peaks["config"] == c].rename(columns={"peak_freq_hz": "freq_hz"})
+                deltas += rows.assign(metric="peak").to_dict("records")
+                # roles as in plot_frf.py: the configuration is the result's treated config
+                for role in ("baseline", "treated"):
+                    level = rows[["freq_hz", f"{role}_value", "units"]].rename(columns={f"{role}_value": "value"})
+                    peak_rows += level.assign(role=role).to_dict("records")
+            if band_set is not None:
+                for s in by_stat:
+                    rows = bands.loc[
+                        bands["config"] == c,
+                        ["band_hz", f"baseline_{s}", f"treated_{s}", f"delta_{s}", f"delta_{s}_percent"],
+                    ]
+                    rows.columns = ["band_hz", "baseline_value", "treated_value", "delta", "delta_percent"]
+                    deltas += rows.assign(metric=f"band_{s}", units="linear").to_dict("records")
+            record_result(
+                "compare_configs",
+                f"{ranking_out}#{c}",
+                outputs=outputs,
+                params=argv,
+                baseline_files=baseline_files,
+                treated_files=treated[c],
+                run_ids_baseline=ids_b,
+                run_ids_treated=ids_t[c],
+                peaks=peak_rows,
+                deltas=deltas,
+            )
+
+    print(f"[IX-Vibe] Wrote plot: {outpath}")
+    print(f"[IX-Vibe] Wrote peak deltas: {peaks_out}")
+    if band_set is not None:
+        print(f"[IX-Vibe] Wrote band deltas: {bands_out}")
+    print(f"[IX-Vibe] Wrote ranking: {ranking_out}")
+    for _, r in ranking.iterrows():
+        print(f"[IX-Vibe] {r['rank']:2d}. {r['config']:12s} {rank_by} = {r[rank_by]:+.2f}")
+    sidecar = inst.write_sidecar(
+        outpath,
+        outputs=outputs,
+        run_ids=[*ids_b, *(i for c in configs for i in ids_t[c])],
+        raw_files=baseline_files + [f for c in configs for f in treated[c]],
+    )
+    if sidecar:
+        print(f"[IX-Vibe] Wrote perf: {sidecar}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+IX-Vibe rainflow counting and fatigue damage spectrum (v0.1)
+
+Purpose:
+- Fatigue, loosening and fretting are the failure modes the treatment targets; peak FRF /
+  SRS values do not say how much damage a long random-vibration or acoustic record does.
+- The fatigue damage spectrum (FDS) gives, per SDOF natural frequency, the Miner damage
+  a part tuned there would accumulate, so baseline vs treated damage ratios can be reported.
+
+Inputs:
+- Baseline / treated response (acceleration) time histories: CSV (streamed in chunks) or
+  .ixraw stores (memory-mapped), one or more channels each.
+
+Method (one pass over the record, bounded memory):
+- Each chunk runs through a bank of SDOF oscillators (ramp-invariant discretization,
+  pseudo-acceleration w^2 * z in input units); filter state is carried between chunks.
+- Turning points of every channel x oscillator response are found at once, and all series
+  are rainflow-counted together (ASTM E1049 four-point rule, applied in vectorized rounds
+  over one flat array; a cycle never spans two series).
+- Only each series' residue (the reversals not yet closed into a cycle, a few dozen
+  points) is carried to the next chunk; at the end the residue counts as half cycles.
+- Damage per cycle (Basquin S-N, N = C / S^b, S = cycle amplitude): D = sum(S^b) / C.
+
+Outputs:
+- CSV (long format): channel, fn_hz, baseline_damage, treated_damage, damage_ratio,
+  delta_db (10*log10 ratio). Damage is the mean damage rate over the runs scaled to
+  --exposure_s, so records of different length compare fairly.
+- PNG: baseline vs treated FDS per channel (log-log), with traceability footer.
+
+Notes:
+- With the default C = 1 damage is relative (units^b); the ratio does not depend on C.
+- b is the S-N slope of the part's material / joint (3-5 welded or fretting-prone joints,
+  up to ~10 for smooth steel); document the value used.
+
+Usage example:
+python scripts/fatigue.py --baseline base_01.ixraw,base_02.ixraw --treated treat_01.ixraw,treat_02.ixraw --b 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from scipy.signal import cont2discrete, lfilter
+
+from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, trace_line
+from raw_store import iter_time_history
+from results_index import index_path, record_result
+from srs_engine import natural_frequency_grid
+
+
+@dataclass(frozen=True)
+class FdsResult:
+    fn_hz: np.ndarray  # (n_fn,)
+    damage: np.ndarray  # (n_channels, n_fn) Miner damage over the record
+    cycles: np.ndarray  # (n_channels, n_fn) rainflow cycles (half cycles count 0.5)
+    duration_s: float
+    channels: List[str]
+    damping: float
+    b: float
+
+
+def turning_points(y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reversals of every row of y (n_series, n), first and last sample always kept.
+
+    Plateaus count as one point. Returns (values, series index), row-major and flat.
+    """
+    n_s, n = y.shape
+    if n < 3:
+        return y.ravel().copy(), np.repeat(np.arange(n_s), n)
+    d = np.diff(y, axis=1)
+    up = d > 0
+    down = d < 0
+    keep = np.ones((n_s, n), dtype=bool)
+    if (up | down).all():
+        keep[:, 1:-1] = (up[:, :-1] & down[:, 1:]) | (down[:, :-1] & up[:, 1:])
+    else:
+        # a flat step keeps the direction of the step before it (rare for filtered data)
+        s = up.astype(np.int8) - down
+        idx = np.where(s != 0, np.arange(n - 1), 0)
+        np.maximum.accumulate(idx, axis=1, out=idx)
+        s = np.take_along_axis(s, idx, axis=1)
+        keep[:, 1:-1] = (s[:, 1:] != s[:, :-1]) & (s[:, 1:] != 0) & (s[:, :-1] != 0)
+    rows = np.nonzero(keep)
+    return y[rows], rows[0]
+
+
+def _drop_non_reversals(vals: np.ndarray, seg: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Remove interior points that continue the previous direction (chunk junctions)."""
+    if vals.size < 3:
+        return vals, seg
+    inner = (seg[1:-1] == seg[:-2]) & (seg[1:-1] == seg[2:])
+    bad = np.zeros(vals.size, dtype=bool)
+    bad[1:-1] = inner & ((vals[1:-1] - vals[:-2]) * (vals[2:] - vals[1:-1]) >= 0)
+    return vals[~bad], seg[~bad]
+
+
+class StreamingRainflow:
+    """
+    Rainflow damage for many series at once, fed chunk by chunk.
+
+    update() takes the next samples of every series; only the open residue of each series
+    is kept between calls. finalize() closes the residue as half cycles.
+    """
+
+    def __init__(self, n_series: int, b: float, sn_c: float = 1.0):
+        self.n_series = n_series
+        self.b = float(b)
+        self.sn_c = float(sn_c)
+        self.damage = np.zeros(n_series)
+        self.cycles = np.zeros(n_series)
+        self.max_residue = 0
+        self._vals = np.zeros(0)
+        self._seg = np.zeros(0, dtype=np.int64)
+
+    def _add(self, seg: np.ndarray, ranges: np.ndarray, weight: float) -> None:
+        amp = 0.5 * ranges
+        self.damage += weight * np.bincount(seg, weights=amp**self.b, minlength=self.n_series) / self.sn_c
+        self.cycles += weight * np.bincount(seg, minlength=self.n_series)
+
+    def update(self, y: np.ndarray) -> None:
+        """y: (n_series, n) next samples of every series."""
+        y = np.asarray(y, dtype=float)
+        if y.shape[0] != self.n_series:
+            raise ValueError(f"Expected {self.n_series} series, got {y.shape[0]}.")
+        if y.shape[1] == 0:
+            return
+        if self._vals.size:
+            # re-find reversals with each series' last open point in front of the new samples
+            ends = np.r_[self._seg[1:] != self._seg[:-1], True]
+            last = np.zeros(self.n_series)
+            last[self._seg[ends]] = self._vals[ends]
+            tv, ts = turning_points(np.concatenate([last[:, None], y], axis=1))
+            first = np.r_[True, ts[1:] != ts[:-1]]
+            tv, ts = tv[~first], ts[~first]
+            vals = np.concatenate([self._vals, tv])
+            seg = np.concatenate([self._seg, ts])
+            order = np.argsort(seg, kind="stable")
+            vals, seg = _drop_non_reversals(vals[order], seg[order])
+        else:
+            vals, seg = turning_points(y)
+        self._vals, self._seg = self._count(vals, seg)
+        self.max_residue = max(self.max_residue, int(np.bincount(self._seg, minlength=1).max()))
+
+    def _count(self, vals: np.ndarray, seg: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Four-point rule in rounds: extract every non-overlapping closed cycle, repeat."""
+        while vals.size >= 4:
+            r = np.abs(np.diff(vals))
+            r_ab, r_bc, r_cd = r[:-2], r[1:-1], r[2:]
+            same = seg[:-3] == seg[3:]
+            cand = same & (r_bc <= r_ab) & (r_bc <= r_cd)
+            # candidates sharing a point: take the first of each run, the rest next round
+            cand[1:] &= ~cand[:-1]
+            hit = np.nonzero(cand)[0]
+            if hit.size == 0:
+                break
+            self._add(seg[hit + 1], r_bc[hit], 1.0)
+            drop = np.zeros(vals.size, dtype=bool)
+            drop[hit + 1] = True
+            drop[hit + 2] = True
+            vals, seg = vals[~drop], seg[~drop]
+        return vals, seg
+
+    def finalize(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Close the residue as half cycles. Returns (damage, cycles) per series."""
+        if self._vals.size > 1:
+            same = self._seg[1:] == self._seg[:-1]
+            r = np.abs(np.diff(self._vals))[same]
+            self._add(self._seg[1:][same], r, 0.5)
+        self._vals, self._seg = np.zeros(0), np.zeros(0, dtype=np.int64)
+        return self.damage, self.cycles
+
+
+def rainflow_damage(x: np.ndarray, b: float, sn_c: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Rainflow damage and cycle count of each row of x (n_series, n) held in memory."""
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    rf = StreamingRainflow(x.shape[0], b, sn_c)
+    rf.update(x)
+    return rf.finalize()
+
+
+def sdof_coefficients(fn_hz: np.ndarray, damping: float, fs: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Ramp-invariant (b, a) per oscillator for pseudo-acceleration w^2 * z under base acceleration."""
+    coeffs = []
+    for f in fn_hz:
+        w = 2.0 * np.pi * f
+        num, den, _ = cont2discrete(([w * w], [1.0, 2.0 * damping * w, w * w]), 1.0 / fs, method="foh")
+        coeffs.append((np.ravel(num), np.ravel(den)))
+    return coeffs
+
+
+def fatigue_damage_spectrum(
+    chunks: Iterable[Tuple[float, List[str], np.ndarray]],
+    fn_hz: np.ndarray,
+    damping: float = 0.05,
+    b: float = 5.0,
+    sn_c: float = 1.0,
+) -> FdsResult:
+    """
+    FDS of a streamed record.
+
+    chunks: (fs, channel names, data (n_channels, n)) blocks, as yielded by iter_time_history
+    fn_hz:  natural frequencies (Hz), below fs / 2
+    """
+    fn_hz = np.asarray(fn_hz, dtype=float)
+    rf = None
+    coeffs: List[Tuple[np.ndarray, np.ndarray]] = []
+    zi: Optional[np.ndarray] = None
+    n_total = 0
+    fs = 0.0
+    channels: List[str] = []
+    for fs, channels, data in chunks:
+        data = np.atleast_2d(data)
+        n_ch, n = data.shape
+        if rf is None:
+            if np.any(fn_hz <= 0) or np.any(fn_hz >= fs / 2.0):
+                raise ValueError("Natural frequencies must lie between 0 and the Nyquist frequency.")
+            coeffs = sdof_coefficients(fn_hz, damping, fs)
+            zi = np.zeros((fn_hz.size, n_ch, 2))
+            rf = StreamingRainflow(n_ch * fn_hz.size, b, sn_c)
+        # one lfilter call per oscillator covers all channels; series order is channel-major
+        resp = np.empty((n_ch, fn_hz.size, n))
+        for k, (bk, ak) in enumerate(coeffs):
+            resp[:, k], zi[k] = lfilter(bk, ak, data, axis=1, zi=zi[k])
+        rf.update(resp.reshape(n_ch * fn_hz.size, n))
+        n_total += n
+    if rf is None:
+        raise ValueError("Empty time history.")
+    damage, cycles = rf.finalize()
+    shape = (len(channels), fn_hz.size)
+    return FdsResult(
+        fn_hz=fn_hz,
+        damage=damage.reshape(shape),
+        cycles=cycles.reshape(shape),
+        duration_s=n_total / fs,
+        channels=list(channels),
+        damping=float(damping),
+        b=float(b),
+    )
+
+
+def _mean_damage_rate(
+    files: Sequence[str],
+    fn_hz: np.ndarray,
+    damping: float,
+    b: float,
+    sn_c: float,
+    chunk_rows: int,
+    sample_rate_hz: Optional[float],
+) -> Tuple[List[str], np.ndarray]:
+    """Mean damage per second over runs, per channel and natural frequency."""
+    rates = []
+    channels: List[str] = []
+    for f in files:
+        res = fatigue_damage_spectrum(
+            iter_time_history(f, chunk_rows=chunk_rows, sample_rate_hz=sample_rate_hz), fn_hz, damping, b, sn_c
+        )
+        if channels and res.channels != channels:
+            raise ValueError(f"Channel mismatch in {f}: {res.channels} vs {channels}")
+        channels = res.channels
+        rates.append(res.damage / res.duration_s)
+    return channels, np.mean(rates, axis=0)
+
+
+def fds_table(channels: Sequence[str], fn_hz: np.ndarray, base: np.ndarray, treat: np.ndarray) -> pd.DataFrame:
+    """Long-format baseline vs treated FDS with damage ratios."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(base > 0, treat / base, np.nan)
+        delta_db = 10.0 * np.log10(ratio)
+    n_ch = len(channels)
+    return pd.DataFrame(
+        {
+            "channel": np.repeat(list(channels), fn_hz.size),
+            "fn_hz": np.tile(fn_hz, n_ch),
+            "baseline_damage": base.ravel(),
+            "treated_damage": treat.ravel(),
+            "damage_ratio": ratio.ravel(),
+            "delta_db": delta_db.ravel(),
+        }
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Fatigue damage spectrum (rainflow + Miner) baseline vs treated.")
+    ap.add_argument("--baseline", required=True, help="Comma-separated baseline time-history CSV / .ixraw files")
+    ap.add_argument("--treated", required=True, help="Comma-separated treated time-history CSV / .ixraw files")
+    ap.add_argument("--run_ids_baseline", default="", help="Comma-separated baseline run IDs")
+    ap.add_argument("--run_ids_treated", default="", help="Comma-separated treated run IDs")
+    ap.add_argument("--sample_rate_hz", type=float, default=None, help="Sample rate if CSVs have no time column")
+    ap.add_argument("--fn_min", type=float, default=10.0, help="Lowest natural frequency (Hz)")
+    ap.add_argument("--fn_max", type=float, default=2000.0, help="Highest natural frequency (Hz)")
+    ap.add_argument("--points_per_octave", type=int, default=6, help="Natural frequencies per octave")
+    ap.add_argument("--damping", type=float, default=0.05, help="Oscillator damping ratio (0.05 = Q of 10)")
+    ap.add_argument("--b", type=float, default=5.0, help="S-N (Basquin) slope")
+    ap.add_argument("--sn_c", type=float, default=1.0, help="S-N constant C (1 = relative damage)")
+    ap.add_argument("--exposure_s", type=float, default=3600.0, help="Damage is reported for this exposure time (s)")
+    ap.add_argument("--chunk_rows", type=int, default=16384, help="Samples per streamed chunk")
+    ap.add_argument("--title", default="IX-Vibe Fatigue Damage Spectrum: Baseline vs Treated", help="Plot title")
+    ap.add_argument("--outdir", default="results/plots", help="Output directory for the plot")
+    ap.add_argument("--outfile", default="fds_baseline_vs_treated.png", help="Output plot filename")
+    ap.add_argument("--out", default="results/output/fds_deltas.csv", help="Output FDS table CSV")
+    args = ap.parse_args(argv)
+
+    baseline_files = list(parse_csv_list(args.baseline))
+    treated_files = list(parse_csv_list(args.treated))
+    if not baseline_files or not treated_files:
+        raise ValueError("Need at least one baseline and one treated time history.")
+
+    fn = natural_frequency_grid(args.fn_min, args.fn_max, args.points_per_octave)
+    opts = (args.damping, args.b, args.sn_c, args.chunk_rows, args.sample_rate_hz)
+    channels, rate_b = _mean_damage_rate(baseline_files, fn, *opts)
+    channels_t, rate_t = _mean_damage_rate(treated_files, fn, *opts)
+    if channels_t != channels:
+        raise ValueError(f"Baseline and treated channels differ: {channels} vs {channels_t}")
+    table = fds_table(channels, fn, rate_b * args.exposure_s, rate_t * args.exposure_s)
+
+    ensure_dir(args.outdir)
+    ensure_dir(os.path.dirname(args.out) or ".")
+    table.to_csv(args.out, index=False)
+
+    notes = f"FDS b={args.b:g}, damping={args.damping:g}, exposure={args.exposure_s:g} s"
+    trace_b = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files, notes=notes)
+    trace_t = TraceInfo(run_ids=parse_run_ids(args.run_ids_treated), raw_files=treated_files, notes=notes)
+    plt.figure()
+    for i, ch in enumerate(channels):
+        line = plt.plot(fn, rate_b[i] * args.exposure_s, label=f"Baseline {ch}")[0]
+        plt.plot(fn, rate_t[i] * args.exposure_s, "--", color=line.get_color(), label=f"Treated {ch}")
+    plt.xscale("log")
+    plt.yscale("log")
+    plt.xlabel("Natural frequency (Hz)")
+    plt.ylabel(f"Damage per {args.exposure_s:g} s" + (" (relative, C = 1)" if args.sn_c == 1.0 else ""))
+    plt.title(args.title)
+    plt.legend(fontsize=7)
+    footer = f"BASELINE: {trace_line(trace_b)}\nTREATED: {trace_line(trace_t)}"
+    plt.gcf().text(0.01, 0.01, footer, fontsize=8, va="bottom")
+    outpath = os.path.join(args.outdir, args.outfile)
+    plt.tight_layout()
+    plt.savefig(outpath, dpi=200)
+    plt.close()
+
+    if index_path():
+        record_result(
+            "fatigue",
+            args.out,
+            outputs=[outpath, args.out],
+            params=argv,
+            baseline_files=baseline_files,
+            treated_files=treated_files,
+            run_ids_baseline=trace_b.run_ids,
+            run_ids_treated=trace_t.run_ids,
+            deltas=table.rename(
+                columns={"fn_hz": "freq_hz", "baseline_damage": "baseline_value", "treated_damage": "treated_value"}
+            )
+            .assign(
+                metric="fds",
+                delta=lambda d: d["treated_value"] - d["baseline_value"],
+                delta_percent=lambda d: 100.0 * (d["damage_ratio"] - 1.0),
+            )
+            .to_dict("records"),
+        )
+
+    print(f"[IX-Vibe] Wrote plot: {outpath}")
+    print(f"[IX-Vibe] Wrote FDS table: {args.out}")
+    for ch, grp in table.groupby("channel", sort=False):
+        worst = grp.loc[grp["damage_ratio"].idxmax()] if grp["damage_ratio"].notna().any() else None
+        if worst is not None:
+            print(
+                f"[IX-Vibe] {ch}: worst damage ratio {worst['damage_ratio']:.3g} at {worst['fn_hz']:.1f} Hz "
+                f"({worst['delta_db']:+.1f} dB), b={args.b:g}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+IX-Vibe frequency-domain decomposition: mode shapes and MAC (v0.1)
+
+Purpose:
+- Treatment placement is confirmed with "simple mode shape inference from multi-point
+  accelerometers" (docs/06, Module A). This estimates operating mode shapes from all
+  sensors at once and compares baseline and treated shapes with the MAC.
+
+Inputs:
+- Baseline and treated multi-channel response time histories (CSV or .ixraw), one or more
+  runs each, same channels in every file. Force / time columns are left out (--exclude).
+
+Method:
+- Cross-spectral density matrix G(f) = E[X(f) X(f)^H] over all sensors by streaming Welch
+  (Hann, 50% overlap); every segment of every run adds to one (n_freq, n_ch, n_ch) stack
+  via a single batched matrix product per chunk.
+- FDD: per-line SVD of G(f) on the whole stack at once. G is Hermitian positive
+  semi-definite, so its singular values are its eigenvalues and the batched Hermitian
+  eigen-solver is used (np.linalg.eigvalsh for all lines, eigh only at picked peaks).
+- Modes: peaks of the first singular value (dB, --prominence, --top_n); the shape is the
+  first singular vector there, rotated so its largest entry is real and positive, unit norm.
+  MPC (modal phase collinearity, 1 = real / normal mode) and the s1/s2 separation are
+  reported to flag close or complex modes.
+- MAC(a, b) = |a^H b|^2 / ((a^H a)(b^H b)) between every baseline and treated shape; each
+  baseline mode is paired with its highest-MAC treated mode.
+
+Outputs:
+- --modes_out: config, mode, freq_hz, sv1_db, sv1_sv2_db, mpc, one column per channel
+  (signed real part of the shape)
+- --mac_out:   baseline_mode, baseline_freq_hz, treated_mode, treated_freq_hz,
+  freq_shift_percent, mac, plus one column per treated mode (the full MAC matrix)
+- PNG: first singular values baseline vs treated with picked modes, and the MAC matrix
+
+Notes:
+- Memory is n_freq x n_ch^2 x 16 bytes for G; --f_min / --f_max keep only the band of
+  interest (e.g. 32 channels x 16k lines ~ 270 MB).
+- FDD assumes broadband, roughly white excitation (random / acoustic / ambient). Peaks of
+  the excitation spectrum itself are not modes; check the MPC and the s1/s2 separation.
+
+Usage example:
+python scripts/fdd.py --baseline base_01.ixraw,base_02.ixraw --treated treat_01.ixraw --nperseg 8192 --f_max 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import get_window
+
+from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, trace_line
+from modal import detect_run_peaks
+from raw_store import iter_time_history
+
+# Frequency lines per batched decomposition; bounds the eigen-solver temporaries.
+_LINES_PER_BLOCK = 4096
+
+
+@dataclass(frozen=True)
+class ModeSet:
+    freq_hz: np.ndarray  # (n_modes,)
+    bins: np.ndarray  # (n_modes,) frequency line of each mode
+    shapes: np.ndarray  # (n_ch, n_modes), complex, unit norm
+    sv1_db: np.ndarray  # (n_modes,)
+    sv_sep_db: np.ndarray  # (n_modes,) s1 / s2 in dB
+    mpc: np.ndarray  # (n_modes,)
+
+
+class CsdAccumulator:
+    """
+    Streaming Welch cross-spectral density matrix over all channels.
+
+    update() takes (n_ch, n) blocks of one run; new_run() drops the carry-over so segments
+    never straddle two recordings.
+    """
+
+    def __init__(
+        self,
+        sample_rate_hz: float,
+        n_channels: int,
+        nperseg: int = 4096,
+        overlap: float = 0.5,
+        f_min: float = 0.0,
+        f_max: Optional[float] = None,
+    ):
+        if nperseg < 2:
+            raise ValueError("nperseg must be at least 2.")
+        if not 0.0 <= overlap < 1.0:
+            raise ValueError("overlap must be in [0, 1).")
+        self.fs = float(sample_rate_hz)
+        self.nperseg = int(nperseg)
+        self.step = max(1, int(round(self.nperseg * (1.0 - overlap))))
+        self.window = get_window("hann", self.nperseg)
+        freq = np.fft.rfftfreq(self.nperseg, d=1.0 / self.fs)
+        keep = (freq >= f_min) & (freq <= (f_max if f_max else freq[-1]))
+        if not keep.any():
+            raise ValueError(f"No frequency lines between {f_min:g} and {f_max} Hz.")
+        self._lines = slice(int(np.argmax(keep)), int(np.argmax(keep)) + int(keep.sum()))
+        self.freq_hz = freq[self._lines]
+        self.g = np.zeros((self.freq_hz.size, n_channels, n_channels), dtype=complex)
+        self.n_averages = 0
+        self._carry = np.zeros((n_channels, 0))
+
+    def new_run(self) -> None:
+        self._carry = np.zeros((self._carry.shape[0], 0))
+
+    def update(self, block: np.ndarray) -> None:
+        buf = np.concatenate([self._carry, block], axis=1) if self._carry.size else np.asarray(block, dtype=float)
+        n_seg = (buf.shape[1] - self.nperseg) // self.step + 1 if buf.shape[1] >= self.nperseg else 0
+        if n_seg > 0:
+            segs = sliding_window_view(buf, self.nperseg, axis=1)[:, : (n_seg - 1) * self.step + 1 : self.step]
+            segs = segs - segs.mean(axis=2, keepdims=True)
+            spec = np.fft.rfft(segs * self.window, axis=2)[:, :, self._lines]  # (n_ch, n_seg, n_freq)
+            x = np.ascontiguousarray(spec.transpose(2, 0, 1))  # (n_freq, n_ch, n_seg)
+            self.g += x @ np.conj(x.transpose(0, 2, 1))
+            self.n_averages += n_seg
+        self._carry = buf[:, n_seg * self.step :].copy()
+
+    def result(self) -> np.ndarray:
+        """One-sided CSD matrix (units^2/Hz), shape (n_freq, n_ch, n_ch)."""
+        if self.n_averages == 0:
+            raise ValueError(f"Recordings shorter than one segment ({self.nperseg} samples).")
+        scale = 2.0 / (self.fs * np.sum(self.window**2) * self.n_averages)
+        return self.g * scale
+
+
+def csd_matrix(
+    files: Sequence[str],
+    nperseg: int,
+    overlap: float = 0.5,
+    f_min: float = 0.0,
+    f_max: Optional[float] = None,
+    exclude: Sequence[str] = (),
+    chunk_rows: int = 65536,
+    sample_rate_hz: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray, List[str], int]:
+    """CSD matrix averaged over all runs. Returns (freq_hz, G, channels, n_averages)."""
+    acc: Optional[CsdAccumulator] = None
+    channels: List[str] = []
+    for path in files:
+        for fs, names, data in iter_time_history(path, chunk_rows=chunk_rows, sample_rate_hz=sample_rate_hz):
+            rows = [i for i, c in enumerate(names) if c not in exclude]
+            if acc is None:
+                channels = [names[i] for i in rows]
+                if len(channels) < 2:
+                    raise ValueError(f"Mode shapes need at least 2 response channels ({path}: {channels}).")
+                acc = CsdAccumulator(fs, len(channels), nperseg, overlap, f_min, f_max)
+            elif [names[i] for i in rows] != channels or fs != acc.fs:
+                raise ValueError(f"{path}: channels / sample rate differ from the first file.")
+            acc.update(data[rows])
+        if acc is not None:
+            acc.new_run()
+    if acc is None:
+        raise ValueError("No samples read.")
+    return acc.freq_hz, acc.result(), channels, acc.n_averages
+
+
+def singular_values(g: np.ndarray, n_sv: int = 3) -> np.ndarray:
+    """Largest n_sv singular values of every line of G, shape (n_sv, n_freq), descending."""
+    out = np.empty((n_sv, g.shape[0]))
+    for i in range(0, g.shape[0], _LINES_PER_BLOCK):
+        w = np.linalg.eigvalsh(g[i : i + _LINES_PER_BLOCK])  # ascending per line
+        out[:, i : i + _LINES_PER_BLOCK] = np.maximum(w[:, ::-1][:, :n_sv], 0.0).T
+    return out
+
+
+def _normalize_shapes(u: np.ndarray) -> np.ndarray:
+    """Rotate each column so its largest entry is real positive; unit norm."""
+    idx = np.argmax(np.abs(u), axis=0)
+    ref = u[idx, np.arange(u.shape[1])]
+    u = u * (np.conj(ref) / np.maximum(np.abs(ref), np.finfo(float).tiny))
+    return u / np.linalg.norm(u, axis=0, keepdims=True)
+
+
+def modal_phase_collinearity(u: np.ndarray) -> np.ndarray:
+    """MPC per column: 1 for a real (normal) mode shape, 0 for a circular one."""
+    re, im = u.real, u.imag
+    sxx = np.sum(re * re, axis=0)
+    syy = np.sum(im * im, axis=0)
+    sxy = np.sum(re * im, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return ((sxx - syy) ** 2 + 4.0 * sxy**2) / (sxx + syy) ** 2
+
+
+def pick_modes(freq: np.ndarray, g: np.ndarray, sv: np.ndarray, prominence_db: float, top_n: Optional[int]) -> ModeSet:
+    """Peaks of the first singular value and the first singular vector at each."""
+    sv_db = 10.0 * np.log10(np.maximum(sv, np.finfo(float).tiny))
+    _, bins = detect_run_peaks(sv_db[0], prominence_db, top_n=top_n)
+    bins = np.sort(bins)
+    _, vecs = np.linalg.eigh(g[bins])  # (n_modes, n_ch, n_ch), ascending eigenvalues
+    shapes = _normalize_shapes(vecs[:, :, -1].T) if bins.size else np.zeros((g.shape[1], 0), dtype=complex)
+    sep = sv_db[0, bins] - sv_db[1, bins] if sv.shape[0] > 1 else np.full(bins.size, np.nan)
+    return ModeSet(
+        freq_hz=freq[bins],
+        bins=bins,
+        shapes=shapes,
+        sv1_db=sv_db[0, bins],
+        sv_sep_db=sep,
+        mpc=modal_phase_collinearity(shapes),
+    )
+
+
+def mac_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """MAC between the columns of a (n_ch, m) and b (n_ch, k), shape (m, k)."""
+    num = np.abs(np.conj(a).T @ b) ** 2
+    den = np.real(np.sum(np.conj(a) * a, axis=0))[:, None] * np.real(np.sum(np.conj(b) * b, axis=0))[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def modes_frame(config: str, modes: ModeSet, channels: Sequence[str]) -> pd.DataFrame:
+    table = pd.DataFrame(
+        {
+            "config": config,
+            "mode": np.arange(1, modes.freq_hz.size + 1),
+            "freq_hz": modes.freq_hz,
+            "sv1_db": modes.sv1_db,
+            "sv1_sv2_db": modes.sv_sep_db,
+            "mpc": modes.mpc,
+        }
+    )
+    shapes = pd.DataFrame(modes.shapes.real.T, columns=list(channels))
+    return pd.concat([table, shapes], axis=1)
+
+
+def mac_pairing(base: ModeSet, treat: ModeSet, mac: np.ndarray) -> pd.DataFrame:
+    """Each baseline mode with its best-matching treated mode, plus the full MAC row."""
+    rows = []
+    for i in range(base.freq_hz.size):
+        row = {"baseline_mode": i + 1, "baseline_freq_hz": base.freq_hz[i]}
+        if treat.freq_hz.size:
+            j = int(np.nanargmax(mac[i])) if np.isfinite(mac[i]).any() else 0
+            row.update(
+                treated_mode=j + 1,
+                treated_freq_hz=treat.freq_hz[j],
+                freq_shift_percent=100.0 * (treat.freq_hz[j] - base.freq_hz[i]) / base.freq_hz[i],
+                mac=mac[i, j],
+            )
+        row.update({f"mac_t{j + 1}": mac[i, j] for j in range(treat.freq_hz.size)})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="FDD mode shapes from multi-point accelerometers, baseline vs treated MAC.")
+    ap.add_argument("--baseline", required=True, help="Comma-separated baseline multi-channel time histories")
+    ap.add_argument("--treated", required=True, help="Comma-separated treated multi-channel time histories")
+    ap.add_argument("--run_ids_baseline", default="", help="Comma-separated baseline run IDs")
+    ap.add_argument("--run_ids_treated", default="", help="Comma-separated treated run IDs")
+    ap.add_argument("--exclude", default="force", help="Comma-separated channels to leave out (e.g. the force input)")
+    ap.add_argument("--sample_rate_hz", type=float, default=None, help="Sample rate if CSVs have no time column")
+    ap.add_argument("--nperseg", type=int, default=4096, help="Welch segment length (samples)")
+    ap.add_argument("--overlap", type=float, default=0.5, help="Welch segment overlap fraction")
+    ap.add_argument("--f_min", type=float, default=0.0, help="Lowest frequency kept (Hz)")
+    ap.add_argument("--f_max", type=float, default=None, help="Highest frequency kept (Hz)")
+    ap.add_argument("--prominence", type=float, default=6.0, help="Peak prominence on the first singular value (dB)")
+    ap.add_argument("--top_n", type=int, default=8, help="Modes kept per configuration (strongest peaks)")
+    ap.add_argument("--chunk_rows", type=int, default=65536, help="Rows read per chunk (memory bound)")
+    ap.add_argument("--title", default="IX-Vibe FDD: Baseline vs Treated", help="Plot title")
+    ap.add_argument("--outdir", default="results/plots", help="Output directory for the plot")
+    ap.add_argument("--outfile", default="fdd_baseline_vs_treated.png", help="Output plot filename")
+    ap.add_argument("--modes_out", default="results/output/fdd_modes.csv", help="Mode table CSV")
+    ap.add_argument("--mac_out", default="results/output/fdd_mac.csv", help="MAC pairing / matrix CSV")
+    args = ap.parse_args(argv)
+
+    baseline_files = list(parse_csv_list(args.baseline))
+    treated_files = list(parse_csv_list(args.treated))
+    exclude = [c.strip().lower() for c in args.exclude.split(",") if c.strip()] + ["time_s", "time", "t", "seconds"]
+    opts = dict(
+        nperseg=args.nperseg,
+        overlap=args.overlap,
+        f_min=args.f_min,
+        f_max=args.f_max,
+        exclude=exclude,
+        chunk_rows=args.chunk_rows,
+        sample_rate_hz=args.sample_rate_hz,
+    )
+    freq, g_b, channels, n_b = csd_matrix(baseline_files, **opts)
+    freq_t, g_t, channels_t, n_t = csd_matrix(treated_files, **opts)
+    if channels_t != channels or freq_t.size != freq.size:
+        raise ValueError(f"Baseline and treated channels / frequency lines differ: {channels} vs {channels_t}")
+
+    sv_b, sv_t = singular_values(g_b), singular_values(g_t)
+    modes_b = pick_modes(freq, g_b, sv_b, args.prominence, args.top_n)
+    modes_t = pick_modes(freq, g_t, sv_t, args.prominence, args.top_n)
+    mac = mac_matrix(modes_b.shapes, modes_t.shapes)
+
+    ensure_dir(args.outdir)
+    for path in (args.modes_out, args.mac_out):
+        ensure_dir(os.path.dirname(path) or ".")
+    pd.concat([modes_frame("baseline", modes_b, channels), modes_frame("treated", modes_t, channels)]).to_csv(
+        args.modes_out, index=False
+    )
+    pairs = mac_pairing(modes_b, modes_t, mac)
+    pairs.to_csv(args.mac_out, index=False)
+
+    notes = f"FDD {len(channels)} ch, nperseg={args.nperseg}, averages {n_b}/{n_t}"
+    trace_b = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files, notes=notes)
+    trace_t = TraceInfo(run_ids=parse_run_ids(args.run_ids_treated), raw_files=treated_files, notes=notes)
+    fig, (ax_sv, ax_mac) = plt.subplots(1, 2, figsize=(12, 5), gridspec_kw={"width_ratios": [2, 1]})
+    for sv, modes, label in ((sv_b, modes_b, "Baseline"), (sv_t, modes_t, "Treated")):
+        db = 10.0 * np.log10(np.maximum(sv[0], np.finfo(float).tiny))
+        line = ax_sv.plot(freq, db, label=f"{label} s1")[0]
+        ax_sv.plot(modes.freq_hz, modes.sv1_db, "v", color=line.get_color())
+    ax_sv.set_xlabel("Frequency (Hz)")
+    ax_sv.set_ylabel("First singular value (dB re units^2/Hz)")
+    ax_sv.set_title(args.title)
+    ax_sv.legend()
+    im = ax_mac.imshow(mac, vmin=0.0, vmax=1.0, cmap="viridis", aspect="auto")
+    ax_mac.set_xticks(range(modes_t.freq_hz.size), [f"{f:.0f}" for f in modes_t.freq_hz], rotation=90, fontsize=7)
+    ax_mac.set_yticks(range(modes_b.freq_hz.size), [f"{f:.0f}" for f in modes_b.freq_hz], fontsize=7)
+    ax_mac.set_xlabel("Treated mode (Hz)")
+    ax_mac.set_ylabel("Baseline mode (Hz)")
+    ax_mac.set_title("MAC")
+    fig.colorbar(im, ax=ax_mac)
+    footer = f"BASELINE: {trace_line(trace_b)}\nTREATED: {trace_line(trace_t)}"
+    fig.text(0.01, 0.01, footer, fontsize=8, va="bottom")
+    outpath = os.path.join(args.outdir, args.outfile)
+    fig.tight_layout(rect=(0, 0.06, 1, 1))
+    fig.savefig(outpath, dpi=200)
+    plt.close(fig)
+
+    print(f"[IX-Vibe] Wrote plot: {outpath}")
+    print(f"[IX-Vibe] Wrote modes: {args.modes_out} ({modes_b.freq_hz.size} baseline, {modes_t.freq_hz.size} treated)")
+    print(f"[IX-Vibe] Wrote MAC: {args.mac_out}")
+    for _, r in pairs.dropna(subset=["mac"]).iterrows() if "mac" in pairs else []:
+        print(
+            f"[IX-Vibe] mode {r['baseline_freq_hz']:8.1f} Hz -> {r['treated_freq_hz']:8.1f} Hz "
+            f"({r['freq_shift_percent']:+.1f}%), MAC {r['mac']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+IX-Vibe FRF estimator (v0.1)
+
+Inputs:
+- One or more raw time-history CSVs with an input-force channel and response channels
+  (hammer or shaker data; time column + one column per channel)
+
+Output:
+- One FRF CSV per response channel:
+  freq_hz, mag (|H1|), h1_real, h1_imag, h2_mag, phase_deg, coherence
+  `mag` is what read_spectrum_csv / plot_frf.py / summarize_deltas.py pick up.
+
+Method:
+- Welch averaging (Hann window, 50% overlap by default) of the input auto-spectrum Gxx,
+  response auto-spectra Gyy and cross-spectra Gxy.
+- H1 = Gxy / Gxx (noise on the response), H2 = Gyy / Gyx (noise on the input),
+  coherence = |Gxy|^2 / (Gxx * Gyy).
+- The recording is read in fixed-size row chunks and the spectra are accumulated
+  incrementally, so memory does not grow with recording length.
+- --workers > 1 splits the response channels across processes; each process streams
+  only the force column plus its own channels.
+
+Notes:
+- Coherence well below 1 at a peak means the FRF there is not trustworthy. Report it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import get_window
+
+from common_io import _normalize_name, ensure_dir, parse_csv_list
+from raw_store import RAW_EXT, RawRecording, iter_time_history
+
+
+@dataclass(frozen=True)
+class FrfEstimate:
+    freq_hz: np.ndarray  # (n_freq,)
+    channels: Sequence[str]
+    h1: np.ndarray  # (n_channels, n_freq), complex
+    h2: np.ndarray  # (n_channels, n_freq), complex
+    coherence: np.ndarray  # (n_channels, n_freq)
+    n_averages: int
+
+
+class WelchAccumulator:
+    """
+    Incremental Welch cross/auto-spectrum accumulator for one input and N responses.
+
+    Feed arbitrary-length blocks with update(); only one segment of carry-over samples
+    and the running spectral sums are kept between calls.
+    """
+
+    def __init__(self, sample_rate_hz: float, n_responses: int, nperseg: int = 4096, overlap: float = 0.5):
+        if nperseg < 2:
+            raise ValueError("nperseg must be at least 2.")
+        if not 0.0 <= overlap < 1.0:
+            raise ValueError("overlap must be in [0, 1).")
+        self.fs = float(sample_rate_hz)
+        self.nperseg = int(nperseg)
+        self.step = max(1, int(round(self.nperseg * (1.0 - overlap))))
+        self.window = get_window("hann", self.nperseg)
+        n_freq = self.nperseg // 2 + 1
+        self.gxx = np.zeros(n_freq)
+        self.gyy = np.zeros((n_responses, n_freq))
+        self.gxy = np.zeros((n_responses, n_freq), dtype=complex)
+        self.n_averages = 0
+        self._carry = np.zeros((n_responses + 1, 0))
+
+    def update(self, force: np.ndarray, responses: np.ndarray) -> None:
+        """Add a block of samples. force: (n,), responses: (n_responses, n)."""
+        block = np.vstack([np.asarray(force, dtype=float)[None, :], np.atleast_2d(responses)])
+        buf = np.concatenate([self._carry, block], axis=1) if self._carry.size else block
+        n_seg = (buf.shape[1] - self.nperseg) // self.step + 1 if buf.shape[1] >= self.nperseg else 0
+        if n_seg > 0:
+            segs = sliding_window_view(buf, self.nperseg, axis=1)[:, : (n_seg - 1) * self.step + 1 : self.step]
+            segs = segs - segs.mean(axis=2, keepdims=True)
+            spec = np.fft.rfft(segs * self.window, axis=2)  # (n_ch + 1, n_seg, n_freq)
+            x, y = spec[0], spec[1:]
+            self.gxx += np.sum(np.abs(x) ** 2, axis=0)
+            self.gyy += np.sum(np.abs(y) ** 2, axis=1)
+            self.gxy += np.sum(np.conj(x)[None, :, :] * y, axis=1)
+            self.n_averages += n_seg
+        self._carry = buf[:, n_seg * self.step :].copy()
+
+    def result(self, channels: Sequence[str]) -> FrfEstimate:
+        if self.n_averages == 0:
+            raise ValueError(f"Recording shorter than one segment ({self.nperseg} samples).")
+        tiny = np.finfo(float).tiny
+        gxx = np.maximum(self.gxx, tiny)
+        h1 = self.gxy / gxx
+        h2 = self.gyy / np.where(np.abs(self.gxy) > 0, np.conj(self.gxy), tiny)
+        coh = np.abs(self.gxy) ** 2 / np.maximum(gxx * self.gyy, tiny)
+        return FrfEstimate(
+            freq_hz=np.fft.rfftfreq(self.nperseg, d=1.0 / self.fs),
+            channels=list(channels),
+            h1=h1,
+            h2=h2,
+            coherence=np.clip(coh, 0.0, 1.0),
+            n_averages=self.n_averages,
+        )
+
+
+def estimate_frf_csv(
+    path: str,
+    force_col: str,
+    response_cols: Sequence[str],
+    nperseg: int = 4096,
+    overlap: float = 0.5,
+    chunk_rows: int = 65536,
+    sample_rate_hz: Optional[float] = None,
+) -> FrfEstimate:
+    """Stream one time-history CSV through a WelchAccumulator."""
+    acc: Optional[WelchAccumulator] = None
+    for fs, _, data in iter_time_history(
+        path, chunk_rows=chunk_rows, sample_rate_hz=sample_rate_hz, channels=[force_col, *response_cols]
+    ):
+        if acc is None:
+            acc = WelchAccumulator(fs, len(response_cols), nperseg=nperseg, overlap=overlap)
+        acc.update(data[0], data[1:])
+    if acc is None:
+        raise ValueError(f"No samples read from {path}.")
+    return acc.result(response_cols)
+
+
+def frf_frame(est: FrfEstimate, channel: int = 0) -> pd.DataFrame:
+    """One response channel of an FrfEstimate as a spectrum table readable by read_spectrum_csv."""
+    h1 = est.h1[channel]
+    return pd.DataFrame(
+        {
+            "freq_hz": est.freq_hz,
+            "mag": np.abs(h1),
+            "h1_real": h1.real,
+            "h1_imag": h1.imag,
+            "h2_mag": np.abs(est.h2[channel]),
+            "phase_deg": np.degrees(np.angle(h1)),
+            "coherence": est.coherence[channel],
+        }
+    )
+
+
+def _response_channels(path: str, force_col: str, responses: Sequence[str]) -> List[str]:
+    if responses:
+        return [_normalize_name(c) for c in responses]
+    if path.endswith(RAW_EXT):
+        cols = RawRecording(path).channels
+    else:
+        cols = [_normalize_name(c) for c in pd.read_csv(path, nrows=0).columns]
+    skip = {force_col, "time_s", "time", "t", "seconds"}
+    return [c for c in cols if c not in skip]
+
+
+def _split(items: Sequence[str], n: int) -> List[List[str]]:
+    n = max(1, min(n, len(items)))
+    return [list(items[i::n]) for i in range(n)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Estimate H1/H2 FRFs and coherence from raw time histories.")
+    ap.add_argument("--inputs", required=True, help="Comma-separated time-history CSV (or .ixraw) files")
+    ap.add_argument("--force_col", default="force", help="Input force channel column name")
+    ap.add_argument("--response_cols", default="", help="Comma-separated response columns (default: all others)")
+    ap.add_argument("--outdir", default="results/output", help="Output directory for FRF CSVs")
+    ap.add_argument("--sample_rate_hz", type=float, default=None, help="Sample rate if CSVs have no time column")
+    ap.add_argument("--nperseg", type=int, default=4096, help="Welch segment length (samples)")
+    ap.add_argument("--overlap", type=float, default=0.5, help="Welch segment overlap fraction")
+    ap.add_argument("--chunk_rows", type=int, default=65536, help="Rows read per chunk (memory bound)")
+    ap.add_argument("--workers", type=int, default=1, help="Processes to split response channels across")
+    args = ap.parse_args(argv)
+
+    ensure_dir(args.outdir)
+    force_col = _normalize_name(args.force_col)
+    response_cols = [c.strip() for c in args.response_cols.split(",") if c.strip()]
+    params = dict(
+        nperseg=args.nperseg,
+        overlap=args.overlap,
+        chunk_rows=args.chunk_rows,
+        sample_rate_hz=args.sample_rate_hz,
+    )
+
+    for path in parse_csv_list(args.inputs):
+        responses = _response_channels(path, force_col, response_cols)
+        groups = _split(responses, args.workers)
+        if len(groups) == 1:
+            estimates = [estimate_frf_csv(path, force_col, groups[0], **params)]
+        else:
+            with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+                futures = [pool.submit(estimate_frf_csv, path, force_col, g, **params) for g in groups]
+                estimates = [f.result() for f in futures]
+
+        stem = os.path.splitext(os.path.basename(path))[0]
+        for est in estimates:
+            for i, name in enumerate(est.channels):
+                outpath = os.path.join(args.outdir, f"{stem}_{name}_frf.csv")
+                frf_frame(est, i).to_csv(outpath, index=False)
+                print(f"[IX-Vibe] Wrote FRF: {outpath} (averages = {est.n_averages})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+IX-Vibe stage instrumentation (v0.1)
+
+Purpose:
+- Record where a script spends time and memory, per pipeline stage
+  (load, aggregate, detect, tabulate, render), next to the traceability record.
+
+Per stage:
+- wall_s, cpu_s        perf_counter / process_time deltas
+- rss_peak_mb          process peak RSS (high-water mark) at stage end
+- rss_peak_growth_mb   how much this stage raised the high-water mark
+- sizes                array sizes noted by the caller (points, runs, ...)
+
+Sidecar:
+- <primary output>.perf.json with the stages, the trace (run IDs, raw files) and the
+  list of outputs, written when --perf is passed or IXVIBE_PERF=1 is set.
+
+Profiling:
+- --profile_stage <name> (or IXVIBE_PROFILE_STAGE) runs that one stage under cProfile and
+  writes <primary output>.<stage>.prof (view with `python -m pstats` or snakeviz).
+
+Notes:
+- Peak RSS comes from resource.getrusage; on platforms without it the field is null.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PERF_ENV = "IXVIBE_PERF"
+PROFILE_ENV = "IXVIBE_PROFILE_STAGE"
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+class Instrumentation:
+    """Collects per-stage timing / memory records for one script invocation."""
+
+    def __init__(self, script: str, enabled: Optional[bool] = None, profile_stage: Optional[str] = None):
+        self.script = script
+        self.enabled = enabled if enabled is not None else os.environ.get(PERF_ENV, "") in ("1", "true", "yes")
+        self.profile_stage = profile_stage or os.environ.get(PROFILE_ENV) or None
+        self.stages: List[dict] = []
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **sizes) -> Iterator[dict]:
+        """Time a block. The yielded record's "sizes" dict can be filled in inside the block."""
+        record = {"stage": name, "sizes": dict(sizes)}
+        rss0 = peak_rss_mb()
+        prof = cProfile.Profile() if name == self.profile_stage else None
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield record
+        finally:
+            if prof is not None:
+                prof.disable()
+                self._profiles[name] = prof
+            rss1 = peak_rss_mb()
+            record["wall_s"] = time.perf_counter() - wall0
+            record["cpu_s"] = time.process_time() - cpu0
+            record["rss_peak_mb"] = rss1
+            record["rss_peak_growth_mb"] = None if rss0 is None else rss1 - rss0
+            self.stages.append(record)
+
+    def timed(self, name: str):
+        """Decorator form of stage()."""
+
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+
+            return inner
+
+        return wrap
+
+    def write_sidecar(
+        self,
+        primary_output: str,
+        outputs: Sequence[str] = (),
+        run_ids: Sequence[str] = (),
+        raw_files: Sequence[str] = (),
+    ) -> Optional[str]:
+        """Write <primary_output>.perf.json (and any .prof). Returns the sidecar path, or None if disabled."""
+        prof_files = {}
+        for name, prof in self._profiles.items():
+            prof_path = f"{primary_output}.{name}.prof"
+            prof.dump_stats(prof_path)
+            prof_files[name] = prof_path
+        if not (self.enabled or prof_files):
+            return None
+
+        sidecar = f"{primary_output}.perf.json"
+        doc = {
+            "script": self.script,
+            "total_wall_s": time.perf_counter() - self._t0,
+            "stages": self.stages,
+            "trace": {"run_ids": list(run_ids), "raw_files": list(raw_files)},
+            "outputs": list(outputs) or [primary_output],
+            "profiles": prof_files,
+        }
+        with open(sidecar, "w", encoding="utf-8") as fh:
+            json.dump(doc, fh, indent=2)
+        return sidecar
+
+
+def add_perf_arguments(ap) -> None:
+    """The --perf / --profile_stage flags shared by the instrumented scripts."""
+    ap.add_argument("--perf", action="store_true", help="Write per-stage timing/memory to <output>.perf.json")
+    ap.add_argument("--profile_stage", default="", help="Run one stage (load, aggregate, ...) under cProfile")
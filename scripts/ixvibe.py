@@ -0,0 +1,189 @@
+"""
+IX-Vibe command-line entry point (v0.1)
+
+Purpose:
+- One command for every IX-Vibe script: `ixvibe <subcommand> [args]`
+- Fast startup: only the standard library is imported here; numpy / pandas / scipy /
+  matplotlib are imported when a subcommand that needs them actually runs.
+- Headless: the matplotlib backend is forced to Agg before any plotting module loads.
+- `batch` runs many subcommands in one interpreter, so imports are paid once instead
+  of once per plot.
+
+Usage example:
+python scripts/ixvibe.py frf --baseline b1.csv,b2.csv --treated t1.csv,t2.csv
+python scripts/ixvibe.py deltas --baseline b.csv --treated t.csv --out results/output/d.csv
+python scripts/ixvibe.py batch jobs.txt
+
+Batch file format:
+- one subcommand per line, exactly as it would follow `ixvibe` on the command line
+- blank lines and lines starting with # are ignored
+- `-` reads the job list from stdin
+- `--workers N` spreads the jobs over N processes (e.g. many plots rendered in parallel)
+
+Notes:
+- Subcommand arguments are passed through unchanged; `ixvibe <subcommand> --help`
+  shows the underlying script's options.
+"""
+
+from __future__ import annotations
+
+import os
+
+os.environ["MPLBACKEND"] = "Agg"  # before any subcommand can import matplotlib
+
+import argparse
+import importlib
+import shlex
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# subcommand -> (module, description)
+SUBCOMMANDS: Dict[str, Tuple[str, str]] = {
+    "frf": ("plot_frf", "Plot FRF baseline vs treated with a peak table"),
+    "srs": ("plot_srs", "Plot SRS baseline vs treated with band deltas"),
+    "acoustic": ("plot_acoustic", "Plot acoustic baseline vs treated"),
+    "deltas": ("summarize_deltas", "Summarize FRF peak deltas"),
+    "compare": ("compare_configs", "Compare many treatment configurations against one baseline"),
+    "modal": ("modal", "Per-peak damping and delta-zeta"),
+    "fdd": ("fdd", "FDD mode shapes from multi-point accelerometers, baseline vs treated MAC"),
+    "tuning": ("tuning_sweep", "TMD / piezo-shunt tuning sweep against the baseline FRF"),
+    "multichannel": ("multichannel", "Per-channel deltas and worst-channel summary"),
+    "significance": ("significance", "Bootstrap CIs / permutation p-values for deltas over repeats"),
+    "fatigue": ("fatigue", "Rainflow fatigue damage spectrum, baseline vs treated"),
+    "frf-estimate": ("frf_estimate", "H1/H2 FRF and coherence from time histories"),
+    "srs-compute": ("srs_engine", "SRS from raw acceleration time histories"),
+    "watch": ("watch_campaign", "Rebuild affected comparisons as raw captures land"),
+    "index": ("results_index", "Query the cross-campaign results index"),
+    "monitor": ("health_monitor", "Streaming band-energy health monitor against a baseline signature"),
+    "resample": ("resample_raw", "Anti-alias filter and decimate / resample raw captures"),
+    "raw": ("raw_store", "Convert time-history CSVs to memory-mapped .ixraw stores"),
+    "cache": ("spectrum_cache", "Warm, inspect or clear the spectrum cache"),
+    "campaign": ("run_campaign", "Run every baseline-vs-treated comparison in a campaign"),
+    "report": ("campaign_report", "Campaign analysis summary (Markdown / HTML) in one pass"),
+}
+
+
+def run_subcommand(name: str, argv: Sequence[str]) -> None:
+    """Import the subcommand's module on demand and call its main(argv)."""
+    if name not in SUBCOMMANDS:
+        raise ValueError(f"Unknown subcommand: {name} (choose from {', '.join(SUBCOMMANDS)})")
+    module = importlib.import_module(SUBCOMMANDS[name][0])
+    prog, sys.argv[0] = sys.argv[0], f"ixvibe {name}"  # argparse usage lines read argv[0]
+    try:
+        module.main(list(argv))
+    finally:
+        sys.argv[0] = prog
+
+
+def _read_jobs(path: str) -> List[List[str]]:
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, "r", encoding="utf-8") as fh:
+            lines = fh.read().splitlines()
+    jobs = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            jobs.append(shlex.split(line))
+    return jobs
+
+
+def _run_job(job: Sequence[str]) -> Tuple[bool, float, str]:
+    """Run one batch job with its output captured. Returns (ok, seconds, log)."""
+    import contextlib
+    import io
+
+    name, rest = job[0], job[1:]
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    ok = True
+    with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+        try:
+            if name == "batch":
+                raise ValueError("Nested batch jobs are not supported.")
+            run_subcommand(name, rest)
+        except SystemExit as exc:  # argparse errors inside a job
+            ok = exc.code in (0, None)
+        except Exception:  # one bad job must not stop the batch
+            ok = False
+            traceback.print_exc(file=buf)
+    return ok, time.perf_counter() - t0, buf.getvalue()
+
+
+def run_batch(jobs: Sequence[Sequence[str]], keep_going: bool = True, workers: int = 1) -> int:
+    """
+    Run jobs in this process (workers=1) or across a process pool; each worker imports
+    the heavy libraries once and then renders its share of the jobs. Returns the number
+    of failed jobs.
+    """
+    if workers > 1 and not keep_going:
+        raise ValueError("--stop_on_error needs --workers 1 (parallel jobs run out of order).")
+    failed = 0
+    t0 = time.perf_counter()
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_run_job, jobs, chunksize=max(1, len(jobs) // (4 * workers)))
+    else:
+        pool = None
+        results = map(_run_job, jobs)
+    try:
+        for i, (job, (ok, seconds, log)) in enumerate(zip(jobs, results), start=1):
+            if log.strip():
+                print(log.rstrip())
+            if ok:
+                print(f"[IX-Vibe] Job {i}/{len(jobs)} {job[0]} ok ({seconds:.2f} s)")
+                continue
+            failed += 1
+            print(f"[IX-Vibe] FAILED job {i}/{len(jobs)} {job[0]}")
+            if not keep_going:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    print(f"[IX-Vibe] Batch: {len(jobs) - failed} ok, {failed} failed, {time.perf_counter() - t0:.1f} s")
+    return failed
+
+
+def _usage() -> str:
+    width = max(len(n) for n in SUBCOMMANDS)
+    lines = [f"  {n:<{width}}  {desc}" for n, (_, desc) in SUBCOMMANDS.items()]
+    lines.append(f"  {'batch':<{width}}  Run a file of subcommands in one process")
+    return "subcommands:\n" + "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    ap = argparse.ArgumentParser(
+        prog="ixvibe",
+        description="IX-Vibe analysis tools.",
+        epilog=_usage(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    ap.add_argument("command", choices=[*SUBCOMMANDS, "batch"], metavar="subcommand", help="See list below")
+    ap.add_argument("args", nargs=argparse.REMAINDER, help="Arguments passed to the subcommand")
+    if not argv or argv[0] in ("-h", "--help"):
+        ap.print_help()
+        return
+    args = ap.parse_args(argv[:1])
+    rest = argv[1:]
+
+    if args.command != "batch":
+        run_subcommand(args.command, rest)
+        return
+
+    bp = argparse.ArgumentParser(prog="ixvibe batch", description="Run a file of subcommands in one process.")
+    bp.add_argument("jobs", help="Job file (one subcommand per line) or - for stdin")
+    bp.add_argument("--stop_on_error", action="store_true", help="Stop at the first failing job")
+    bp.add_argument("--workers", type=int, default=1, help="Worker processes (plots render in parallel)")
+    bargs = bp.parse_args(rest)
+    if run_batch(_read_jobs(bargs.jobs), keep_going=not bargs.stop_on_error, workers=bargs.workers):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+IX-Vibe modal parameter extraction (v0.1)
+
+Purpose:
+- Estimate the damping ratio (zeta) of every detected FRF peak, for all runs at once
+- Report delta-zeta between baseline and treated at the dominant baseline modes
+
+Methods:
+- Half-power bandwidth: zeta = (f2 - f1) / (2 * fn), where f1/f2 are the -3 dB crossings
+  either side of the peak, linearly interpolated between bins; fn and the peak level are
+  refined with a parabola through the three top bins (in dB).
+- SDOF fit (optional): |H| = A / sqrt((1 - r^2)^2 + (2 zeta r)^2), r = f / fn, fitted around
+  each peak's half-power band by Levenberg-Marquardt. All peaks are fitted together as one
+  batched problem.
+
+All peaks of all runs are processed together: runs are stacked as rows of one array and
+each crossing search / fit step is a single vectorized operation over every peak.
+
+Inputs:
+- FRF magnitude CSVs (linear magnitude, or dB with --db)
+
+Outputs:
+- Per-run peak table with zeta estimates
+- Delta-zeta table at the dominant baseline modes
+
+Notes:
+- Half-power zeta is NaN when a crossing is not found before the curve rises above the
+  peak again (overlapping modes) or runs off the end of the data. That is reported, not hidden.
+- Light damping needs frequency resolution: fewer than ~3 bins across the half-power band
+  makes any estimate unreliable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+
+from aggregate import DEFAULT_MAX_POINTS, common_grid, load_spectra, resample
+from common_io import ensure_dir, parse_csv_list
+from results_index import index_path, record_result
+
+HALF_POWER_DB = 10.0 * np.log10(2.0)
+_SEARCH_BLOCK = 32
+
+
+def _parabolic_peak(freq: np.ndarray, level_db: np.ndarray, flat: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+    """Sub-bin peak frequency and level from a parabola through the three top bins."""
+    left = np.maximum(flat - 1, lo)
+    right = np.minimum(flat + 1, hi)
+    y0, y1, y2 = level_db[left], level_db[flat], level_db[right]
+    denom = y0 - 2.0 * y1 + y2
+    ok = (left < flat) & (right > flat) & (denom < 0)
+    delta = np.where(ok, 0.5 * (y0 - y2) / np.where(ok, denom, 1.0), 0.0)
+    delta = np.clip(delta, -0.5, 0.5)
+    step = np.where(delta >= 0, freq[right] - freq[flat], freq[flat] - freq[left])
+    f_pk = freq[flat] + delta * step
+    l_pk = y1 - 0.25 * (y0 - y2) * delta
+    return f_pk, np.maximum(l_pk, y1)
+
+
+def _crossing(
+    freq: np.ndarray,
+    level_db: np.ndarray,
+    flat: np.ndarray,
+    bound: np.ndarray,
+    thresh: np.ndarray,
+    peak: np.ndarray,
+    direction: int,
+) -> np.ndarray:
+    """
+    Interpolated frequency where the curve first drops below thresh, walking from each peak
+    towards bound (direction -1 = left, +1 = right). NaN if the curve rises above the peak
+    first or the bound is reached.
+    """
+    n = flat.size
+    out = np.full(n, np.nan)
+    active = np.arange(n)
+    start = flat.copy()
+    while active.size:
+        offs = direction * np.arange(1, _SEARCH_BLOCK + 1)
+        idx = start[active, None] + offs[None, :]
+        in_range = (idx >= bound[active, None]) if direction < 0 else (idx <= bound[active, None])
+        idx_c = np.where(in_range, idx, flat[active, None])
+        vals = level_db[idx_c]
+        below = in_range & (vals < thresh[active, None])
+        above = in_range & (vals > peak[active, None])
+        stop = below | above | ~in_range
+        has_stop = stop.any(axis=1)
+        first = np.argmax(stop, axis=1)
+
+        rows = np.nonzero(has_stop)[0]
+        j = first[rows]
+        hit = below[rows, j]
+        sel = active[rows[hit]]
+        i_in = idx[rows[hit], j[hit]]
+        i_prev = i_in - direction
+        y_in, y_prev = level_db[i_in], level_db[i_prev]
+        frac = (level_db[i_prev] - thresh[sel]) / np.where(y_prev != y_in, y_prev - y_in, 1.0)
+        out[sel] = freq[i_prev] + frac * (freq[i_in] - freq[i_prev])
+
+        start[active] = start[active] + direction * _SEARCH_BLOCK
+        active = active[~has_stop]
+    return out
+
+
+def half_power_damping(
+    freq: np.ndarray,
+    level_db: np.ndarray,
+    run_idx: np.ndarray,
+    bin_idx: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Half-power damping for many peaks across many runs in one batched pass.
+
+    freq:     (n_freq,) common frequency grid
+    level_db: (n_runs, n_freq) magnitude in dB
+    run_idx, bin_idx: (n_peaks,) which run / which bin each peak is in
+    """
+    level_db = np.atleast_2d(level_db)
+    n_freq = level_db.shape[1]
+    flat_level = level_db.ravel()
+    freq_tiled = np.tile(freq, level_db.shape[0])
+    run_idx = np.asarray(run_idx, dtype=int)
+    flat = run_idx * n_freq + np.asarray(bin_idx, dtype=int)
+    lo = run_idx * n_freq
+    hi = lo + n_freq - 1
+
+    f_pk, l_pk = _parabolic_peak(freq_tiled, flat_level, flat, lo, hi)
+    thresh = l_pk - HALF_POWER_DB
+    f1 = _crossing(freq_tiled, flat_level, flat, lo, thresh, l_pk, -1)
+    f2 = _crossing(freq_tiled, flat_level, flat, hi, thresh, l_pk, +1)
+    zeta = (f2 - f1) / (2.0 * f_pk)
+    return pd.DataFrame(
+        {
+            "run": run_idx,
+            "bin": np.asarray(bin_idx, dtype=int),
+            "fn_hz": f_pk,
+            "peak_db": l_pk,
+            "f1_hz": f1,
+            "f2_hz": f2,
+            "zeta_half_power": zeta,
+        }
+    )
+
+
+def sdof_fit_damping(
+    freq: np.ndarray,
+    mag_lin: np.ndarray,
+    run_idx: np.ndarray,
+    fn0: np.ndarray,
+    zeta0: np.ndarray,
+    n_points: int = 33,
+    iterations: int = 20,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched SDOF magnitude fit. Returns (fn_hz, zeta) per peak; NaN where no start value.
+
+    Each peak is sampled on n_points across its half-power band fn0 * (1 +/- zeta0), which
+    keeps neighbouring modes out of the fit, and all peaks are refined together with
+    Levenberg-Marquardt on (log A, fn, zeta). Fits that end on a parameter bound are NaN.
+    """
+    mag_lin = np.atleast_2d(mag_lin)
+    run_idx = np.asarray(run_idx, dtype=int)
+    ok = np.isfinite(fn0) & np.isfinite(zeta0) & (zeta0 > 0)
+    fn_out = np.full(fn0.shape, np.nan)
+    z_out = np.full(fn0.shape, np.nan)
+    if not ok.any():
+        return fn_out, z_out
+
+    fn = fn0[ok].astype(float)
+    z = np.clip(zeta0[ok].astype(float), 1e-4, 0.5)
+    runs = run_idx[ok]
+    u = np.linspace(-1.0, 1.0, n_points)
+    f = fn[:, None] * (1.0 + u[None, :] * z[:, None])
+    f = np.clip(f, freq[0], freq[-1])
+
+    # Sample each peak's window from its own run: shift runs apart on one abscissa.
+    span = (freq[-1] - freq[0]) * 2.0 + 1.0
+    xp = (freq[None, :] + span * np.arange(mag_lin.shape[0])[:, None]).ravel()
+    y = np.interp((f + span * runs[:, None]).ravel(), xp, mag_lin.ravel()).reshape(f.shape)
+    y = np.maximum(y, np.finfo(float).tiny)
+
+    def model(p):
+        r = f / p[:, 1, None]
+        d = np.sqrt((1.0 - r**2) ** 2 + (2.0 * p[:, 2, None] * r) ** 2)
+        return np.exp(p[:, 0, None]) / d, r, d
+
+    p = np.stack([np.log(y.max(axis=1) * 2.0 * z), fn, z], axis=1)
+    lam = np.full(fn.size, 1e-2)
+    w = 1.0 / y  # relative residuals
+    for _ in range(iterations):
+        h, r, d = model(p)
+        res = (h - y) * w
+        # d|H|/dp for p = (log A, fn, zeta)
+        dd_dfn = ((1.0 - r**2) * (2.0 * r**2) - (2.0 * p[:, 2, None] * r) ** 2) / (p[:, 1, None] * d)
+        dd_dz = 4.0 * p[:, 2, None] * r**2 / d
+        jac = np.stack([h, -h / d * dd_dfn, -h / d * dd_dz], axis=2) * w[..., None]
+        jtj = np.einsum("nki,nkj->nij", jac, jac)
+        jtr = np.einsum("nki,nk->ni", jac, res)
+        a = jtj + lam[:, None, None] * np.eye(3) * np.diagonal(jtj, axis1=1, axis2=2)[:, :, None]
+        ridge = 1e-12 * np.trace(a, axis1=1, axis2=2)[:, None, None] * np.eye(3)
+        step = np.linalg.solve(a + ridge, -jtr[..., None])[..., 0]
+        p_new = p + step
+        p_new[:, 2] = np.clip(p_new[:, 2], 1e-5, 0.9)
+        p_new[:, 1] = np.clip(p_new[:, 1], freq[0], freq[-1])
+        better = np.sum(((model(p_new)[0] - y) * w) ** 2, axis=1) < np.sum(res**2, axis=1)
+        p = np.where(better[:, None], p_new, p)
+        lam = np.where(better, lam * 0.3, lam * 10.0)
+
+    on_bound = (p[:, 2] <= 1e-5) | (p[:, 2] >= 0.9)
+    fn_out[ok] = np.where(on_bound, np.nan, p[:, 1])
+    z_out[ok] = np.where(on_bound, np.nan, p[:, 2])
+    return fn_out, z_out
+
+
+def detect_run_peaks(
+    level_db: np.ndarray, prominence: float, top_n: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Peaks of every run. Returns (run_idx, bin_idx), sorted by run then level."""
+    runs: List[np.ndarray] = []
+    bins: List[np.ndarray] = []
+    for i, row in enumerate(np.atleast_2d(level_db)):
+        pk, _ = find_peaks(row, prominence=prominence)
+        if top_n:
+            pk = pk[np.argsort(row[pk])[::-1][:top_n]]
+        runs.append(np.full(pk.size, i))
+        bins.append(pk)
+    if not runs:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    return np.concatenate(runs).astype(int), np.concatenate(bins).astype(int)
+
+
+def modal_table(
+    freq: np.ndarray,
+    level_db: np.ndarray,
+    run_idx: np.ndarray,
+    bin_idx: np.ndarray,
+    fit: bool = False,
+) -> pd.DataFrame:
+    """Half-power (and optionally SDOF-fit) damping for the given peaks."""
+    table = half_power_damping(freq, level_db, run_idx, bin_idx)
+    if fit and not table.empty:
+        mag = 10.0 ** (np.atleast_2d(level_db) / 20.0)
+        fn_fit, z_fit = sdof_fit_damping(
+            freq, mag, table["run"].to_numpy(), table["fn_hz"].to_numpy(), table["zeta_half_power"].to_numpy()
+        )
+        table["fn_fit_hz"] = fn_fit
+        table["zeta_fit"] = z_fit
+    return table
+
+
+def delta_zeta(
+    modes_hz: np.ndarray,
+    base: pd.DataFrame,
+    treat: pd.DataFrame,
+    rel_tol: float = 0.05,
+    zeta_col: str = "zeta_half_power",
+) -> pd.DataFrame:
+    """
+    Median zeta of baseline and treated peaks within rel_tol of each reference mode.
+
+    Matching is vectorized: peaks are sorted once and each mode's window is found with
+    searchsorted.
+    """
+
+    def summarize(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        d = df[np.isfinite(df[zeta_col])].sort_values("fn_hz")
+        f = d["fn_hz"].to_numpy()
+        z = d[zeta_col].to_numpy()
+        lo = np.searchsorted(f, modes_hz * (1.0 - rel_tol), side="left")
+        hi = np.searchsorted(f, modes_hz * (1.0 + rel_tol), side="right")
+        med = np.array([np.median(z[a:b]) if b > a else np.nan for a, b in zip(lo, hi)])
+        return med, hi - lo
+
+    zb, nb = summarize(base)
+    zt, nt = summarize(treat)
+    return pd.DataFrame(
+        {
+            "mode_freq_hz": modes_hz,
+            "baseline_zeta": zb,
+            "treated_zeta": zt,
+            "delta_zeta": zt - zb,
+            "n_baseline_peaks": nb,
+            "n_treated_peaks": nt,
+            "method": zeta_col,
+        }
+    )
+
+
+def _to_db(mag: np.ndarray) -> np.ndarray:
+    return 20.0 * np.log10(np.maximum(np.abs(mag), 1e-12))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Estimate damping (zeta) per FRF peak and delta-zeta vs baseline.")
+    ap.add_argument("--baseline", required=True, help="Comma-separated baseline FRF CSV files")
+    ap.add_argument("--treated", required=True, help="Comma-separated treated FRF CSV files")
+    ap.add_argument("--peaks_out", default="results/output/frf_modal_peaks.csv", help="Per-run peak/zeta table")
+    ap.add_argument("--out", default="results/output/frf_delta_zeta.csv", help="Delta-zeta table")
+    ap.add_argument("--prominence", type=float, default=3.0, help="Peak prominence threshold (dB)")
+    ap.add_argument("--top_n", type=int, default=5, help="Dominant baseline modes to report delta-zeta for")
+    ap.add_argument("--match_tol", type=float, default=0.05, help="Relative frequency tolerance for mode matching")
+    ap.add_argument("--fit", action="store_true", help="Also run the batched SDOF curve fit")
+    ap.add_argument("--db", action="store_true", help="Input magnitudes are already in dB")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS, help="Upper bound on common grid size")
+    args = ap.parse_args(argv)
+
+    baseline_files = list(parse_csv_list(args.baseline))
+    treated_files = list(parse_csv_list(args.treated))
+    spectra = load_spectra(baseline_files + treated_files)
+    grid = common_grid(spectra, max_points=args.max_points)
+    mags = resample(spectra, grid)
+    level = mags if args.db else _to_db(mags)
+
+    run_idx, bin_idx = detect_run_peaks(level, args.prominence)
+    table = modal_table(grid, level, run_idx, bin_idx, fit=args.fit)
+    n_base = len(baseline_files)
+    files = baseline_files + treated_files
+    table.insert(0, "config", np.where(table["run"] < n_base, "baseline", "treated"))
+    table.insert(1, "file", [files[i] for i in table["run"]])
+
+    # Reference modes: dominant peaks of the baseline mean curve.
+    base_mean = level[:n_base].mean(axis=0)
+    _, ref_bins = detect_run_peaks(base_mean, args.prominence, top_n=args.top_n)
+    ref = half_power_damping(grid, base_mean, np.zeros(ref_bins.size, dtype=int), ref_bins)
+    modes = np.sort(ref["fn_hz"].to_numpy())
+
+    zeta_col = "zeta_fit" if args.fit else "zeta_half_power"
+    base_rows = table[table["config"] == "baseline"]
+    treat_rows = table[table["config"] == "treated"]
+    deltas = delta_zeta(modes, base_rows, treat_rows, rel_tol=args.match_tol, zeta_col=zeta_col)
+
+    ensure_dir(os.path.dirname(args.peaks_out))
+    ensure_dir(os.path.dirname(args.out))
+    table.drop(columns=["run", "bin"]).to_csv(args.peaks_out, index=False)
+    deltas.to_csv(args.out, index=False)
+
+    if index_path():
+        peak_rows = table.rename(columns={"config": "role", "fn_hz": "freq_hz", "peak_db": "value", zeta_col: "zeta"})
+        peak_rows["channel"] = [os.path.basename(f) for f in peak_rows["file"]]
+        zeta_rows = deltas.rename(
+            columns={
+                "mode_freq_hz": "freq_hz",
+                "baseline_zeta": "baseline_value",
+                "treated_zeta": "treated_value",
+                "delta_zeta": "delta",
+            }
+        ).assign(metric="zeta", units="ratio")
+        record_result(
+            "modal",
+            args.out,
+            outputs=[args.peaks_out, args.out],
+            params=argv,
+            baseline_files=baseline_files,
+            treated_files=treated_files,
+            peaks=peak_rows.assign(units="dB").to_dict("records"),
+            deltas=zeta_rows.to_dict("records"),
+        )
+
+    print(f"[IX-Vibe] Wrote modal peaks: {args.peaks_out} ({len(table)} peaks, {len(files)} runs)")
+    print(f"[IX-Vibe] Wrote delta-zeta: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
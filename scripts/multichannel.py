@@ -0,0 +1,199 @@
+"""
+IX-Vibe multi-channel delta summary (v0.1)
+
+Purpose:
+- The test plan calls for >= 3 accelerometers (preferably tri-axial). Instead of one
+  script invocation per channel, process every channel of every run together and write
+  one long-format table plus a worst-channel summary for the go/no-go call.
+
+Inputs:
+- Baseline and treated multi-channel spectrum CSVs: one frequency column and one column
+  per channel (e.g. acc1_x, acc1_y, acc1_z, acc2_x, ...). Same channel set in every file.
+
+Method:
+- Each file is parsed once (all channels); runs are aggregated as a
+  channels x runs x frequency array (aggregate.aggregate_channel_spectra).
+- Treated means are put on the baseline grid for all channels with one set of
+  interpolation weights.
+- dB conversion as in summarize_deltas.py: only if every value is non-negative.
+- Dominant peaks per channel (scipy find_peaks, one row per channel), then the treated
+  value at each baseline peak bin is gathered for all channels at once.
+- Band peaks: bands.band_stats over the whole (channels, freq) array.
+
+Outputs:
+- --out: long format, one row per (channel, peak) and (channel, band)
+  channel, metric, freq_hz, band_hz, baseline_value, treated_value,
+  delta_treated_minus_baseline, delta_percent, units
+- --worst_out: per channel, its worst (least reduced) dominant peak, sorted worst first;
+  with --target_delta each channel is marked PASS / FAIL (delta <= target passes).
+
+Usage example:
+python scripts/multichannel.py --baseline b1.csv,b2.csv,b3.csv --treated t1.csv,t2.csv,t3.csv --target_delta -3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+
+from aggregate import DEFAULT_MAX_POINTS, aggregate_channel_spectra, load_channel_spectra, resample_channels
+from bands import BandSet, band_stats, parse_bands
+from common_io import ensure_dir, parse_csv_list
+from results_index import index_path, record_result
+
+
+def dominant_peak_bins(values: np.ndarray, top_n: int, prominence: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(channel_idx, bin_idx) of the top_n highest prominent peaks of every channel."""
+    ch_idx: List[np.ndarray] = []
+    bins: List[np.ndarray] = []
+    for c, row in enumerate(np.atleast_2d(values)):
+        peaks, _ = find_peaks(row, prominence=prominence)
+        top = peaks[np.argsort(row[peaks])[::-1][:top_n]]
+        ch_idx.append(np.full(top.size, c))
+        bins.append(np.sort(top))
+    if not bins:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    return np.concatenate(ch_idx).astype(int), np.concatenate(bins).astype(int)
+
+
+def _delta_pct(b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b != 0, (t / b - 1.0) * 100.0, np.nan)
+
+
+def delta_table(
+    channels: Sequence[str],
+    freq: np.ndarray,
+    base: np.ndarray,
+    treat: np.ndarray,
+    units: str,
+    top_n: int = 5,
+    prominence: float = 0.0,
+    bands: Optional[BandSet] = None,
+) -> pd.DataFrame:
+    """Long-format peak and band deltas for all channels (base/treat: (n_channels, n_freq))."""
+    names = np.asarray(channels, dtype=object)
+    ch, bins = dominant_peak_bins(base, top_n, prominence)
+    b, t = base[ch, bins], treat[ch, bins]
+    peaks = pd.DataFrame(
+        {
+            "channel": names[ch],
+            "metric": "peak",
+            "freq_hz": freq[bins],
+            "band_hz": "",
+            "baseline_value": b,
+            "treated_value": t,
+            "delta_treated_minus_baseline": t - b,
+            "delta_percent": _delta_pct(b, t),
+            "units": units,
+        }
+    )
+    if bands is None or not len(bands):
+        return peaks
+
+    bb = band_stats(freq, base, bands, stats=("max",))["max"]
+    bt = band_stats(freq, treat, bands, stats=("max",))["max"]
+    n_ch, n_bands = bb.shape
+    labels = np.asarray(bands.labels, dtype=object)
+    band_rows = pd.DataFrame(
+        {
+            "channel": np.repeat(names, n_bands),
+            "metric": "band",
+            "freq_hz": np.nan,
+            "band_hz": np.tile(labels, n_ch),
+            "baseline_value": bb.ravel(),
+            "treated_value": bt.ravel(),
+            "delta_treated_minus_baseline": (bt - bb).ravel(),
+            "delta_percent": _delta_pct(bb, bt).ravel(),
+            "units": units,
+        }
+    )
+    return pd.concat([peaks, band_rows.dropna(subset=["baseline_value"])], ignore_index=True)
+
+
+def worst_channel_summary(table: pd.DataFrame, target_delta: Optional[float] = None) -> pd.DataFrame:
+    """Per channel, the dominant peak with the largest (least negative) delta; worst channel first."""
+    peaks = table[table["metric"] == "peak"]
+    if peaks.empty:
+        return pd.DataFrame(columns=["channel", "worst_peak_freq_hz", "worst_delta", "mean_delta", "n_peaks"])
+    idx = peaks.groupby("channel")["delta_treated_minus_baseline"].idxmax()
+    worst = peaks.loc[idx, ["channel", "freq_hz", "delta_treated_minus_baseline", "units"]]
+    worst = worst.rename(columns={"freq_hz": "worst_peak_freq_hz", "delta_treated_minus_baseline": "worst_delta"})
+    grouped = peaks.groupby("channel")["delta_treated_minus_baseline"]
+    worst["mean_delta"] = worst["channel"].map(grouped.mean())
+    worst["n_peaks"] = worst["channel"].map(grouped.size())
+    if target_delta is not None:
+        worst["verdict"] = np.where(worst["worst_delta"] <= target_delta, "PASS", "FAIL")
+    return worst.sort_values("worst_delta", ascending=False).reset_index(drop=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Per-channel peak/band deltas for multi-channel exports in one pass.")
+    ap.add_argument("--baseline", required=True, help="Comma-separated baseline multi-channel CSV files")
+    ap.add_argument("--treated", required=True, help="Comma-separated treated multi-channel CSV files")
+    ap.add_argument("--channels", default="", help="Comma-separated channel columns (default: all numeric)")
+    ap.add_argument("--out", default="results/output/multichannel_deltas.csv", help="Long-format delta table")
+    ap.add_argument("--worst_out", default="results/output/multichannel_worst.csv", help="Worst-channel summary")
+    ap.add_argument("--top_n", type=int, default=5, help="Dominant peaks per channel")
+    ap.add_argument("--prominence", type=float, default=0.0, help="Peak prominence threshold (dB or data units)")
+    ap.add_argument("--bands", default="", help="Optional band-peak deltas: comma bands f1-f2 or octave, 1/3, 1/6, 1/12")
+    ap.add_argument("--target_delta", type=float, default=None, help="Go/no-go: worst peak delta must be <= this")
+    ap.add_argument("--grid", choices=("linear", "log"), default="linear", help="Common frequency grid spacing")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS, help="Upper bound on common grid size")
+    args = ap.parse_args(argv)
+
+    wanted = list(parse_csv_list(args.channels)) if args.channels else None
+    channels, curves_b = load_channel_spectra(parse_csv_list(args.baseline), wanted)
+    _, curves_t = load_channel_spectra(parse_csv_list(args.treated), channels)
+
+    agg_b = aggregate_channel_spectra(curves_b, scale=args.grid, max_points=args.max_points)
+    agg_t = aggregate_channel_spectra(curves_t, scale=args.grid, max_points=args.max_points)
+    freq = agg_b.freq_hz
+    base = agg_b.mean
+    treat = resample_channels((agg_t.freq_hz, agg_t.mean), freq)
+
+    use_db = np.nanmin(base) >= 0 and np.nanmin(treat) >= 0
+    if use_db:
+        base = 20.0 * np.log10(np.maximum(base, 1e-12))
+        treat = 20.0 * np.log10(np.maximum(treat, 1e-12))
+    units = "dB" if use_db else "linear"
+
+    bands = parse_bands(args.bands, freq.min(), freq.max()) if args.bands else None
+    table = delta_table(channels, freq, base, treat, units, args.top_n, args.prominence, bands)
+    worst = worst_channel_summary(table, args.target_delta)
+
+    ensure_dir(os.path.dirname(args.out) or ".")
+    ensure_dir(os.path.dirname(args.worst_out) or ".")
+    table.to_csv(args.out, index=False)
+    worst.to_csv(args.worst_out, index=False)
+
+    if index_path():
+        record_result(
+            "multichannel",
+            args.out,
+            outputs=[args.out, args.worst_out],
+            params=argv,
+            baseline_files=parse_csv_list(args.baseline),
+            treated_files=parse_csv_list(args.treated),
+            deltas=table.rename(columns={"delta_treated_minus_baseline": "delta"})
+            .replace({"metric": {"band": "band_max"}})
+            .to_dict("records"),
+        )
+
+    print(f"[IX-Vibe] Wrote multi-channel deltas: {args.out} ({len(channels)} channels, {len(table)} rows)")
+    print(f"[IX-Vibe] Wrote worst-channel summary: {args.worst_out}")
+    if not worst.empty:
+        top = worst.iloc[0]
+        print(f"[IX-Vibe] Worst channel: {top['channel']} ({top['worst_delta']:+.2f} {units} at {top['worst_peak_freq_hz']:g} Hz)")
+        if args.target_delta is not None:
+            go = bool((worst["verdict"] == "PASS").all())
+            print(f"[IX-Vibe] Go/no-go (target {args.target_delta:+g} {units}): {'GO' if go else 'NO-GO'}")
+
+
+if __name__ == "__main__":
+    main()
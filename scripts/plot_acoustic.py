@@ -11,6 +11,8 @@ Expected CSV columns:
 
 Outputs:
 - PNG plot with traceability footer
+- with --bands: CSV of band max / RMS / energy deltas (user bands or octave, 1/3, 1/6, 1/12;
+  see bands.py). Energy is the band power when the response is a PSD.
 
 This is intentionally generic: acoustic test rigs vary widely. The key is traceability.
 """
@@ -19,37 +21,20 @@ from __future__ import annotations
 
 import argparse
 import os
-from typing import List, Tuple
+from typing import Optional, Sequence
 
 import numpy as np
 import matplotlib.pyplot as plt
 
-from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, read_spectrum_csv, trace_line
+from aggregate import DEFAULT_MAX_POINTS, aggregate_files
+from bands import band_table, parse_bands
+from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, trace_line
+from decimate import minmax_envelope, pixel_columns
+from instrument import Instrumentation, add_perf_arguments
+from results_index import band_rows, index_path, record_result
 
 
-def _aggregate(files: List[str]) -> Tuple[np.ndarray, np.ndarray]:
-    spectra = []
-    for f in files:
-        freq, val, _ = read_spectrum_csv(f)
-        spectra.append((freq.to_numpy(), val.to_numpy()))
-
-    f_min = max(s[0].min() for s in spectra)
-    f_max = min(s[0].max() for s in spectra)
-    if f_max <= f_min:
-        raise ValueError("Acoustic spectra frequency ranges do not overlap sufficiently for aggregation.")
-
-    f0 = spectra[0][0]
-    step = np.median(np.diff(f0))
-    if not np.isfinite(step) or step <= 0:
-        step = (f_max - f_min) / 2000.0
-
-    f_common = np.arange(f_min, f_max, step)
-    vals = [np.interp(f_common, fx, vx) for fx, vx in spectra]
-    mean_val = np.mean(np.vstack(vals), axis=0)
-    return f_common, mean_val
-
-
-def main() -> None:
+def main(argv: Optional[Sequence[str]] = None) -> None:
     ap = argparse.ArgumentParser(description="Plot acoustic response baseline vs treated with traceability.")
     ap.add_argument("--baseline", required=True, help="Comma-separated baseline CSV files")
     ap.add_argument("--treated", required=True, help="Comma-separated treated CSV files")
@@ -59,47 +44,97 @@ def main() -> None:
     ap.add_argument("--outdir", default="results/plots", help="Output directory")
     ap.add_argument("--outfile", default="acoustic_baseline_vs_treated.png", help="Output plot filename")
     ap.add_argument("--log_y", action="store_true", help="Use log scale on Y axis")
-    args = ap.parse_args()
+    ap.add_argument("--bands", default="", help="Optional band table: comma bands f1-f2 or octave, 1/3, 1/6, 1/12")
+    ap.add_argument("--bands_outfile", default="results/output/acoustic_band_deltas.csv", help="Output band table CSV")
+    ap.add_argument("--grid", choices=("linear", "log"), default="linear", help="Common frequency grid spacing")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS, help="Upper bound on common grid size")
+    ap.add_argument("--full_res_plot", action="store_true", help="Draw every point (no per-pixel min/max decimation)")
+    add_perf_arguments(ap)
+    args = ap.parse_args(argv)
+    inst = Instrumentation("plot_acoustic", enabled=args.perf or None, profile_stage=args.profile_stage)
 
     baseline_files = list(parse_csv_list(args.baseline))
     treated_files = list(parse_csv_list(args.treated))
 
-    fb, vb = _aggregate(baseline_files)
-    ft, vt = _aggregate(treated_files)
+    with inst.stage("aggregate") as st:
+        # streamed from disk batch by batch: memory does not grow with the run count
+        agg_b = aggregate_files(baseline_files, scale=args.grid, max_points=args.max_points)
+        agg_t = aggregate_files(treated_files, scale=args.grid, max_points=args.max_points)
+        st["sizes"].update(files=len(baseline_files) + len(treated_files))
+        fb, vb = agg_b.freq_hz, agg_b.mean
+        ft, vt = agg_t.freq_hz, agg_t.mean
 
-    f_min = max(fb.min(), ft.min())
-    f_max = min(fb.max(), ft.max())
-    mask_b = (fb >= f_min) & (fb <= f_max)
-    mask_t = (ft >= f_min) & (ft <= f_max)
+        f_min = max(fb.min(), ft.min())
+        f_max = min(fb.max(), ft.max())
+        mask_b = (fb >= f_min) & (fb <= f_max)
+        mask_t = (ft >= f_min) & (ft <= f_max)
 
-    f_common = fb[mask_b]
-    vb2 = vb[mask_b]
-    vt2 = np.interp(f_common, ft[mask_t], vt[mask_t])
+        f_common = fb[mask_b]
+        vb2 = vb[mask_b]
+        vt2 = np.interp(f_common, ft[mask_t], vt[mask_t])
+        st["sizes"].update(grid_points=f_common.size)
 
     ensure_dir(args.outdir)
 
-    plt.figure()
-    plt.plot(f_common, vb2, label="Baseline (mean)")
-    plt.plot(f_common, vt2, label="Treated (mean)")
-    plt.xlabel("Frequency (Hz)")
-    plt.ylabel("Response (units as provided)")
-    plt.title(args.title)
-    plt.legend()
-
-    if args.log_y:
-        plt.yscale("log")
-
-    trace_b = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files)
-    trace_t = TraceInfo(run_ids=parse_run_ids(args.run_ids_treated), raw_files=treated_files)
-    footer = f"BASELINE: {trace_line(trace_b)}\nTREATED: {trace_line(trace_t)}"
-    plt.gcf().text(0.01, 0.01, footer, fontsize=8, va="bottom")
-
-    outpath = os.path.join(args.outdir, args.outfile)
-    plt.tight_layout()
-    plt.savefig(outpath, dpi=200)
-    plt.close()
+    with inst.stage("render") as st:
+        fig = plt.figure()
+        n_px = 0 if args.full_res_plot else pixel_columns(fig, dpi=200)
+        curves = [minmax_envelope(f_common, vb2, n_px), minmax_envelope(f_common, vt2, n_px)]
+        plt.plot(*curves[0], label="Baseline (mean)")
+        plt.plot(*curves[1], label="Treated (mean)")
+        st["sizes"].update(plotted_points=sum(x.size for x, _ in curves))
+        plt.xlabel("Frequency (Hz)")
+        plt.ylabel("Response (units as provided)")
+        plt.title(args.title)
+        plt.legend()
+
+        if args.log_y:
+            plt.yscale("log")
+
+        trace_b = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files)
+        trace_t = TraceInfo(run_ids=parse_run_ids(args.run_ids_treated), raw_files=treated_files)
+        footer = f"BASELINE: {trace_line(trace_b)}\nTREATED: {trace_line(trace_t)}"
+        plt.gcf().text(0.01, 0.01, footer, fontsize=8, va="bottom")
+
+        outpath = os.path.join(args.outdir, args.outfile)
+        plt.tight_layout()
+        plt.savefig(outpath, dpi=200)
+        plt.close()
+
+    outputs = [outpath]
+    if args.bands:
+        with inst.stage("tabulate") as st:
+            bands = parse_bands(args.bands, f_common.min(), f_common.max())
+            table = band_table(bands, (f_common, vb2), (f_common, vt2))
+            ensure_dir(os.path.dirname(args.bands_outfile) or ".")
+            table.to_csv(args.bands_outfile, index=False)
+            st["sizes"].update(bands=len(bands))
+        outputs.append(args.bands_outfile)
+
+    if index_path():
+        record_result(
+            "plot_acoustic",
+            args.bands_outfile if args.bands else outpath,
+            outputs=outputs,
+            params=argv,
+            baseline_files=baseline_files,
+            treated_files=treated_files,
+            run_ids_baseline=trace_b.run_ids,
+            run_ids_treated=trace_t.run_ids,
+            deltas=band_rows(table, "linear") if args.bands else (),
+        )
 
     print(f"[IX-Vibe] Wrote plot: {outpath}")
+    if args.bands:
+        print(f"[IX-Vibe] Wrote band table: {args.bands_outfile}")
+    sidecar = inst.write_sidecar(
+        outpath,
+        outputs=outputs,
+        run_ids=[*trace_b.run_ids, *trace_t.run_ids],
+        raw_files=baseline_files + treated_files,
+    )
+    if sidecar:
+        print(f"[IX-Vibe] Wrote perf: {sidecar}")
 
 
 if __name__ == "__main__":
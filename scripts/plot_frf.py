@@ -11,7 +11,9 @@ Expected CSV columns (any of these are OK):
 
 Output:
 - A plot (PNG) with traceability text
-- A peak table (CSV) with detected peaks for baseline and treated
+- A peak table (CSV) with detected peaks (and half-power damping) for baseline and treated
+- with --bands: a band table (CSV) of max / RMS magnitude deltas per band (linear units;
+  user bands or octave, 1/3, 1/6, 1/12; see bands.py)
 
 Notes:
 - We do NOT hardcode colors or styling.
@@ -22,68 +24,42 @@ from __future__ import annotations
 
 import argparse
 import os
-from typing import List, Tuple
+from typing import Optional, Sequence
 
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from scipy.signal import find_peaks
 
-from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, read_spectrum_csv, trace_line
+from aggregate import DEFAULT_MAX_POINTS, aggregate_files
+from bands import band_table, parse_bands
+from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, trace_line
+from decimate import minmax_envelope, pixel_columns
+from instrument import Instrumentation, add_perf_arguments
+from modal import half_power_damping
+from results_index import band_rows, index_path, record_result
 
 
-def _aggregate_spectra(files: List[str]) -> Tuple[np.ndarray, np.ndarray]:
-    """
-    Load multiple spectra and aggregate by interpolating onto a common frequency grid.
-
-    Assumptions:
-- Each file is a (freq, value) curve.
-- Frequency ranges overlap reasonably.
-
-    Output:
-- freq_common
-- mean_value across files
-    """
-    spectra = []
-    for f in files:
-        freq, val, _ = read_spectrum_csv(f)
-        spectra.append((freq.to_numpy(), val.to_numpy()))
-
-    # Build common grid from intersection range, using baseline file #1 resolution as reference
-    f0 = spectra[0][0]
-    f_min = max(s[0].min() for s in spectra)
-    f_max = min(s[0].max() for s in spectra)
-    if f_max <= f_min:
-        raise ValueError("Spectra frequency ranges do not overlap sufficiently for aggregation.")
-
-    # Use median step of first spectrum as grid step (robust to small irregularities)
-    step = np.median(np.diff(f0))
-    if not np.isfinite(step) or step <= 0:
-        step = (f_max - f_min) / 2000.0  # fallback grid
-
-    freq_common = np.arange(f_min, f_max, step)
-    vals_interp = []
-    for fx, vx in spectra:
-        vals_interp.append(np.interp(freq_common, fx, vx))
-    mean_val = np.mean(np.vstack(vals_interp), axis=0)
-    return freq_common, mean_val
-
-
-def _detect_peaks(freq: np.ndarray, val: np.ndarray, prominence: float) -> pd.DataFrame:
+def _detect_peaks(freq: np.ndarray, val: np.ndarray, prominence: float, in_db: bool) -> pd.DataFrame:
     peaks, props = find_peaks(val, prominence=prominence)
-    rows = []
-    for idx in peaks:
-        rows.append(
-            {
-                "peak_freq_hz": float(freq[idx]),
-                "peak_value": float(val[idx]),
-                "prominence": float(props["prominences"][list(peaks).index(idx)]),
-            }
-        )
-    return pd.DataFrame(rows).sort_values("peak_value", ascending=False)
-
-
-def main() -> None:
+    # The half-power (-3 dB) estimate needs a dB magnitude. When val is not known to be dB
+    # (negative values: signed / real-part data, or dB of unknown reference) zeta is NaN
+    # rather than a number from a -3 "dB" drop on linear values.
+    if in_db:
+        zeta = half_power_damping(freq, val, np.zeros(peaks.size, dtype=int), peaks)["zeta_half_power"].to_numpy()
+    else:
+        zeta = np.full(peaks.size, np.nan)
+    return pd.DataFrame(
+        {
+            "peak_freq_hz": freq[peaks].astype(float),
+            "peak_value": val[peaks].astype(float),
+            "prominence": props["prominences"].astype(float),
+            "zeta_half_power": zeta,
+        }
+    ).sort_values("peak_value", ascending=False)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
     ap = argparse.ArgumentParser(description="Plot FRF baseline vs treated with traceability.")
     ap.add_argument("--baseline", required=True, help="Comma-separated baseline CSV files")
     ap.add_argument("--treated", required=True, help="Comma-separated treated CSV files")
@@ -95,13 +71,26 @@ def main() -> None:
     ap.add_argument("--peaks_outfile", default="results/output/frf_peaks.csv", help="Output peaks table CSV")
     ap.add_argument("--peak_prominence", type=float, default=0.0, help="Peak prominence threshold in data units")
     ap.add_argument("--log_y", action="store_true", help="Use log scale on Y axis if appropriate")
-    args = ap.parse_args()
+    ap.add_argument("--bands", default="", help="Optional band table: comma bands f1-f2 or octave, 1/3, 1/6, 1/12")
+    ap.add_argument("--bands_outfile", default="results/output/frf_band_deltas.csv", help="Output band table CSV")
+    ap.add_argument("--grid", choices=("linear", "log"), default="linear", help="Common frequency grid spacing")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS, help="Upper bound on common grid size")
+    ap.add_argument("--full_res_plot", action="store_true", help="Draw every point (no per-pixel min/max decimation)")
+    add_perf_arguments(ap)
+    args = ap.parse_args(argv)
+    inst = Instrumentation("plot_frf", enabled=args.perf or None, profile_stage=args.profile_stage)
 
     baseline_files = list(parse_csv_list(args.baseline))
     treated_files = list(parse_csv_list(args.treated))
 
-    freq_b, val_b = _aggregate_spectra(baseline_files)
-    freq_t, val_t = _aggregate_spectra(treated_files)
+    with inst.stage("aggregate") as st:
+        # streamed from disk batch by batch: memory does not grow with the run count
+        agg_b = aggregate_files(baseline_files, scale=args.grid, max_points=args.max_points)
+        agg_t = aggregate_files(treated_files, scale=args.grid, max_points=args.max_points)
+        st["sizes"].update(files=len(baseline_files) + len(treated_files))
+        st["sizes"].update(grid_points=agg_b.freq_hz.size + agg_t.freq_hz.size)
+    freq_b, val_b = agg_b.freq_hz, agg_b.mean
+    freq_t, val_t = agg_t.freq_hz, agg_t.mean
 
     # Convert to dB if values look like linear magnitude; if user already provides dB, keep as-is.
     # Heuristic: if values are mostly positive and max/min ratio is large, dB is useful.
@@ -119,43 +108,86 @@ def main() -> None:
     y_label = "Magnitude (dB)" if use_db else "Magnitude (linear)"
 
     # Peaks
-    peaks_b = _detect_peaks(freq_b, yb, prominence=args.peak_prominence)
-    peaks_b["config"] = "baseline"
-    peaks_t = _detect_peaks(freq_t, yt, prominence=args.peak_prominence)
-    peaks_t["config"] = "treated"
-    peaks = pd.concat([peaks_b, peaks_t], ignore_index=True)
+    with inst.stage("detect") as st:
+        peaks_b = _detect_peaks(freq_b, yb, prominence=args.peak_prominence, in_db=use_db)
+        peaks_b["config"] = "baseline"
+        peaks_t = _detect_peaks(freq_t, yt, prominence=args.peak_prominence, in_db=use_db)
+        peaks_t["config"] = "treated"
+        peaks = pd.concat([peaks_b, peaks_t], ignore_index=True)
+        st["sizes"].update(peaks=len(peaks))
 
     ensure_dir(args.outdir)
-    ensure_dir(os.path.dirname(args.peaks_outfile))
+    ensure_dir(os.path.dirname(args.peaks_outfile) or ".")
 
     # Plot
-    plt.figure()
-    plt.plot(freq_b, yb, label="Baseline (mean)")
-    plt.plot(freq_t, yt, label="Treated (mean)")
-    plt.xlabel("Frequency (Hz)")
-    plt.ylabel(y_label)
-    plt.title(args.title)
-    plt.legend()
-
-    if args.log_y and not use_db:
-        plt.yscale("log")
-
-    # Traceability footer
-    trace_b = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files)
-    trace_t = TraceInfo(run_ids=parse_run_ids(args.run_ids_treated), raw_files=treated_files)
-    footer = f"BASELINE: {trace_line(trace_b)}\nTREATED: {trace_line(trace_t)}"
-    plt.gcf().text(0.01, 0.01, footer, fontsize=8, va="bottom")
-
-    outpath = os.path.join(args.outdir, args.outfile)
-    plt.tight_layout()
-    plt.savefig(outpath, dpi=200)
-    plt.close()
-
-    peaks.to_csv(args.peaks_outfile, index=False)
+    with inst.stage("render") as st:
+        fig = plt.figure()
+        n_px = 0 if args.full_res_plot else pixel_columns(fig, dpi=200)
+        curves = [minmax_envelope(freq_b, yb, n_px), minmax_envelope(freq_t, yt, n_px)]
+        plt.plot(*curves[0], label="Baseline (mean)")
+        plt.plot(*curves[1], label="Treated (mean)")
+        st["sizes"].update(plotted_points=sum(x.size for x, _ in curves))
+        plt.xlabel("Frequency (Hz)")
+        plt.ylabel(y_label)
+        plt.title(args.title)
+        plt.legend()
+
+        if args.log_y and not use_db:
+            plt.yscale("log")
+
+        # Traceability footer
+        trace_b = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files)
+        trace_t = TraceInfo(run_ids=parse_run_ids(args.run_ids_treated), raw_files=treated_files)
+        footer = f"BASELINE: {trace_line(trace_b)}\nTREATED: {trace_line(trace_t)}"
+        plt.gcf().text(0.01, 0.01, footer, fontsize=8, va="bottom")
+
+        outpath = os.path.join(args.outdir, args.outfile)
+        plt.tight_layout()
+        plt.savefig(outpath, dpi=200)
+        plt.close()
+
+    outputs = [outpath, args.peaks_outfile]
+    with inst.stage("tabulate"):
+        peaks.to_csv(args.peaks_outfile, index=False)
+        if args.bands:
+            f_lo, f_hi = max(freq_b[0], freq_t[0]), min(freq_b[-1], freq_t[-1])
+            bands = parse_bands(args.bands, f_lo, f_hi)
+            table = band_table(bands, (freq_b, val_b), (freq_t, val_t), stats=("max", "rms"))
+            ensure_dir(os.path.dirname(args.bands_outfile) or ".")
+            table.to_csv(args.bands_outfile, index=False)
+            outputs.append(args.bands_outfile)
+
+    if index_path():
+        units = "dB" if use_db else "linear"
+        peak_rows = peaks.rename(
+            columns={"config": "role", "peak_freq_hz": "freq_hz", "peak_value": "value", "zeta_half_power": "zeta"}
+        ).assign(units=units)
+        record_result(
+            "plot_frf",
+            args.peaks_outfile,
+            outputs=outputs,
+            params=argv,
+            baseline_files=baseline_files,
+            treated_files=treated_files,
+            run_ids_baseline=trace_b.run_ids,
+            run_ids_treated=trace_t.run_ids,
+            peaks=peak_rows.to_dict("records"),
+            deltas=band_rows(table, "linear") if args.bands else (),
+        )
 
     print(f"[IX-Vibe] Wrote plot: {outpath}")
     print(f"[IX-Vibe] Wrote peaks: {args.peaks_outfile}")
+    if args.bands:
+        print(f"[IX-Vibe] Wrote band table: {args.bands_outfile}")
     print(f"[IX-Vibe] Note: dB mode = {use_db}")
+    sidecar = inst.write_sidecar(
+        outpath,
+        outputs=outputs,
+        run_ids=[*trace_b.run_ids, *trace_t.run_ids],
+        raw_files=baseline_files + treated_files,
+    )
+    if sidecar:
+        print(f"[IX-Vibe] Wrote perf: {sidecar}")
 
 
 if __name__ == "__main__":
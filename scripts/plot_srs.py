@@ -4,6 +4,10 @@ IX-Vibe SRS plotting utility (v0.1)
 Inputs:
 - One or more baseline SRS CSVs
 - One or more treated SRS CSVs
+- or, with --time_history, raw acceleration time histories (SRS computed by srs_engine.py).
+  Each file is one run: its SRS is the maximax envelope over its channels (--channels
+  limits which sensors enter the envelope). Channels are different sensors, not repeats,
+  so they are never averaged together; the files of each set are the repeats.
 
 Expected CSV columns:
 - frequency: freq_hz / frequency_hz / frequency / freq
@@ -11,7 +15,7 @@ Expected CSV columns:
 
 Outputs:
 - PNG plot with traceability footer
-- CSV summary of band deltas (optional coarse bands)
+- CSV summary of band-peak deltas (coarse user bands or a fractional-octave set, see bands.py)
 
 This script is intentionally conservative: it plots, and computes simple deltas.
 """
@@ -20,60 +24,66 @@ from __future__ import annotations
 
 import argparse
 import os
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, read_spectrum_csv, trace_line
-
-
-def _aggregate(files: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+from aggregate import DEFAULT_MAX_POINTS, aggregate_files, aggregate_spectra
+from bands import BandSet, band_table, parse_bands
+from common_io import (
+    TraceInfo,
+    _normalize_name,
+    ensure_dir,
+    parse_csv_list,
+    parse_run_ids,
+    trace_line,
+)
+from decimate import minmax_envelope, pixel_columns
+from instrument import Instrumentation, add_perf_arguments
+from raw_store import read_time_history
+from results_index import index_path, record_result
+from srs_engine import compute_srs, natural_frequency_grid
+
+
+def _srs_from_time_histories(
+    files: List[str],
+    fn: np.ndarray,
+    damping: float,
+    sample_rate_hz: Optional[float],
+    channels: Sequence[str] = (),
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """One maximax SRS per raw time-history file: the envelope over its (selected) channels."""
+    wanted = [_normalize_name(c) for c in channels]
     spectra = []
     for f in files:
-        freq, val, _ = read_spectrum_csv(f)
-        spectra.append((freq.to_numpy(), val.to_numpy()))
-
-    f_min = max(s[0].min() for s in spectra)
-    f_max = min(s[0].max() for s in spectra)
-    if f_max <= f_min:
-        raise ValueError("SRS frequency ranges do not overlap sufficiently for aggregation.")
-
-    f0 = spectra[0][0]
-    step = np.median(np.diff(f0))
-    if not np.isfinite(step) or step <= 0:
-        step = (f_max - f_min) / 2000.0
-
-    f_common = np.arange(f_min, f_max, step)
-    vals = [np.interp(f_common, fx, vx) for fx, vx in spectra]
-    mean_val = np.mean(np.vstack(vals), axis=0)
-    return f_common, mean_val
-
-
-def _band_table(freq: np.ndarray, base: np.ndarray, treat: np.ndarray, bands: List[Tuple[float, float]]) -> pd.DataFrame:
-    rows = []
-    for f1, f2 in bands:
-        mask = (freq >= f1) & (freq < f2)
-        if not np.any(mask):
-            continue
-        b = float(np.max(base[mask]))
-        t = float(np.max(treat[mask]))
-        delta = t - b
-        delta_pct = (t / b - 1.0) * 100.0 if b != 0 else np.nan
-        rows.append(
-            {
-                "band_hz": f"{f1:g}-{f2:g}",
-                "baseline_peak": b,
-                "treated_peak": t,
-                "delta": delta,
-                "delta_percent": delta_pct,
-            }
-        )
-    return pd.DataFrame(rows)
-
-
-def main() -> None:
+        fs, names, data = read_time_history(f, sample_rate_hz=sample_rate_hz)
+        if wanted:
+            missing = [c for c in wanted if c not in names]
+            if missing:
+                raise ValueError(f"Channels not found in {f}: {', '.join(missing)}")
+            data = data[[names.index(c) for c in wanted]]
+        fn_ok = fn[fn < fs / 2.0]
+        result = compute_srs(data, fs, fn_ok, damping=damping)
+        spectra.append((fn_ok, result.maximax.max(axis=0)))
+    return spectra
+
+
+def _peak_band_table(bands: BandSet, freq: np.ndarray, base: np.ndarray, treat: np.ndarray) -> pd.DataFrame:
+    table = band_table(bands, (freq, base), (freq, treat), stats=("max",))
+    return pd.DataFrame(
+        {
+            "band_hz": table["band_hz"],
+            "baseline_peak": table["baseline_max"],
+            "treated_peak": table["treated_max"],
+            "delta": table["delta_max"],
+            "delta_percent": table["delta_max_percent"],
+        }
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
     ap = argparse.ArgumentParser(description="Plot SRS baseline vs treated with traceability.")
     ap.add_argument("--baseline", required=True, help="Comma-separated baseline SRS CSV files")
     ap.add_argument("--treated", required=True, help="Comma-separated treated SRS CSV files")
@@ -83,60 +93,116 @@ def main() -> None:
     ap.add_argument("--outdir", default="results/plots", help="Output directory")
     ap.add_argument("--outfile", default="srs_baseline_vs_treated.png", help="Output plot filename")
     ap.add_argument("--bands_outfile", default="results/output/srs_band_deltas.csv", help="Output band deltas CSV")
-    ap.add_argument("--bands", default="20-100,100-500,500-2000,2000-5000", help="Comma bands f1-f2")
-    args = ap.parse_args()
+    ap.add_argument(
+        "--bands",
+        default="20-100,100-500,500-2000,2000-5000",
+        help="Comma bands f1-f2, or a fractional-octave set: octave, 1/3, 1/6, 1/12",
+    )
+    ap.add_argument("--grid", choices=("linear", "log"), default="linear", help="Common frequency grid spacing")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS, help="Upper bound on common grid size")
+    ap.add_argument("--time_history", action="store_true", help="Inputs are raw acceleration histories; compute SRS")
+    ap.add_argument("--channels", default="", help="Channels in the per-file SRS envelope (default: all)")
+    ap.add_argument("--sample_rate_hz", type=float, default=None, help="Sample rate if histories have no time column")
+    ap.add_argument("--fn_min", type=float, default=10.0, help="Lowest SRS natural frequency (Hz, --time_history)")
+    ap.add_argument("--fn_max", type=float, default=10000.0, help="Highest SRS natural frequency (Hz, --time_history)")
+    ap.add_argument("--points_per_octave", type=int, default=12, help="SRS natural frequencies per octave")
+    ap.add_argument("--damping", type=float, default=0.05, help="SRS damping ratio (0.05 = Q of 10)")
+    ap.add_argument("--full_res_plot", action="store_true", help="Draw every point (no per-pixel min/max decimation)")
+    add_perf_arguments(ap)
+    args = ap.parse_args(argv)
+    inst = Instrumentation("plot_srs", enabled=args.perf or None, profile_stage=args.profile_stage)
 
     baseline_files = list(parse_csv_list(args.baseline))
     treated_files = list(parse_csv_list(args.treated))
 
-    fb, vb = _aggregate(baseline_files)
-    ft, vt = _aggregate(treated_files)
-
-    # Match frequency grid if slight differences
-    f_min = max(fb.min(), ft.min())
-    f_max = min(fb.max(), ft.max())
-    mask_b = (fb >= f_min) & (fb <= f_max)
-    mask_t = (ft >= f_min) & (ft <= f_max)
-    f_common = fb[mask_b]
-    vb2 = vb[mask_b]
-    vt2 = np.interp(f_common, ft[mask_t], vt[mask_t])
+    notes = ""
+    if args.time_history:
+        with inst.stage("load") as st:
+            fn = natural_frequency_grid(args.fn_min, args.fn_max, args.points_per_octave)
+            channels = [c.strip() for c in args.channels.split(",") if c.strip()]
+            spectra_b = _srs_from_time_histories(baseline_files, fn, args.damping, args.sample_rate_hz, channels)
+            spectra_t = _srs_from_time_histories(treated_files, fn, args.damping, args.sample_rate_hz, channels)
+            envelope = ", ".join(channels) if channels else "all channels"
+            notes = f"maximax SRS (envelope of {envelope}), damping={args.damping:g}, {args.points_per_octave}/oct"
+            st["sizes"].update(curves=len(spectra_b) + len(spectra_t))
+    with inst.stage("aggregate") as st:
+        if args.time_history:
+            agg_b = aggregate_spectra(spectra_b, scale=args.grid, max_points=args.max_points)
+            agg_t = aggregate_spectra(spectra_t, scale=args.grid, max_points=args.max_points)
+        else:
+            # streamed from disk batch by batch: memory does not grow with the run count
+            agg_b = aggregate_files(baseline_files, scale=args.grid, max_points=args.max_points)
+            agg_t = aggregate_files(treated_files, scale=args.grid, max_points=args.max_points)
+        fb, vb = agg_b.freq_hz, agg_b.mean
+        ft, vt = agg_t.freq_hz, agg_t.mean
+
+        # Match frequency grid if slight differences
+        f_min = max(fb.min(), ft.min())
+        f_max = min(fb.max(), ft.max())
+        mask_b = (fb >= f_min) & (fb <= f_max)
+        mask_t = (ft >= f_min) & (ft <= f_max)
+        f_common = fb[mask_b]
+        vb2 = vb[mask_b]
+        vt2 = np.interp(f_common, ft[mask_t], vt[mask_t])
+        st["sizes"].update(grid_points=f_common.size)
 
     ensure_dir(args.outdir)
-    ensure_dir(os.path.dirname(args.bands_outfile))
-
-    plt.figure()
-    plt.plot(f_common, vb2, label="Baseline (mean)")
-    plt.plot(f_common, vt2, label="Treated (mean)")
-    plt.xlabel("Frequency (Hz)")
-    plt.ylabel("SRS (units as provided)")
-    plt.title(args.title)
-    plt.legend()
-    plt.yscale("log")  # SRS commonly spans orders of magnitude
-
-    trace_b = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files)
-    trace_t = TraceInfo(run_ids=parse_run_ids(args.run_ids_treated), raw_files=treated_files)
-    footer = f"BASELINE: {trace_line(trace_b)}\nTREATED: {trace_line(trace_t)}"
-    plt.gcf().text(0.01, 0.01, footer, fontsize=8, va="bottom")
-
-    outpath = os.path.join(args.outdir, args.outfile)
-    plt.tight_layout()
-    plt.savefig(outpath, dpi=200)
-    plt.close()
+    ensure_dir(os.path.dirname(args.bands_outfile) or ".")
+
+    with inst.stage("render") as st:
+        fig = plt.figure()
+        n_px = 0 if args.full_res_plot else pixel_columns(fig, dpi=200)
+        curves = [minmax_envelope(f_common, vb2, n_px), minmax_envelope(f_common, vt2, n_px)]
+        plt.plot(*curves[0], label="Baseline (mean)")
+        plt.plot(*curves[1], label="Treated (mean)")
+        st["sizes"].update(plotted_points=sum(x.size for x, _ in curves))
+        plt.xlabel("Frequency (Hz)")
+        plt.ylabel("SRS (units as provided)")
+        plt.title(args.title)
+        plt.legend()
+        plt.yscale("log")  # SRS commonly spans orders of magnitude
+
+        trace_b = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files, notes=notes)
+        trace_t = TraceInfo(run_ids=parse_run_ids(args.run_ids_treated), raw_files=treated_files, notes=notes)
+        footer = f"BASELINE: {trace_line(trace_b)}\nTREATED: {trace_line(trace_t)}"
+        plt.gcf().text(0.01, 0.01, footer, fontsize=8, va="bottom")
+
+        outpath = os.path.join(args.outdir, args.outfile)
+        plt.tight_layout()
+        plt.savefig(outpath, dpi=200)
+        plt.close()
 
     # Band deltas
-    bands = []
-    for seg in args.bands.split(","):
-        seg = seg.strip()
-        if not seg:
-            continue
-        f1s, f2s = seg.split("-")
-        bands.append((float(f1s), float(f2s)))
-
-    table = _band_table(f_common, vb2, vt2, bands)
-    table.to_csv(args.bands_outfile, index=False)
+    with inst.stage("tabulate") as st:
+        bands = parse_bands(args.bands, f_common.min(), f_common.max())
+        table = _peak_band_table(bands, f_common, vb2, vt2)
+        table.to_csv(args.bands_outfile, index=False)
+        st["sizes"].update(bands=len(bands))
+
+    if index_path():
+        band_deltas = table.rename(columns={"baseline_peak": "baseline_value", "treated_peak": "treated_value"})
+        record_result(
+            "plot_srs",
+            args.bands_outfile,
+            outputs=[outpath, args.bands_outfile],
+            params=argv,
+            baseline_files=baseline_files,
+            treated_files=treated_files,
+            run_ids_baseline=trace_b.run_ids,
+            run_ids_treated=trace_t.run_ids,
+            deltas=band_deltas.assign(metric="band_max", units="linear").to_dict("records"),
+        )
 
     print(f"[IX-Vibe] Wrote plot: {outpath}")
     print(f"[IX-Vibe] Wrote band deltas: {args.bands_outfile}")
+    sidecar = inst.write_sidecar(
+        outpath,
+        outputs=[outpath, args.bands_outfile],
+        run_ids=[*trace_b.run_ids, *trace_t.run_ids],
+        raw_files=baseline_files + treated_files,
+    )
+    if sidecar:
+        print(f"[IX-Vibe] Wrote perf: {sidecar}")
 
 
 if __name__ == "__main__":
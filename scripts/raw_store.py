@@ -0,0 +1,354 @@
+"""
+IX-Vibe raw recording store (v0.1)
+
+Purpose:
+- Long multi-channel DAQ captures (the `raw_data_files` of a run) are too large to load
+  with pd.read_csv every time they are analysed.
+- Convert each recording once into a memory-mappable binary file (.ixraw), then read
+  chunks / channel slices straight from the page cache with np.memmap.
+
+File layout (.ixraw):
+- 8-byte magic b"IXVRAW01", 8-byte little-endian header length
+- JSON header: sample_rate_hz, channels, n_samples, capacity, dtype, calibration, source,
+  processing (steps applied since capture, e.g. resampling by resample_raw.py), data_offset
+- padding to a 4096-byte boundary (data_offset), then the samples, channel-major:
+  shape (n_channels, capacity), C order, so one channel is one contiguous run of bytes.
+  Only the first n_samples columns are valid (capacity >= n_samples is the row-count
+  upper bound used to size the file before streaming the CSV into it).
+
+Calibration:
+- Stored per channel as a multiplicative scale (engineering units per stored unit).
+- Samples are stored as recorded. Reads are zero-copy views unless a channel has a scale
+  other than 1.0 and calibrated=True, in which case that chunk is a scaled copy.
+
+Usage example:
+python scripts/raw_store.py --inputs "data/raw/run01_FRF.csv" --calibration "acc1=0.0102,acc2=0.0098"
+python scripts/raw_store.py --info data/raw/run01_FRF.ixraw
+
+Notes:
+- float32 (default) halves the file size and is exact for <= 24-bit ADC data;
+  use --dtype float64 when the CSV carries more precision than that.
+- A store whose source CSV changed size or mtime is stale; ensure_raw() rebuilds it.
+- srs_engine.py, plot_srs.py and frf_estimate.py accept .ixraw files wherever they
+  accept time-history CSVs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common_io import _normalize_name, iter_time_history_csv, parse_csv_list, read_time_history_csv
+
+RAW_EXT = ".ixraw"
+_MAGIC = b"IXVRAW01"
+_ALIGN = 4096
+
+
+@dataclass(frozen=True)
+class RawHeader:
+    sample_rate_hz: float
+    channels: List[str]
+    n_samples: int
+    capacity: int
+    dtype: str
+    calibration: Dict[str, float] = field(default_factory=dict)
+    source: Dict[str, object] = field(default_factory=dict)
+    processing: List[Dict[str, object]] = field(default_factory=list)
+    data_offset: int = 0  # byte offset of the samples; set by _encode_header
+
+
+def _encode_header(header: RawHeader, reserve: int = 0) -> bytes:
+    """
+    Magic + length + JSON, padded to a 4096-byte boundary of at least `reserve` bytes. The
+    padded size is written into the header as data_offset (its digits can move the size
+    across a boundary, hence the loop), so a later, shorter rewrite still points at the data.
+    """
+    n = -(-reserve // _ALIGN) * _ALIGN
+    while True:
+        body = json.dumps({**header.__dict__, "data_offset": n}, sort_keys=True).encode("utf-8")
+        need = -(-max(len(_MAGIC) + 8 + len(body), reserve) // _ALIGN) * _ALIGN
+        if need == n:
+            return (_MAGIC + struct.pack("<Q", len(body)) + body).ljust(n, b" ")
+        n = need
+
+
+def read_header(path: str) -> Tuple[RawHeader, int]:
+    """Return (header, data_offset) of an .ixraw file."""
+    with open(path, "rb") as fh:
+        magic = fh.read(len(_MAGIC))
+        if magic != _MAGIC:
+            raise ValueError(f"Not an IX-Vibe raw store: {path}")
+        (length,) = struct.unpack("<Q", fh.read(8))
+        meta = json.loads(fh.read(length).decode("utf-8"))
+    header = RawHeader(**meta)
+    # stores written without data_offset: assume the final header still spans the same pages
+    offset = header.data_offset or -(-(len(_MAGIC) + 8 + length) // _ALIGN) * _ALIGN
+    return header, offset
+
+
+class RawRecording:
+    """Read-only, memory-mapped view of an .ixraw recording."""
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Raw store not found: {path}")
+        self.path = path
+        self.header, offset = read_header(path)
+        h = self.header
+        full = np.memmap(path, dtype=h.dtype, mode="r", offset=offset, shape=(len(h.channels), h.capacity))
+        self.data = full[:, : h.n_samples]  # (n_channels, n_samples) view
+        self._index = {c: i for i, c in enumerate(h.channels)}
+
+    @property
+    def fs(self) -> float:
+        return float(self.header.sample_rate_hz)
+
+    @property
+    def channels(self) -> List[str]:
+        return list(self.header.channels)
+
+    @property
+    def n_samples(self) -> int:
+        return int(self.header.n_samples)
+
+    def _rows(self, channels: Optional[Sequence[str]]):
+        """Row selector: a slice (keeps reads zero-copy) when the channels are contiguous."""
+        if channels is None:
+            return slice(None), self.channels
+        names = [_normalize_name(c) for c in channels]
+        missing = [c for c in names if c not in self._index]
+        if missing:
+            raise ValueError(f"Channels not found in {self.path}: {', '.join(missing)}")
+        idx = [self._index[c] for c in names]
+        if idx == list(range(idx[0], idx[0] + len(idx))):
+            return slice(idx[0], idx[0] + len(idx)), names
+        return np.asarray(idx), names
+
+    def _scale(self, names: Sequence[str]) -> Optional[np.ndarray]:
+        scale = np.array([self.header.calibration.get(c, 1.0) for c in names], dtype=float)
+        return None if np.all(scale == 1.0) else scale[:, None]
+
+    def read(
+        self,
+        channels: Optional[Sequence[str]] = None,
+        start: int = 0,
+        stop: Optional[int] = None,
+        calibrated: bool = True,
+    ) -> np.ndarray:
+        """Samples [start, stop) of the given channels, shape (n_channels, n)."""
+        rows, names = self._rows(channels)
+        block = self.data[rows, start:stop]
+        scale = self._scale(names) if calibrated else None
+        return block if scale is None else block * scale
+
+    def channel(self, name: str, start: int = 0, stop: Optional[int] = None, calibrated: bool = True) -> np.ndarray:
+        return self.read([name], start, stop, calibrated)[0]
+
+    def iter_chunks(
+        self,
+        chunk_samples: int = 65536,
+        channels: Optional[Sequence[str]] = None,
+        calibrated: bool = True,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (start_sample, block) with block shape (n_channels, <= chunk_samples)."""
+        rows, names = self._rows(channels)
+        scale = self._scale(names) if calibrated else None
+        for start in range(0, self.n_samples, chunk_samples):
+            block = self.data[rows, start : start + chunk_samples]
+            yield start, (block if scale is None else block * scale)
+
+
+def _count_rows(path: str) -> int:
+    """Upper bound on data rows: newline count minus the header line."""
+    n = 0
+    last = b"\n"
+    with open(path, "rb") as fh:
+        for buf in iter(lambda: fh.read(1 << 24), b""):
+            n += buf.count(b"\n")
+            last = buf[-1:]
+    if last != b"\n":
+        n += 1
+    return max(n - 1, 0)
+
+
+def _source_info(path: str) -> Dict[str, object]:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def raw_path_for(csv_path: str, store_dir: Optional[str] = None) -> str:
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(store_dir or os.path.dirname(csv_path), stem + RAW_EXT)
+
+
+def convert_csv(
+    src: str,
+    dest: Optional[str] = None,
+    dtype: str = "float32",
+    sample_rate_hz: Optional[float] = None,
+    calibration: Optional[Dict[str, float]] = None,
+    chunk_rows: int = 65536,
+) -> str:
+    """Stream a time-history CSV into an .ixraw file. Returns the written path."""
+    if not os.path.exists(src):
+        raise FileNotFoundError(f"CSV not found: {src}")
+    dest = dest or raw_path_for(src)
+    capacity = _count_rows(src)
+    chunks = iter_time_history_csv(src, chunk_rows=chunk_rows, sample_rate_hz=sample_rate_hz)
+    try:
+        fs, channels, first = next(chunks)
+    except StopIteration:
+        raise ValueError(f"No samples read from {src}.") from None
+
+    calib = {_normalize_name(k): float(v) for k, v in (calibration or {}).items()}
+    unknown = [c for c in calib if c not in channels]
+    if unknown:
+        raise ValueError(f"Calibration given for unknown channels in {src}: {', '.join(unknown)}")
+    header = RawHeader(
+        sample_rate_hz=fs,
+        channels=channels,
+        n_samples=capacity,
+        capacity=capacity,
+        dtype=np.dtype(dtype).name,
+        calibration=calib,
+        source=_source_info(src),
+    )
+    # Reserve the header at its largest (n_samples == capacity) so the final rewrite fits.
+    prefix = _encode_header(header)
+
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(prefix)
+        out = np.memmap(tmp, dtype=header.dtype, mode="r+", offset=len(prefix), shape=(len(channels), capacity))
+        n = 0
+        for block in _chain(first, chunks):
+            k = block.shape[1]
+            out[:, n : n + k] = block
+            n += k
+        out.flush()
+        del out
+        final = RawHeader(**{**header.__dict__, "n_samples": n})
+        with open(tmp, "r+b") as fh:
+            fh.write(_encode_header(final, reserve=len(prefix)))
+        os.replace(tmp, dest)  # atomic: readers never see a half-written store
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return dest
+
+
+def _chain(first: np.ndarray, rest) -> Iterator[np.ndarray]:
+    yield first
+    for _, _, block in rest:
+        yield block
+
+
+def is_stale(raw_path: str, src: str) -> bool:
+    if not os.path.exists(raw_path):
+        return True
+    try:
+        header, _ = read_header(raw_path)
+    except (ValueError, OSError):
+        return True
+    if not header.data_offset:
+        return True  # older layout; the offset may be one page off, so rebuild
+    cur = _source_info(src)
+    return header.source.get("size") != cur["size"] or header.source.get("mtime_ns") != cur["mtime_ns"]
+
+
+def ensure_raw(src: str, store_dir: Optional[str] = None, **convert_kwargs) -> RawRecording:
+    """Open the .ixraw store for a CSV, converting (or rebuilding a stale one) first."""
+    if src.endswith(RAW_EXT):
+        return RawRecording(src)
+    dest = raw_path_for(src, store_dir)
+    if is_stale(dest, src):
+        convert_csv(src, dest, **convert_kwargs)
+    return RawRecording(dest)
+
+
+def read_time_history(path: str, sample_rate_hz: Optional[float] = None) -> Tuple[float, List[str], np.ndarray]:
+    """read_time_history_csv that also accepts .ixraw stores (returned as a memory-mapped view)."""
+    if path.endswith(RAW_EXT):
+        rec = RawRecording(path)
+        return sample_rate_hz or rec.fs, rec.channels, rec.read()
+    return read_time_history_csv(path, sample_rate_hz=sample_rate_hz)
+
+
+def iter_time_history(
+    path: str,
+    chunk_rows: int = 65536,
+    sample_rate_hz: Optional[float] = None,
+    channels: Optional[Sequence[str]] = None,
+) -> Iterator[Tuple[float, List[str], np.ndarray]]:
+    """iter_time_history_csv that also accepts .ixraw stores."""
+    if not path.endswith(RAW_EXT):
+        yield from iter_time_history_csv(path, chunk_rows=chunk_rows, sample_rate_hz=sample_rate_hz, channels=channels)
+        return
+    rec = RawRecording(path)
+    fs = sample_rate_hz or rec.fs
+    _, names = rec._rows(channels)
+    for _, block in rec.iter_chunks(chunk_rows, channels=channels):
+        yield fs, names, block
+
+
+def _parse_calibration(arg: str) -> Dict[str, float]:
+    calib: Dict[str, float] = {}
+    for item in parse_csv_list(arg):
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Calibration entries must look like channel=scale, got '{item}'.")
+        calib[name.strip()] = float(value)
+    return calib
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Convert raw time-history CSVs into memory-mappable .ixraw stores.")
+    ap.add_argument("--inputs", default="", help="Comma-separated time-history CSV files to convert")
+    ap.add_argument("--store_dir", default="", help="Output directory (default: next to each CSV)")
+    ap.add_argument("--dtype", default="float32", choices=("float32", "float64"), help="Stored sample type")
+    ap.add_argument("--sample_rate_hz", type=float, default=None, help="Sample rate if CSVs have no time column")
+    ap.add_argument("--calibration", default="", help="Comma-separated channel=scale factors")
+    ap.add_argument("--chunk_rows", type=int, default=65536, help="CSV rows parsed per chunk (memory bound)")
+    ap.add_argument("--force", action="store_true", help="Rebuild even if the store is up to date")
+    ap.add_argument("--info", default="", help="Print the header of an existing .ixraw file and exit")
+    args = ap.parse_args(argv)
+
+    if args.info:
+        header, _ = read_header(args.info)
+        print(json.dumps(header.__dict__, indent=2))
+        return
+
+    calibration = _parse_calibration(args.calibration) if args.calibration else None
+    if args.store_dir:
+        os.makedirs(args.store_dir, exist_ok=True)
+    for src in parse_csv_list(args.inputs):
+        dest = raw_path_for(src, args.store_dir or None)
+        if not args.force and not is_stale(dest, src):
+            print(f"[IX-Vibe] Up to date: {dest}")
+            continue
+        try:
+            convert_csv(
+                src,
+                dest,
+                dtype=args.dtype,
+                sample_rate_hz=args.sample_rate_hz,
+                calibration=calibration,
+                chunk_rows=args.chunk_rows,
+            )
+        except ValueError as exc:
+            print(f"[IX-Vibe] Skipped {src}: {exc}")
+            continue
+        rec = RawRecording(dest)
+        print(f"[IX-Vibe] Wrote raw store: {dest} ({len(rec.channels)} ch x {rec.n_samples} samples @ {rec.fs:g} Hz)")
+
+
+if __name__ == "__main__":
+    main()
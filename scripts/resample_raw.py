@@ -0,0 +1,364 @@
+"""
+IX-Vibe anti-alias decimation / resampling of raw captures (v0.1)
+
+Purpose:
+- The test plan samples at >= 10x the highest frequency of interest, so raw records are
+  heavily oversampled for the FRF / SRS / acoustic bands actually analysed, and every
+  later step pays for the extra samples.
+- Resample each capture once, before analysis, to just above what its bands need; the
+  SRS, FRF and PSD steps then cost (and hold in memory) 1/factor as much.
+
+Inputs:
+- Time-history CSVs or .ixraw stores (CSVs are converted to .ixraw first, see raw_store.py)
+- Target: --factor M (integer decimation), --target_rate_hz, or --max_freq_hz F (the
+  largest integer factor that keeps fs_out >= --oversample * F)
+
+Method:
+- Linear-phase Kaiser FIR anti-alias filter designed for the job: passband up to
+  F (default 0.8 x output Nyquist), stopband from the output Nyquist, --atten_db deep.
+  Unity DC gain; the achieved passband ripple and stopband attenuation are measured from
+  the designed taps and recorded ("calibrated").
+- Zero phase: the filter's group delay is removed exactly, so output sample m sits at
+  time m / fs_out like the input (identical to scipy.signal.resample_poly with these taps).
+- Polyphase up/down (rational L/M) in streaming blocks: each block is filtered with only
+  the filter history carried from the previous one (no seams; output matches a one-shot
+  resample_poly of the whole record to rounding).
+- Channels are split across --workers processes; the output store is channel-major, so
+  each worker writes its own rows of the same memory-mapped file.
+
+Outputs:
+- <stem>_fs<rate>.ixraw next to the input (or in --store_dir), calibration applied, with
+  the resampling step in its header "processing" list.
+- The same entry is appended to processing.resampling in the run's metadata.yml
+  (tests/runs/<RUN_ID>/metadata.yml, found from the file name) unless --no_metadata.
+
+Usage example:
+python scripts/resample_raw.py --inputs data/raw/20260122_PANEL_BASELINE_01_SRS_accelsetA.ixraw --max_freq_hz 2000
+python scripts/resample_raw.py --inputs run.csv --factor 4 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+from scipy.signal import firwin, freqz, kaiserord, upfirdn
+
+from common_io import parse_csv_list
+from raw_store import RAW_EXT, RawHeader, RawRecording, _encode_header, ensure_raw
+from results_index import parse_run_name
+
+_SCRIPT_VERSION = "resample_raw v0.1"
+
+
+def choose_factors(
+    fs: float,
+    factor: int = 0,
+    target_rate_hz: float = 0.0,
+    max_freq_hz: float = 0.0,
+    oversample: float = 2.56,
+    max_denominator: int = 64,
+) -> Tuple[int, int]:
+    """(up, down) for the requested output rate."""
+    if factor:
+        if factor < 1:
+            raise ValueError("--factor must be >= 1.")
+        return 1, int(factor)
+    if target_rate_hz:
+        if not 0 < target_rate_hz <= fs:
+            raise ValueError(f"Target rate must be in (0, {fs:g}] Hz (upsampling is not supported).")
+        r = Fraction(target_rate_hz / fs).limit_denominator(max_denominator)
+        if r == 0:
+            raise ValueError(f"Target rate {target_rate_hz:g} Hz is too far below {fs:g} Hz.")
+        return r.numerator, r.denominator
+    if max_freq_hz:
+        down = int(np.floor(fs / (oversample * max_freq_hz)))
+        if down < 1:
+            raise ValueError(f"{fs:g} Hz is already below {oversample:g} x {max_freq_hz:g} Hz.")
+        return 1, down
+    raise ValueError("Give one of --factor, --target_rate_hz or --max_freq_hz.")
+
+
+def design_filter(
+    fs: float,
+    up: int,
+    down: int,
+    passband_hz: Optional[float] = None,
+    atten_db: float = 100.0,
+) -> Tuple[np.ndarray, Dict[str, float]]:
+    """
+    Kaiser-window anti-alias FIR at the upsampled rate fs * up, scaled by up.
+
+    Returns (taps, calibration) where calibration holds the measured passband ripple and
+    stopband attenuation of the taps actually used.
+    """
+    fs_out = fs * up / down
+    nyq_out = fs_out / 2.0
+    f_pass = 0.8 * nyq_out if passband_hz is None else float(passband_hz)
+    if not 0 < f_pass < nyq_out:
+        raise ValueError(f"Passband edge must lie below the output Nyquist ({nyq_out:g} Hz).")
+    nyq_up = fs * up / 2.0
+    if up == 1 and down == 1:
+        return np.ones(1), {"passband_hz": f_pass, "passband_ripple_db": 0.0, "stopband_atten_db": float("inf")}
+    numtaps, beta = kaiserord(atten_db, (nyq_out - f_pass) / nyq_up)
+    numtaps |= 1  # odd length: integer group delay, exact zero-phase alignment
+    taps = firwin(numtaps, 0.5 * (f_pass + nyq_out) / nyq_up, window=("kaiser", beta)) * up
+
+    w, resp = freqz(taps / up, worN=8192, fs=fs * up)
+    mag = np.abs(resp)
+    pass_db = 20.0 * np.log10(np.maximum(mag[w <= f_pass], 1e-300))
+    stop = mag[w >= nyq_out]
+    return taps, {
+        "passband_hz": f_pass,
+        "passband_ripple_db": float(np.max(np.abs(pass_db))),
+        "stopband_atten_db": float(-20.0 * np.log10(max(stop.max(), 1e-300))) if stop.size else float("inf"),
+    }
+
+
+def output_length(n_in: int, up: int, down: int) -> int:
+    return -(-n_in * up // down)
+
+
+class PolyphaseResampler:
+    """
+    Streaming equivalent of scipy.signal.resample_poly(x, up, down, axis=1, window=taps / up).
+
+    process() takes consecutive (n_channels, n) blocks and returns every output sample
+    that is already fully determined; finish() returns the rest. Only the last
+    ~len(taps) / up input samples are kept between blocks.
+    """
+
+    def __init__(self, taps: np.ndarray, up: int, down: int, n_channels: int):
+        self.h = np.asarray(taps, dtype=float)
+        self.up, self.down = int(up), int(down)
+        self.delay = (self.h.size - 1) // 2  # group delay at the upsampled rate
+        self._buf = np.zeros((n_channels, 0))
+        self._start = 0  # global input index of _buf[:, 0]
+        self._next = 0  # next output index
+        self.n_in = 0
+
+    def _emit(self, m_stop: int) -> np.ndarray:
+        """Outputs [_next, m_stop) from the buffered input."""
+        L, M, D, K = self.up, self.down, self.delay, self.h.size
+        n_ch = self._buf.shape[0]
+        if m_stop <= self._next:
+            return np.zeros((n_ch, 0))
+        # shift the taps so output m = v[m*M + D] lands on upfirdn's output grid
+        q = (self._start * L - D) % M
+        h = np.concatenate([np.zeros(q), self.h]) if q else self.h
+        full = upfirdn(h, self._buf, L, M, axis=1)
+        j0 = (self._next * M + D - self._start * L + q) // M
+        out = full[:, j0 : j0 + (m_stop - self._next)]
+        self._next = m_stop
+        # keep only the inputs the next output still needs
+        keep_from = max(self._start, (self._next * M + D - (K - 1)) // L)
+        self._buf = self._buf[:, keep_from - self._start :]
+        self._start = keep_from
+        return out
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        block = np.atleast_2d(np.asarray(block, dtype=float))
+        self._buf = np.concatenate([self._buf, block], axis=1)
+        self.n_in += block.shape[1]
+        end = self._start + self._buf.shape[1]
+        # v[n] needs inputs up to floor(n / L): ready while n < end * L
+        ready = (end * self.up - 1 - self.delay) // self.down + 1
+        return self._emit(max(ready, self._next))
+
+    def finish(self) -> np.ndarray:
+        """Remaining outputs, treating the input as zero after its last sample."""
+        n_out = output_length(self.n_in, self.up, self.down)
+        need = -(-((n_out - 1) * self.down + self.delay + 1) // self.up)  # inputs through v[last]
+        end = self._start + self._buf.shape[1]
+        if need > end:
+            self._buf = np.concatenate([self._buf, np.zeros((self._buf.shape[0], need - end))], axis=1)
+        return self._emit(n_out)
+
+
+def _resample_rows(
+    src: str,
+    dest: str,
+    offset: int,
+    shape: Tuple[int, int],
+    dtype: str,
+    rows: Sequence[int],
+    taps: np.ndarray,
+    up: int,
+    down: int,
+    chunk_samples: int,
+) -> int:
+    """Worker: resample some channels of src into their rows of the output memmap."""
+    rec = RawRecording(src)
+    names = [rec.channels[i] for i in rows]
+    out = np.memmap(dest, dtype=dtype, mode="r+", offset=offset, shape=shape)
+    rs = PolyphaseResampler(taps, up, down, len(rows))
+    r0, r1 = rows[0], rows[-1] + 1
+    n = 0
+    for _, block in rec.iter_chunks(chunk_samples, channels=names):
+        y = rs.process(block)
+        out[r0:r1, n : n + y.shape[1]] = y
+        n += y.shape[1]
+    y = rs.finish()
+    out[r0:r1, n : n + y.shape[1]] = y
+    out.flush()
+    return n + y.shape[1]
+
+
+def resampled_path(src: str, fs_out: float, store_dir: Optional[str] = None) -> str:
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(store_dir or os.path.dirname(src), f"{stem}_fs{fs_out:g}{RAW_EXT}")
+
+
+def resample_store(
+    src: str,
+    dest: str,
+    up: int,
+    down: int,
+    passband_hz: Optional[float] = None,
+    atten_db: float = 100.0,
+    workers: int = 1,
+    chunk_samples: int = 262144,
+    dtype: Optional[str] = None,
+) -> Dict[str, object]:
+    """Resample one .ixraw store into dest. Returns the processing entry written to its header."""
+    rec = RawRecording(src)
+    fs_out = rec.fs * up / down
+    taps, calib = design_filter(rec.fs, up, down, passband_hz, atten_db)
+    n_out = output_length(rec.n_samples, up, down)
+    n_ch = len(rec.channels)
+    dtype = dtype or rec.header.dtype
+    step = {
+        "step": "resample",
+        "script_version": _SCRIPT_VERSION,
+        "source": os.path.abspath(src),
+        "output": os.path.abspath(dest),
+        "sample_rate_in_hz": rec.fs,
+        "sample_rate_out_hz": fs_out,
+        "up": up,
+        "down": down,
+        "factor": down / up,
+        "filter": "Kaiser FIR, zero-phase polyphase",
+        "numtaps": int(taps.size),
+        "stopband_from_hz": fs_out / 2.0,
+        **calib,
+        "calibration_applied": dict(rec.header.calibration),
+    }
+    header = RawHeader(
+        sample_rate_hz=fs_out,
+        channels=rec.channels,
+        n_samples=n_out,
+        capacity=n_out,
+        dtype=np.dtype(dtype).name,
+        calibration={},
+        source=dict(rec.header.source),
+        processing=[*rec.header.processing, step],
+    )
+    prefix = _encode_header(header)
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(prefix)
+            fh.truncate(len(prefix) + n_ch * n_out * np.dtype(dtype).itemsize)
+        groups = [g.tolist() for g in np.array_split(np.arange(n_ch), max(1, min(workers, n_ch)))]
+        jobs = [(src, tmp, len(prefix), (n_ch, n_out), header.dtype, g, taps, up, down, chunk_samples) for g in groups]
+        if len(jobs) == 1:
+            counts = [_resample_rows(*jobs[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+                counts = list(pool.map(_resample_rows, *zip(*jobs)))
+        if any(c != n_out for c in counts):
+            raise RuntimeError(f"Resampled length mismatch: {counts} vs {n_out}")
+        os.replace(tmp, dest)  # atomic: readers never see a half-written store
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return step
+
+
+def metadata_path_for(path: str, runs_dir: str) -> Optional[str]:
+    """tests/runs/<RUN_ID>/metadata.yml of a raw file named per the data schema, if it exists."""
+    info = parse_run_name(path)
+    if not info:
+        return None
+    meta = os.path.join(runs_dir, str(info["run_id"]), "metadata.yml")
+    return meta if os.path.isfile(meta) else None
+
+
+def record_processing(meta_path: str, step: Dict[str, object]) -> None:
+    """Add (or replace, per source file and output) a resampling entry under processing.resampling."""
+    with open(meta_path, "r", encoding="utf-8") as fh:
+        meta = yaml.safe_load(fh) or {}
+    processing = meta.get("processing") or {}
+    if not isinstance(processing, dict):
+        processing = {"notes": str(processing)}
+    entries: List[dict] = [
+        e
+        for e in processing.get("resampling") or []
+        if not (e.get("source") == step["source"] and e.get("output") == step["output"])
+    ]
+    keys = ("source", "output", "sample_rate_in_hz", "sample_rate_out_hz", "up", "down", "factor", "filter",
+            "numtaps", "passband_hz", "passband_ripple_db", "stopband_atten_db", "script_version")
+    entries.append({k: step[k] for k in keys})
+    processing["resampling"] = entries
+    meta["processing"] = processing
+    tmp = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        yaml.safe_dump(meta, fh, sort_keys=False)
+    os.replace(tmp, meta_path)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Anti-alias filter and decimate / resample raw captures.")
+    ap.add_argument("--inputs", required=True, help="Comma-separated time-history CSV or .ixraw files")
+    ap.add_argument("--factor", type=int, default=0, help="Integer decimation factor")
+    ap.add_argument("--target_rate_hz", type=float, default=0.0, help="Output sample rate (rational L/M resampling)")
+    ap.add_argument("--max_freq_hz", type=float, default=0.0, help="Highest frequency of interest (picks the factor)")
+    ap.add_argument("--oversample", type=float, default=2.56, help="fs_out >= oversample x --max_freq_hz")
+    ap.add_argument("--passband_hz", type=float, default=None, help="Flat passband edge (default: --max_freq_hz or 0.8 x output Nyquist)")
+    ap.add_argument("--atten_db", type=float, default=100.0, help="Stopband attenuation (dB)")
+    ap.add_argument("--store_dir", default="", help="Output directory (default: next to each input)")
+    ap.add_argument("--dtype", default="", choices=("", "float32", "float64"), help="Stored sample type (default: as input)")
+    ap.add_argument("--workers", type=int, default=1, help="Processes; channels are split across them")
+    ap.add_argument("--chunk_samples", type=int, default=262144, help="Input samples per streamed block")
+    ap.add_argument("--sample_rate_hz", type=float, default=None, help="Sample rate if CSVs have no time column")
+    ap.add_argument("--runs_dir", default="tests/runs", help="Where to find <RUN_ID>/metadata.yml")
+    ap.add_argument("--no_metadata", action="store_true", help="Do not update the run metadata")
+    args = ap.parse_args(argv)
+
+    if args.store_dir:
+        os.makedirs(args.store_dir, exist_ok=True)
+    for path in parse_csv_list(args.inputs):
+        src = ensure_raw(path, args.store_dir or None, sample_rate_hz=args.sample_rate_hz).path
+        fs = RawRecording(src).fs
+        up, down = choose_factors(fs, args.factor, args.target_rate_hz, args.max_freq_hz, args.oversample)
+        passband = args.passband_hz or (args.max_freq_hz or None)
+        dest = resampled_path(src, fs * up / down, args.store_dir or None)
+        step = resample_store(
+            src,
+            dest,
+            up,
+            down,
+            passband_hz=passband,
+            atten_db=args.atten_db,
+            workers=args.workers,
+            chunk_samples=args.chunk_samples,
+            dtype=args.dtype or None,
+        )
+        print(
+            f"[IX-Vibe] Wrote resampled store: {dest} ({fs:g} -> {step['sample_rate_out_hz']:g} Hz, x{up}/{down}, "
+            f"{step['numtaps']} taps, ripple {step['passband_ripple_db']:.2g} dB to {step['passband_hz']:g} Hz, "
+            f"stopband {step['stopband_atten_db']:.0f} dB)"
+        )
+        meta = None if args.no_metadata else metadata_path_for(path, args.runs_dir)
+        if meta:
+            record_processing(meta, step)
+            print(f"[IX-Vibe] Recorded resampling in: {meta}")
+
+
+if __name__ == "__main__":
+    main()
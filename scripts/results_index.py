@@ -0,0 +1,485 @@
+"""
+IX-Vibe results index (v0.1)
+
+Purpose:
+- One embedded SQLite database that every analysis script writes its results into, so
+  cross-campaign questions ("the 142 Hz peak delta of every PANEL TREATED_A comparison
+  this quarter") are answered from indexed tables instead of re-opening result CSVs.
+
+Enabling:
+- Set IXVIBE_INDEX=<path.sqlite> (or pass --index to run_campaign.py, which sets it for
+  its jobs). Without it, record_result() is a no-op.
+
+Tables:
+- results      one row per script output: script, primary output, all outputs, argv
+                (parameters), stage, baseline / treated config, run date range, time
+- result_runs  run IDs behind each result, split into date / stage / config / run number,
+                with role (baseline / treated), acquisition type, sensor set, raw file and
+                its SHA-1
+- peaks        detected peaks: role, freq_hz, value, prominence, zeta, units
+- deltas       baseline-vs-treated numbers: metric (peak, band_max, band_rms, zeta, ...),
+                channel, freq_hz, band edges, baseline / treated value, delta, percent,
+                optional CI and p-value
+- file_hashes  SHA-1 cache keyed by path, reused while size and mtime are unchanged
+
+Indexes: run ID, (stage, config), result stage / configs / dates, frequency on peaks,
+and on deltas both (metric, freq_hz) and freq_hz / band edges alone, so a --freq query
+without --metric is an index search too (the peak-frequency and containing-band
+predicates run as the two arms of a UNION).
+
+Conventions:
+- role is always "baseline" or "treated" (ROLES); the configuration name lives in
+  result_runs.config and results.treated_config, one result per compared configuration.
+- every peak / delta row carries units ("dB", "linear", "ratio", ...).
+
+Notes:
+- Re-running a script for the same primary output replaces that output's rows, so the
+  index always describes the files currently on disk.
+- Writers use WAL mode and a busy timeout, so parallel campaign workers can record
+  concurrently.
+
+Usage example:
+python scripts/results_index.py --stage PANEL --config TREATED_A --freq 142 --tol 5 --since 20260101 --until 20260331
+python scripts/results_index.py --summary
+python scripts/results_index.py --sql "SELECT metric, COUNT(*) FROM deltas GROUP BY metric"
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+INDEX_ENV = "IXVIBE_INDEX"
+DEFAULT_INDEX = "results/output/results_index.sqlite"
+
+# YYYYMMDD_<stage>_<config>_<run#>[_<ACQ>_<sensor set>]; configs may contain underscores.
+_RUN_RE = re.compile(
+    r"(?P<date>\d{8})_(?P<stage>[A-Za-z0-9]+)_(?P<config>[A-Za-z0-9_]+?)_(?P<run>\d{2})"
+    r"(?:_(?P<acq>FRF|SRS|SHOCK|ACOUSTIC)_(?P<sensor>[^.]+))?"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    script TEXT NOT NULL,
+    primary_output TEXT NOT NULL UNIQUE,
+    outputs TEXT NOT NULL,
+    params TEXT NOT NULL,
+    stage TEXT,
+    baseline_config TEXT,
+    treated_config TEXT,
+    date_min TEXT,
+    date_max TEXT,
+    created_utc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS result_runs (
+    result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    run_id TEXT,
+    date TEXT,
+    stage TEXT,
+    config TEXT,
+    run_no INTEGER,
+    acq_type TEXT,
+    sensor TEXT,
+    raw_file TEXT,
+    raw_sha1 TEXT
+);
+CREATE TABLE IF NOT EXISTS peaks (
+    result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    channel TEXT,
+    freq_hz REAL NOT NULL,
+    value REAL,
+    prominence REAL,
+    zeta REAL,
+    units TEXT
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE,
+    metric TEXT NOT NULL,
+    channel TEXT,
+    freq_hz REAL,
+    band_lo_hz REAL,
+    band_hi_hz REAL,
+    baseline_value REAL,
+    treated_value REAL,
+    delta REAL,
+    delta_percent REAL,
+    ci_low REAL,
+    ci_high REAL,
+    p_value REAL,
+    units TEXT
+);
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_results_stage_cfg ON results(stage, treated_config, date_min);
+CREATE INDEX IF NOT EXISTS ix_runs_run_id ON result_runs(run_id);
+CREATE INDEX IF NOT EXISTS ix_runs_stage_cfg ON result_runs(stage, config);
+CREATE INDEX IF NOT EXISTS ix_runs_result ON result_runs(result_id);
+CREATE INDEX IF NOT EXISTS ix_peaks_freq ON peaks(freq_hz);
+CREATE INDEX IF NOT EXISTS ix_peaks_result ON peaks(result_id);
+CREATE INDEX IF NOT EXISTS ix_deltas_freq ON deltas(metric, freq_hz);
+CREATE INDEX IF NOT EXISTS ix_deltas_freq_any ON deltas(freq_hz);
+CREATE INDEX IF NOT EXISTS ix_deltas_band ON deltas(band_lo_hz, band_hi_hz);
+CREATE INDEX IF NOT EXISTS ix_deltas_result ON deltas(result_id);
+"""
+
+_DELTA_COLS = (
+    "metric", "channel", "freq_hz", "band_lo_hz", "band_hi_hz", "baseline_value", "treated_value",
+    "delta", "delta_percent", "ci_low", "ci_high", "p_value", "units",
+)
+_PEAK_COLS = ("role", "channel", "freq_hz", "value", "prominence", "zeta", "units")
+ROLES = ("baseline", "treated")  # result_runs.role and peaks.role
+
+
+def index_path() -> Optional[str]:
+    """The active index database (IXVIBE_INDEX), or None when indexing is off."""
+    return os.environ.get(INDEX_ENV) or None
+
+
+def connect(path: str) -> sqlite3.Connection:
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    con = sqlite3.connect(path, timeout=30.0)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA foreign_keys=ON")
+    con.executescript(_SCHEMA)
+    return con
+
+
+def parse_run_name(name: str) -> Dict[str, object]:
+    """Run ID fields from a run ID or raw file name (empty dict if it does not follow the convention)."""
+    m = _RUN_RE.search(os.path.basename(name))
+    if not m:
+        return {}
+    d = m.groupdict()
+    return {
+        "run_id": f"{d['date']}_{d['stage']}_{d['config']}_{d['run']}",
+        "date": d["date"],
+        "stage": d["stage"].upper(),
+        "config": d["config"].upper(),
+        "run_no": int(d["run"]),
+        "acq_type": d["acq"],
+        "sensor": d["sensor"],
+    }
+
+
+def _file_sha1(con: sqlite3.Connection, path: str) -> Optional[str]:
+    if not os.path.isfile(path):
+        return None
+    key = os.path.abspath(path)
+    st = os.stat(path)
+    row = con.execute("SELECT size, mtime_ns, sha1 FROM file_hashes WHERE path = ?", (key,)).fetchone()
+    if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+        return row[2]
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    con.execute(
+        "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha1) VALUES (?, ?, ?, ?)",
+        (key, st.st_size, st.st_mtime_ns, h.hexdigest()),
+    )
+    return h.hexdigest()
+
+
+def _run_rows(con, role: str, run_ids: Sequence[str], files: Sequence[str]) -> List[tuple]:
+    """One row per raw file (run ID from the matching --run_ids entry or the file name)."""
+    rows = []
+    n = max(len(run_ids), len(files))
+    for i in range(n):
+        f = files[i] if i < len(files) else None
+        rid = run_ids[i] if i < len(run_ids) else None
+        info = {**parse_run_name(f or ""), **{k: v for k, v in parse_run_name(rid or "").items() if v is not None}}
+        rows.append(
+            (
+                role,
+                info.get("run_id", rid),
+                info.get("date"),
+                info.get("stage"),
+                info.get("config"),
+                info.get("run_no"),
+                info.get("acq_type"),
+                info.get("sensor"),
+                f,
+                _file_sha1(con, f) if f else None,
+            )
+        )
+    return rows
+
+
+def split_band(label: str) -> Tuple[Optional[float], Optional[float]]:
+    """'20-100' -> (20.0, 100.0); anything else -> (None, None)."""
+    try:
+        lo, hi = str(label).split("-")
+        return float(lo), float(hi)
+    except ValueError:
+        return None, None
+
+
+def _clean(v):
+    """numpy / pandas scalars -> plain Python, NaN -> None."""
+    if v is None:
+        return None
+    if hasattr(v, "item"):
+        v = v.item()
+    if isinstance(v, float) and v != v:
+        return None
+    return v
+
+
+def record_result(
+    script: str,
+    primary_output: str,
+    outputs: Sequence[str] = (),
+    params: Optional[Sequence[str]] = None,
+    baseline_files: Sequence[str] = (),
+    treated_files: Sequence[str] = (),
+    run_ids_baseline: Sequence[str] = (),
+    run_ids_treated: Sequence[str] = (),
+    peaks: Iterable[dict] = (),
+    deltas: Iterable[dict] = (),
+    path: Optional[str] = None,
+) -> Optional[int]:
+    """
+    Write one result into the index (replacing earlier rows for the same primary output).
+
+    peaks:  dicts with keys from role ("baseline" / "treated"), channel, freq_hz, value,
+            prominence, zeta, units
+    deltas: dicts with keys from metric, channel, freq_hz, band_hz ("f1-f2") or band_lo_hz /
+            band_hi_hz, baseline_value, treated_value, delta, delta_percent, ci_low,
+            ci_high, p_value, units (band rows without freq_hz get the band center)
+    Returns the result id, or None when indexing is off.
+    """
+    path = path or index_path()
+    if not path:
+        return None
+    params = list(sys.argv[1:] if params is None else params)
+    peaks = list(peaks)
+    bad = sorted({str(p.get("role")) for p in peaks} - set(ROLES))
+    if bad:
+        raise ValueError(f"Peak role must be one of {', '.join(ROLES)}, got: {', '.join(bad)}")
+
+    with closing(connect(path)) as con, con:
+        runs = _run_rows(con, "baseline", list(run_ids_baseline), list(baseline_files))
+        runs += _run_rows(con, "treated", list(run_ids_treated), list(treated_files))
+        stages = sorted({r[3] for r in runs if r[3]})
+        b_cfg = sorted({r[4] for r in runs if r[0] == "baseline" and r[4]})
+        t_cfg = sorted({r[4] for r in runs if r[0] == "treated" and r[4]})
+        dates = sorted(r[2] for r in runs if r[2])
+
+        key = os.path.abspath(primary_output)
+        con.execute("DELETE FROM results WHERE primary_output = ?", (key,))
+        cur = con.execute(
+            "INSERT INTO results (script, primary_output, outputs, params, stage, baseline_config, treated_config,"
+            " date_min, date_max, created_utc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                script,
+                key,
+                json.dumps([os.path.abspath(o) for o in (outputs or [primary_output])]),
+                json.dumps(params),
+                ",".join(stages) or None,
+                ",".join(b_cfg) or None,
+                ",".join(t_cfg) or None,
+                dates[0] if dates else None,
+                dates[-1] if dates else None,
+                time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            ),
+        )
+        rid = cur.lastrowid
+        con.executemany(
+            "INSERT INTO result_runs (result_id, role, run_id, date, stage, config, run_no, acq_type, sensor,"
+            " raw_file, raw_sha1) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(rid, *r) for r in runs],
+        )
+        con.executemany(
+            f"INSERT INTO peaks (result_id, {', '.join(_PEAK_COLS)}) VALUES (?{', ?' * len(_PEAK_COLS)})",
+            [(rid, *(_clean(p.get(c)) for c in _PEAK_COLS)) for p in peaks],
+        )
+        rows = []
+        for d in deltas:
+            d = dict(d)
+            if d.get("band_hz") and "band_lo_hz" not in d:
+                d["band_lo_hz"], d["band_hi_hz"] = split_band(d["band_hz"])
+                if _clean(d.get("freq_hz")) is None and d["band_lo_hz"] and d["band_hi_hz"]:
+                    d["freq_hz"] = (d["band_lo_hz"] * d["band_hi_hz"]) ** 0.5  # band center
+            rows.append((rid, *(_clean(d.get(c)) for c in _DELTA_COLS)))
+        con.executemany(
+            f"INSERT INTO deltas (result_id, {', '.join(_DELTA_COLS)}) VALUES (?{', ?' * len(_DELTA_COLS)})",
+            rows,
+        )
+    return rid
+
+
+def band_rows(table, units: Optional[str] = None) -> List[dict]:
+    """Delta rows (metric band_<stat>) from a bands.band_table() frame."""
+    rows = []
+    for rec in table.to_dict("records"):
+        for stat in ("max", "rms", "energy"):
+            if f"delta_{stat}" in rec:
+                rows.append(
+                    {
+                        "metric": f"band_{stat}",
+                        "freq_hz": rec.get("center_hz"),
+                        "band_hz": rec["band_hz"],
+                        "baseline_value": rec[f"baseline_{stat}"],
+                        "treated_value": rec[f"treated_{stat}"],
+                        "delta": rec[f"delta_{stat}"],
+                        "delta_percent": rec[f"delta_{stat}_percent"],
+                        "units": units,
+                    }
+                )
+    return rows
+
+
+def query_deltas(
+    con: sqlite3.Connection,
+    metric: Optional[str] = None,
+    stage: Optional[str] = None,
+    config: Optional[str] = None,
+    freq: Optional[float] = None,
+    tol: float = 1.0,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    run_id: Optional[str] = None,
+    channel: Optional[str] = None,
+    limit: int = 1000,
+) -> Tuple[List[str], List[tuple]]:
+    """Delta rows joined with their result's stage / configs / dates / output."""
+    where, args = [], []
+    if metric:
+        where.append("d.metric = ?")
+        args.append(metric)
+    if stage:
+        where.append("r.stage = ?")
+        args.append(stage.upper())
+    if config:
+        where.append("r.treated_config = ?")
+        args.append(config.upper())
+    if freq is not None:
+        # Peak rows by frequency; band rows by containing band. As a UNION each arm is an
+        # index search (an OR of the two would scan the table).
+        where.append(
+            "d.rowid IN (SELECT rowid FROM deltas WHERE freq_hz BETWEEN ? AND ?"
+            " UNION SELECT rowid FROM deltas WHERE band_lo_hz <= ? AND band_hi_hz > ?)"
+        )
+        args += [freq - tol, freq + tol, freq, freq]
+    if since:
+        where.append("r.date_max >= ?")
+        args.append(since)
+    if until:
+        where.append("r.date_min <= ?")
+        args.append(until)
+    if run_id:
+        where.append("d.result_id IN (SELECT result_id FROM result_runs WHERE run_id = ?)")
+        args.append(run_id)
+    if channel:
+        where.append("d.channel = ?")
+        args.append(channel)
+    sql = (
+        "SELECT r.stage, r.baseline_config, r.treated_config, r.date_min, r.date_max, d.metric, d.channel,"
+        " d.freq_hz, d.band_lo_hz, d.band_hi_hz, d.baseline_value, d.treated_value, d.delta, d.delta_percent,"
+        " d.ci_low, d.ci_high, d.p_value, d.units, r.script, r.primary_output"
+        " FROM deltas d JOIN results r ON r.id = d.result_id"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + " ORDER BY r.date_min, r.treated_config, d.freq_hz LIMIT ?"
+    )
+    cur = con.execute(sql, args + [limit])
+    return [c[0] for c in cur.description], cur.fetchall()
+
+
+def summary(con: sqlite3.Connection) -> List[str]:
+    lines = []
+    for table in ("results", "result_runs", "peaks", "deltas"):
+        (n,) = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+        lines.append(f"{table:12s} {n:>10d} rows")
+    for stage, cfg, n, d0, d1 in con.execute(
+        "SELECT stage, treated_config, COUNT(*), MIN(date_min), MAX(date_max) FROM results"
+        " GROUP BY stage, treated_config ORDER BY stage, treated_config"
+    ):
+        lines.append(f"  {stage or '-':10s} {cfg or '-':14s} {n:>6d} results  {d0 or '-'}..{d1 or '-'}")
+    return lines
+
+
+def _print_rows(columns: Sequence[str], rows: Sequence[tuple], out_csv: str = "") -> None:
+    if out_csv:
+        import csv
+
+        with open(out_csv, "w", newline="", encoding="utf-8") as fh:
+            w = csv.writer(fh)
+            w.writerow(columns)
+            w.writerows(rows)
+        return
+    print(",".join(columns))
+    for row in rows:
+        print(",".join("" if v is None else (f"{v:.6g}" if isinstance(v, float) else str(v)) for v in row))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Query the IX-Vibe results index.")
+    ap.add_argument("--index", default="", help=f"Index database (default: ${INDEX_ENV} or {DEFAULT_INDEX})")
+    ap.add_argument("--summary", action="store_true", help="Row counts and results per stage / config")
+    ap.add_argument("--sql", default="", help="Run a read-only SQL query and print the rows")
+    ap.add_argument("--metric", default="", help="Delta metric: peak, band_max, band_rms, zeta, ...")
+    ap.add_argument("--stage", default="", help="Stage (COUPON, PANEL, SUBASSY, ...)")
+    ap.add_argument("--config", default="", help="Treated config (TREATED_A, ...)")
+    ap.add_argument("--freq", type=float, default=None, help="Frequency of interest (Hz)")
+    ap.add_argument("--tol", type=float, default=1.0, help="Frequency tolerance for --freq (Hz)")
+    ap.add_argument("--since", default="", help="Earliest run date (YYYYMMDD)")
+    ap.add_argument("--until", default="", help="Latest run date (YYYYMMDD)")
+    ap.add_argument("--run_id", default="", help="Only results that used this run ID")
+    ap.add_argument("--channel", default="", help="Only this channel (multi-channel results)")
+    ap.add_argument("--limit", type=int, default=1000, help="Maximum rows")
+    ap.add_argument("--out", default="", help="Write the rows to this CSV instead of stdout")
+    args = ap.parse_args(argv)
+
+    path = args.index or index_path() or DEFAULT_INDEX
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Results index not found: {path} (set {INDEX_ENV} or run_campaign.py --index)")
+
+    t0 = time.perf_counter()
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as con:
+        if args.summary:
+            for line in summary(con):
+                print(f"[IX-Vibe] {line}")
+            return
+        if args.sql:
+            cur = con.execute(args.sql)
+            columns, rows = [c[0] for c in cur.description or []], cur.fetchall()
+        else:
+            columns, rows = query_deltas(
+                con,
+                metric=args.metric or None,
+                stage=args.stage or None,
+                config=args.config or None,
+                freq=args.freq,
+                tol=args.tol,
+                since=args.since or None,
+                until=args.until or None,
+                run_id=args.run_id or None,
+                channel=args.channel or None,
+                limit=args.limit,
+            )
+    elapsed_ms = (time.perf_counter() - t0) * 1e3
+    _print_rows(columns, rows, args.out)
+    if args.out:
+        print(f"[IX-Vibe] Wrote query results: {args.out}")
+    print(f"[IX-Vibe] {len(rows)} rows in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+IX-Vibe campaign batch runner (v0.1)
+
+Purpose:
+- Scan tests/runs/<RUN_ID>/metadata.yml for a whole campaign
+- Group raw files by stage / config / acquisition type (FRF, SRS, ACOUSTIC)
+- Build every BASELINE vs TREATED_* comparison within a stage
+- Run the FRF / SRS / acoustic plots and FRF delta summaries across a process pool
+- Write one manifest (JSON) listing every job, its inputs, outputs, status and timing
+- Incremental: skip jobs whose outputs exist and whose inputs, parameters and code are
+  unchanged since the last successful build
+
+Raw file lookup:
+- `raw_data_files[].filename` is used as-is if it exists, otherwise it is looked up
+  under the run directory and then under --data_dir.
+
+Usage example:
+python scripts/run_campaign.py --runs_dir tests/runs --data_dir data/raw --workers 8
+
+Incremental builds:
+- The build state (default results/output/campaign_state.json) records, per job, the
+  SHA-1 of every input file, of the job's argv (prominence, bands, grid settings, ...)
+  and of the scripts that produce it.
+- The scripts are each job's entry script plus every local module it imports (found by
+  parsing the imports), so editing e.g. instrument.py or spectrum_cache.py rebuilds too.
+- --perf is part of the parameters: turning it on rebuilds once to write the sidecars.
+- A job is rebuilt when any of those changed or an output is missing; --dry_run lists
+  what would be rebuilt and why; --force rebuilds everything.
+- File hashes are reused while a file's size and mtime are unchanged.
+
+Results index:
+- --index (default results/output/results_index.sqlite) sets IXVIBE_INDEX for the jobs, so
+  every rebuilt job records its peaks / deltas there (query with results_index.py);
+  --index "" disables it. Jobs skipped as up to date are not re-recorded; use --force
+  once to backfill an index for an existing campaign.
+
+Notes:
+- Runs with missing metadata fields or missing raw files are reported and skipped,
+  never silently merged into a comparison.
+- FRF delta summaries pair baseline and treated runs in run-ID order (01 vs 01, ...).
+- --compare adds one compare_configs.py job per stage and acquisition type with two or
+  more treatment configurations: the baseline is loaded once for all of them, and one
+  overlay plot plus peak / band / ranking tables cover every configuration.
+"""
+
+from __future__ import annotations
+
+import os
+
+os.environ.setdefault("MPLBACKEND", "Agg")  # workers never need a display
+
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import yaml
+
+from common_io import ensure_dir
+from instrument import PERF_ENV
+from results_index import INDEX_ENV
+
+BASELINE_CONFIG = "BASELINE"
+ACQ_TYPES = ("FRF", "SRS", "ACOUSTIC")
+
+# Entry script of each job kind; the build fingerprint covers it and every local module it
+# imports, directly or indirectly (job_sources).
+JOB_SCRIPTS = {
+    "frf": "plot_frf.py",
+    "srs": "plot_srs.py",
+    "acoustic": "plot_acoustic.py",
+    "deltas": "summarize_deltas.py",
+    "compare": "compare_configs.py",
+}
+
+
+def job_sources(kind: str, scripts_dir: Optional[str] = None) -> List[str]:
+    """The job kind's entry script plus the transitive closure of its imports from scripts_dir."""
+    here = scripts_dir or os.path.dirname(os.path.abspath(__file__))
+    todo, seen = [JOB_SCRIPTS[kind]], set()
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(os.path.join(here, name), "r", encoding="utf-8") as fh:
+            tree = ast.parse(fh.read(), filename=name)
+        for node in ast.walk(tree):  # function-level (lazy) imports count too
+            if isinstance(node, ast.Import):
+                modules = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                modules = [node.module]
+            else:
+                continue
+            todo += [f"{m}.py" for m in modules if os.path.isfile(os.path.join(here, f"{m}.py"))]
+    return sorted(seen)
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    run_id: str
+    stage: str
+    config: str
+    files: Dict[str, List[str]]  # acquisition type -> raw files
+
+
+@dataclass(frozen=True)
+class Job:
+    kind: str  # frf | srs | acoustic | deltas | compare
+    stage: str
+    config: str
+    argv: List[str]
+    inputs: List[str]
+    outputs: List[str]
+    run_ids: List[str] = field(default_factory=list)
+
+
+def _resolve_raw(filename: str, run_dir: str, data_dir: str) -> Optional[str]:
+    for cand in (filename, os.path.join(run_dir, filename), os.path.join(data_dir, filename)):
+        if os.path.isfile(cand):
+            return cand
+    return None
+
+
+def scan_runs(runs_dir: str, data_dir: str) -> Tuple[List[RunRecord], List[str]]:
+    """Parse every <runs_dir>/*/metadata.yml. Returns (runs, problems)."""
+    runs: List[RunRecord] = []
+    problems: List[str] = []
+    for meta_path in sorted(glob.glob(os.path.join(runs_dir, "*", "metadata.yml"))):
+        run_dir = os.path.dirname(meta_path)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as fh:
+                meta = yaml.safe_load(fh) or {}
+        except yaml.YAMLError as exc:
+            problems.append(f"{meta_path}: unreadable YAML ({exc})")
+            continue
+
+        run_id = str(meta.get("run_id") or os.path.basename(run_dir)).strip()
+        stage = str(meta.get("stage") or "").strip().upper()
+        config = str(meta.get("config") or "").strip().upper()
+        if not stage or not config:
+            problems.append(f"{meta_path}: missing stage/config")
+            continue
+
+        files: Dict[str, List[str]] = defaultdict(list)
+        for entry in meta.get("raw_data_files") or []:
+            name = str((entry or {}).get("filename") or "").strip()
+            acq = str((entry or {}).get("type") or "").strip().upper()
+            if not name or acq not in ACQ_TYPES:
+                continue
+            path = _resolve_raw(name, run_dir, data_dir)
+            if path is None:
+                problems.append(f"{run_id}: raw file not found: {name}")
+                continue
+            files[acq].append(path)
+
+        runs.append(RunRecord(run_id=run_id, stage=stage, config=config, files=dict(files)))
+    return runs, problems
+
+
+def build_jobs(runs: Sequence[RunRecord], plots_dir: str, out_dir: str, compare: bool = False) -> List[Job]:
+    """
+    Every BASELINE vs treated comparison per stage and acquisition type; with compare, also
+    one all-configurations comparison (compare_configs.py) wherever a stage has 2+ treatments.
+    """
+    grouped: Dict[Tuple[str, str], Dict[str, List[Tuple[str, str]]]] = defaultdict(lambda: defaultdict(list))
+    for run in runs:
+        for acq, paths in run.files.items():
+            for p in paths:
+                grouped[(run.stage, acq)][run.config].append((run.run_id, p))
+
+    jobs: List[Job] = []
+    for (stage, acq), by_config in sorted(grouped.items()):
+        base = sorted(by_config.get(BASELINE_CONFIG, []))
+        if not base:
+            continue
+        for config, treated in sorted(by_config.items()):
+            if config == BASELINE_CONFIG:
+                continue
+            treated = sorted(treated)
+            b_ids, b_files = [r for r, _ in base], [f for _, f in base]
+            t_ids, t_files = [r for r, _ in treated], [f for _, f in treated]
+            tag = f"{stage.lower()}_{config.lower()}"
+            common = [
+                "--baseline", ",".join(b_files),
+                "--treated", ",".join(t_files),
+                "--run_ids_baseline", ",".join(b_ids),
+                "--run_ids_treated", ",".join(t_ids),
+                "--outdir", plots_dir,
+            ]
+            title = f"{stage} {BASELINE_CONFIG} vs {config}"
+            inputs = b_files + t_files
+            run_ids = b_ids + t_ids
+
+            if acq == "FRF":
+                png = f"frf_{tag}_vs_baseline.png"
+                peaks = os.path.join(out_dir, f"frf_{tag}_peaks.csv")
+                argv = common + ["--title", f"IX-Vibe FRF: {title}", "--outfile", png, "--peaks_outfile", peaks]
+                jobs.append(Job("frf", stage, config, argv, inputs, [os.path.join(plots_dir, png), peaks], run_ids))
+                for i, ((b_id, b_f), (t_id, t_f)) in enumerate(zip(base, treated), start=1):
+                    out = os.path.join(out_dir, f"frf_{tag}_delta_{i:02d}.csv")
+                    argv = ["--baseline", b_f, "--treated", t_f, "--out", out]
+                    jobs.append(Job("deltas", stage, config, argv, [b_f, t_f], [out], [b_id, t_id]))
+            elif acq == "SRS":
+                png = f"srs_{tag}_vs_baseline.png"
+                bands = os.path.join(out_dir, f"srs_{tag}_band_deltas.csv")
+                argv = common + ["--title", f"IX-Vibe SRS: {title}", "--outfile", png, "--bands_outfile", bands]
+                jobs.append(Job("srs", stage, config, argv, inputs, [os.path.join(plots_dir, png), bands], run_ids))
+            elif acq == "ACOUSTIC":
+                png = f"acoustic_{tag}_vs_baseline.png"
+                argv = common + ["--title", f"IX-Vibe Acoustic: {title}", "--outfile", png]
+                jobs.append(Job("acoustic", stage, config, argv, inputs, [os.path.join(plots_dir, png)], run_ids))
+
+        treatments = sorted(c for c in by_config if c != BASELINE_CONFIG)
+        if compare and len(treatments) >= 2:
+            tag = f"{acq.lower()}_{stage.lower()}"
+            outputs = [
+                os.path.join(plots_dir, f"{tag}_all_configs.png"),
+                os.path.join(out_dir, f"{tag}_config_peaks.csv"),
+                os.path.join(out_dir, f"{tag}_config_bands.csv"),
+                os.path.join(out_dir, f"{tag}_config_ranking.csv"),
+            ]
+            argv = [
+                "--kind", acq.lower(),
+                "--baseline", ",".join(f for _, f in base),
+                "--run_ids_baseline", ",".join(r for r, _ in base),
+                "--title", f"IX-Vibe {acq}: {stage} {BASELINE_CONFIG} vs {len(treatments)} configurations",
+                "--outdir", plots_dir,
+                "--outfile", os.path.basename(outputs[0]),
+                "--peaks_out", outputs[1],
+                "--bands_out", outputs[2],
+                "--ranking_out", outputs[3],
+            ]
+            inputs = [f for _, f in base]
+            run_ids = [r for r, _ in base]
+            for config in treatments:
+                treated = sorted(by_config[config])
+                argv += ["--treated", f"{config}=" + ",".join(f for _, f in treated)]
+                inputs += [f for _, f in treated]
+                run_ids += [r for r, _ in treated]
+            jobs.append(Job("compare", stage, "ALL", argv, inputs, outputs, run_ids))
+    return jobs
+
+
+def _sha1_file(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class BuildState:
+    """Per-job fingerprints from the last successful build (JSON on disk)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, dict] = {}
+        self.jobs: Dict[str, Dict[str, str]] = {}
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as fh:
+                doc = json.load(fh)
+            self.files = doc.get("files", {})
+            self.jobs = doc.get("jobs", {})
+        self._code: Dict[str, str] = {}
+
+    def file_hash(self, path: str) -> str:
+        """Content hash, reused while size and mtime are unchanged."""
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        known = self.files.get(key)
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            return known["sha1"]
+        digest = _sha1_file(path)
+        self.files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": digest}
+        return digest
+
+    def code_hash(self, kind: str) -> str:
+        if kind not in self._code:
+            here = os.path.dirname(os.path.abspath(__file__))
+            h = hashlib.sha1()
+            for name in job_sources(kind, here):
+                h.update(name.encode())
+                h.update(_sha1_file(os.path.join(here, name)).encode())
+            self._code[kind] = h.hexdigest()
+        return self._code[kind]
+
+    def fingerprint(self, job: Job) -> Dict[str, str]:
+        inputs = hashlib.sha1()
+        for p in job.inputs:
+            inputs.update(f"{p}={self.file_hash(p)}\n".encode())
+        # --perf adds sidecar outputs, so it is a build parameter like the job's argv
+        perf = os.environ.get(PERF_ENV, "") in ("1", "true", "yes")
+        params = hashlib.sha1(json.dumps([job.kind, job.argv, *(["perf"] if perf else [])]).encode()).hexdigest()
+        return {"inputs": inputs.hexdigest(), "params": params, "code": self.code_hash(job.kind)}
+
+    def stale_reasons(self, job: Job, fp: Dict[str, str]) -> List[str]:
+        """Why a job must be rebuilt (empty list: up to date)."""
+        old = self.jobs.get(_job_key(job))
+        if old is None:
+            return ["new"]
+        reasons = [part for part in ("inputs", "params", "code") if old.get(part) != fp[part]]
+        if any(not os.path.exists(o) for o in job.outputs):
+            reasons.append("missing output")
+        return reasons
+
+    def record(self, job: Job, fp: Dict[str, str]) -> None:
+        self.jobs[_job_key(job)] = fp
+
+    def save(self) -> None:
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"files": self.files, "jobs": self.jobs}, fh, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def _job_key(job: Job) -> str:
+    return "|".join(job.outputs)
+
+
+def _run_job(job: Job) -> dict:
+    """Worker entry point: run one script's main() in-process and time it."""
+    import contextlib
+    import io
+
+    if job.kind == "frf":
+        from plot_frf import main as entry
+    elif job.kind == "srs":
+        from plot_srs import main as entry
+    elif job.kind == "acoustic":
+        from plot_acoustic import main as entry
+    elif job.kind == "deltas":
+        from summarize_deltas import main as entry
+    elif job.kind == "compare":
+        from compare_configs import main as entry
+    else:
+        raise ValueError(f"Unknown job kind: {job.kind}")
+
+    record = asdict(job)
+    t0 = time.perf_counter()
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            entry(job.argv)
+        record["status"] = "ok"
+    except Exception as exc:  # one bad comparison must not stop the campaign
+        record["status"] = "error"
+        record["error"] = f"{type(exc).__name__}: {exc}"
+        record["traceback"] = traceback.format_exc()
+    record["seconds"] = time.perf_counter() - t0
+    record["log"] = buf.getvalue().strip().splitlines()
+    return record
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Run every baseline-vs-treated comparison in a campaign.")
+    ap.add_argument("--runs_dir", default="tests/runs", help="Directory of <RUN_ID>/metadata.yml folders")
+    ap.add_argument("--data_dir", default="data/raw", help="Fallback directory for raw data files")
+    ap.add_argument("--plots_dir", default="results/plots", help="Output directory for plots")
+    ap.add_argument("--out_dir", default="results/output", help="Output directory for tables")
+    ap.add_argument("--manifest", default="results/output/campaign_manifest.json", help="Manifest JSON path")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    ap.add_argument("--dry_run", action="store_true", help="List what would be rebuilt (and why) without running")
+    ap.add_argument("--perf", action="store_true", help="Write a per-stage .perf.json sidecar next to every plot")
+    ap.add_argument("--state", default="results/output/campaign_state.json", help="Incremental build state JSON")
+    ap.add_argument("--force", action="store_true", help="Rebuild every job, ignoring the build state")
+    ap.add_argument(
+        "--compare", action="store_true", help="Also compare all treatment configurations of a stage in one job"
+    )
+    ap.add_argument(
+        "--index", default="results/output/results_index.sqlite", help='Results index (SQLite) to record into ("" = off)'
+    )
+    args = ap.parse_args(argv)
+    if args.perf:
+        os.environ[PERF_ENV] = "1"  # inherited by the worker processes
+    if args.index:
+        os.environ[INDEX_ENV] = args.index
+
+    runs, problems = scan_runs(args.runs_dir, args.data_dir)
+    for p in problems:
+        print(f"[IX-Vibe] Warning: {p}")
+    jobs = build_jobs(runs, args.plots_dir, args.out_dir, compare=args.compare)
+
+    state = BuildState(args.state)
+    fingerprints = [state.fingerprint(job) for job in jobs]
+    reasons = [["forced"] if args.force else state.stale_reasons(job, fp) for job, fp in zip(jobs, fingerprints)]
+    todo = [i for i, r in enumerate(reasons) if r]
+    print(f"[IX-Vibe] {len(runs)} runs, {len(jobs)} jobs, {len(todo)} to build, {len(jobs) - len(todo)} up to date")
+
+    if args.dry_run:
+        for job, why in zip(jobs, reasons):
+            status = f"build ({', '.join(why)})" if why else "up to date"
+            print(f"[IX-Vibe] {job.kind:8s} {job.stage} {job.config}: {status}: {', '.join(job.outputs)}")
+        return
+
+    ensure_dir(args.plots_dir)
+    ensure_dir(args.out_dir)
+    ensure_dir(os.path.dirname(args.manifest) or ".")
+    ensure_dir(os.path.dirname(args.state) or ".")
+
+    t0 = time.perf_counter()
+    todo_jobs = [jobs[i] for i in todo]
+    if args.workers <= 1 or len(todo_jobs) <= 1:
+        built = [_run_job(job) for job in todo_jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            built = list(pool.map(_run_job, todo_jobs))
+    wall = time.perf_counter() - t0
+
+    by_index = dict(zip(todo, built))
+    records = []
+    for i, job in enumerate(jobs):
+        record = by_index.get(i)
+        if record is None:
+            record = {**asdict(job), "status": "up_to_date", "seconds": 0.0, "log": []}
+        elif record["status"] == "ok":
+            state.record(job, fingerprints[i])
+        records.append(record)
+    state.save()
+
+    manifest = {
+        "runs_dir": args.runs_dir,
+        "run_ids": [r.run_id for r in runs],
+        "workers": args.workers,
+        "wall_seconds": wall,
+        "job_seconds_total": sum(r["seconds"] for r in records),
+        "problems": problems,
+        "jobs": records,
+    }
+    with open(args.manifest, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    failed = [r for r in records if r["status"] == "error"]
+    for r in failed:
+        print(f"[IX-Vibe] FAILED {r['kind']} {r['stage']} {r['config']}: {r['error']}")
+    print(
+        f"[IX-Vibe] Wrote manifest: {args.manifest} "
+        f"({len(built) - len(failed)} built, {len(jobs) - len(built)} up to date, {len(failed)} failed, {wall:.1f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
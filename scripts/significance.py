@@ -0,0 +1,356 @@
+"""
+IX-Vibe delta significance (v0.1)
+
+Purpose:
+- R7 asks for >= 3 repeats per configuration; a point delta between two mean curves
+  says nothing about whether the change is larger than run-to-run scatter.
+- Put a bootstrap confidence interval and a permutation p-value on every baseline-vs-
+  treated delta: peak levels (dB), delta-zeta per mode and band levels.
+
+Inputs:
+- All baseline and all treated repeats (spectrum CSVs), resampled to one common grid.
+
+Metrics (one column per peak / mode / band, one row per run):
+- peak:       level at each dominant peak of the baseline mean curve
+- zeta:       half-power damping of each run's peak within --match_tol of that mode
+- band_max:   band peak level for --bands (user bands or octave, 1/3, 1/6, 1/12)
+
+Method:
+- delta = mean(treated runs) - mean(baseline runs), per metric column.
+- Bootstrap: each resample draws runs with replacement within each configuration. A
+  resample is a row of multinomial run counts, so all resample means are one matrix
+  product counts @ values; no Python loop over resamples. CI = percentile interval.
+- Permutation: run labels are shuffled across the pooled runs (all splits enumerated
+  exactly when there are at most --n_perm of them, e.g. 20 for 3 vs 3). Each split is a
+  row of +1/n_t, -1/n_b weights, so again one matrix product. Two-sided p-value: the
+  fraction of splits at least as extreme (the observed split is one of them when
+  enumerated; random permutations get the +1 correction), so it is never 0.
+- NaN entries (e.g. a mode with no half-power estimate in one run) are left out of the
+  means: weighted sums of the finite values divided by weighted counts.
+- Metric columns are processed in blocks (--workers threads); the same resamples are
+  used for every column.
+
+Notes:
+- With 3 vs 3 runs the smallest attainable two-sided p-value is 0.1: three repeats can
+  show consistency, not significance at 0.05. That is reported, not hidden.
+
+Usage example:
+python scripts/significance.py --baseline b1.csv,b2.csv,b3.csv --treated t1.csv,t2.csv,t3.csv --bands 1/3
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from aggregate import DEFAULT_MAX_POINTS, common_grid, load_spectra, resample
+from bands import band_stats, parse_bands
+from common_io import ensure_dir, parse_csv_list
+from modal import detect_run_peaks, half_power_damping
+from results_index import index_path, record_result
+
+_BLOCK_COLUMNS = 512
+
+
+@dataclass(frozen=True)
+class DeltaStats:
+    baseline_mean: np.ndarray
+    treated_mean: np.ndarray
+    delta: np.ndarray
+    ci_low: np.ndarray
+    ci_high: np.ndarray
+    p_value: np.ndarray
+    n_baseline: np.ndarray
+    n_treated: np.ndarray
+
+
+def _weighted_means(weights: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """NaN-aware weights @ values / weights @ finite: (n_resamples, n_runs) x (n_runs, k)."""
+    finite = np.isfinite(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (weights @ np.where(finite, values, 0.0)) / (weights @ finite.astype(float))
+
+
+def bootstrap_counts(n_runs: int, n_boot: int, rng: np.random.Generator) -> np.ndarray:
+    """(n_boot, n_runs) multinomial counts: run i is drawn counts[b, i] times in resample b."""
+    return rng.multinomial(n_runs, np.full(n_runs, 1.0 / n_runs), size=n_boot).astype(float)
+
+
+def permutation_masks(n_base: int, n_treat: int, n_perm: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    (n_splits, n_base + n_treat) boolean masks of the runs labelled "treated". All splits
+    when there are at most n_perm of them, otherwise n_perm random ones.
+    """
+    n = n_base + n_treat
+    if math.comb(n, n_treat) <= n_perm:
+        masks = np.zeros((math.comb(n, n_treat), n), dtype=bool)
+        for i, idx in enumerate(itertools.combinations(range(n), n_treat)):
+            masks[i, list(idx)] = True
+        return masks
+    keys = rng.random((n_perm, n))
+    kth = np.partition(keys, n_treat - 1, axis=1)[:, n_treat - 1 : n_treat]
+    return keys <= kth
+
+
+def _delta_block(
+    base: np.ndarray,
+    treat: np.ndarray,
+    boot_b: np.ndarray,
+    boot_t: np.ndarray,
+    perm: np.ndarray,
+    exact: bool,
+    q: Tuple[float, float],
+) -> Tuple[np.ndarray, ...]:
+    n_b = base.shape[0]
+    ones_b = np.ones((1, n_b))
+    ones_t = np.ones((1, treat.shape[0]))
+    mb = _weighted_means(ones_b, base)[0]
+    mt = _weighted_means(ones_t, treat)[0]
+    delta = mt - mb
+
+    boot = _weighted_means(boot_t, treat) - _weighted_means(boot_b, base)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns give NaN bounds
+        lo, hi = np.nanquantile(boot, q, axis=0)
+
+    pooled = np.concatenate([base, treat], axis=0)
+    perm_delta = _weighted_means(perm.astype(float), pooled) - _weighted_means((~perm).astype(float), pooled)
+    with np.errstate(invalid="ignore"):
+        extreme = np.abs(perm_delta) >= np.abs(delta)[None, :] - 1e-12
+    # Exact enumeration includes the observed split; random permutations get the +1.
+    p = extreme.sum(axis=0) / perm.shape[0] if exact else (1.0 + extreme.sum(axis=0)) / (1.0 + perm.shape[0])
+    p = np.where(np.isfinite(delta), p, np.nan)
+    return mb, mt, delta, lo, hi, p
+
+
+def delta_significance(
+    base: np.ndarray,
+    treat: np.ndarray,
+    n_boot: int = 2000,
+    n_perm: int = 2000,
+    ci: float = 0.95,
+    seed: int = 0,
+    workers: int = 1,
+    block_columns: int = _BLOCK_COLUMNS,
+) -> DeltaStats:
+    """
+    Bootstrap CI and permutation p-value of mean(treat) - mean(base) for every column.
+
+    base: (n_baseline_runs, k), treat: (n_treated_runs, k); NaN = missing for that run.
+    """
+    base = np.atleast_2d(np.asarray(base, dtype=float))
+    treat = np.atleast_2d(np.asarray(treat, dtype=float))
+    if base.shape[1] != treat.shape[1]:
+        raise ValueError(f"Baseline has {base.shape[1]} metric columns, treated has {treat.shape[1]}")
+    if base.shape[0] < 2 or treat.shape[0] < 2:
+        raise ValueError("Need at least 2 baseline and 2 treated runs for resampling statistics")
+
+    rng = np.random.default_rng(seed)
+    boot_b = bootstrap_counts(base.shape[0], n_boot, rng)
+    boot_t = bootstrap_counts(treat.shape[0], n_boot, rng)
+    masks = permutation_masks(base.shape[0], treat.shape[0], n_perm, rng)
+    exact = math.comb(base.shape[0] + treat.shape[0], treat.shape[0]) <= n_perm
+    q = ((1.0 - ci) / 2.0, 1.0 - (1.0 - ci) / 2.0)
+
+    k = base.shape[1]
+    blocks = [slice(i, min(i + block_columns, k)) for i in range(0, k, block_columns)]
+
+    def run(sl: slice):
+        return _delta_block(base[:, sl], treat[:, sl], boot_b, boot_t, masks, exact, q)
+
+    if workers > 1 and len(blocks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(run, blocks))
+    else:
+        parts = [run(sl) for sl in blocks]
+
+    if parts:
+        mb, mt, delta, lo, hi, p = (np.concatenate(col) for col in zip(*parts))
+    else:
+        mb = mt = delta = lo = hi = p = np.zeros(0)
+    return DeltaStats(
+        baseline_mean=mb,
+        treated_mean=mt,
+        delta=delta,
+        ci_low=lo,
+        ci_high=hi,
+        p_value=p,
+        n_baseline=np.isfinite(base).sum(axis=0),
+        n_treated=np.isfinite(treat).sum(axis=0),
+    )
+
+
+def run_peak_levels(level_db: np.ndarray, ref_bins: np.ndarray) -> np.ndarray:
+    """(n_runs, n_peaks) level of every run at the reference peak bins."""
+    return np.atleast_2d(level_db)[:, ref_bins]
+
+
+def run_mode_zeta(freq: np.ndarray, level_db: np.ndarray, modes_hz: np.ndarray, rel_tol: float) -> np.ndarray:
+    """
+    (n_runs, n_modes) half-power zeta of each run's highest bin within rel_tol of each mode
+    (the run's own peak, so small frequency shifts between runs do not bias zeta).
+    """
+    level_db = np.atleast_2d(level_db)
+    n_runs = level_db.shape[0]
+    lo = np.searchsorted(freq, modes_hz * (1.0 - rel_tol), side="left")
+    hi = np.maximum(np.searchsorted(freq, modes_hz * (1.0 + rel_tol), side="right"), lo + 1)
+    width = int((hi - lo).max()) if modes_hz.size else 1
+    offs = np.arange(width)
+    idx = np.minimum(lo[:, None] + offs[None, :], freq.size - 1)  # (n_modes, width)
+    inside = offs[None, :] < (hi - lo)[:, None]
+    window = np.where(inside[None, :, :], level_db[:, idx], -np.inf)  # (n_runs, n_modes, width)
+    bins = np.take_along_axis(idx[None, :, :].repeat(n_runs, axis=0), window.argmax(axis=2)[..., None], axis=2)[..., 0]
+
+    run_idx = np.repeat(np.arange(n_runs), modes_hz.size)
+    table = half_power_damping(freq, level_db, run_idx, bins.ravel())
+    return table["zeta_half_power"].to_numpy().reshape(n_runs, modes_hz.size)
+
+
+def significance_table(
+    freq: np.ndarray,
+    level: np.ndarray,
+    n_base: int,
+    units: str,
+    top_n: int = 5,
+    prominence: float = 3.0,
+    match_tol: float = 0.05,
+    bands_spec: str = "",
+    zeta: bool = True,
+    n_boot: int = 2000,
+    n_perm: int = 2000,
+    ci: float = 0.95,
+    seed: int = 0,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """All metrics for runs level (n_runs, n_freq); the first n_base rows are baseline."""
+    base_mean = level[:n_base].mean(axis=0)
+    _, ref_bins = detect_run_peaks(base_mean, prominence, top_n=top_n)
+    ref_bins = np.sort(ref_bins)
+
+    # (metric, band label, freq_hz, values (n_runs, k), units)
+    parts: List[Tuple[str, np.ndarray, np.ndarray, np.ndarray, str]] = []
+    no_band = np.full(ref_bins.size, "", dtype=object)
+    parts.append(("peak", no_band, freq[ref_bins], run_peak_levels(level, ref_bins), units))
+    if zeta and units == "dB" and ref_bins.size:
+        ref = half_power_damping(freq, base_mean, np.zeros(ref_bins.size, dtype=int), ref_bins)
+        modes = ref["fn_hz"].to_numpy()
+        parts.append(("zeta", no_band, modes, run_mode_zeta(freq, level, modes, match_tol), "ratio"))
+    if bands_spec:
+        bands = parse_bands(bands_spec, freq.min(), freq.max())
+        per_run = band_stats(freq, level, bands, stats=("max",))["max"]
+        keep = np.isfinite(per_run).all(axis=0)
+        parts.append(("band_max", np.asarray(bands.labels, dtype=object)[keep], bands.center[keep], per_run[:, keep], units))
+
+    # One resampling pass over every metric column together.
+    values = np.concatenate([p[3] for p in parts], axis=1)
+    stats = delta_significance(values[:n_base], values[n_base:], n_boot, n_perm, ci, seed, workers)
+
+    return pd.DataFrame(
+        {
+            "metric": np.concatenate([np.full(p[3].shape[1], p[0], dtype=object) for p in parts]),
+            "band_hz": np.concatenate([p[1] for p in parts]),
+            "freq_hz": np.concatenate([p[2] for p in parts]),
+            "baseline_mean": stats.baseline_mean,
+            "treated_mean": stats.treated_mean,
+            "delta_treated_minus_baseline": stats.delta,
+            "ci_low": stats.ci_low,
+            "ci_high": stats.ci_high,
+            "p_value": stats.p_value,
+            "n_baseline": stats.n_baseline,
+            "n_treated": stats.n_treated,
+            "units": np.concatenate([np.full(p[3].shape[1], p[4], dtype=object) for p in parts]),
+        }
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Bootstrap CIs and permutation p-values for baseline-vs-treated deltas.")
+    ap.add_argument("--baseline", required=True, help="Comma-separated baseline spectrum CSVs (one per run)")
+    ap.add_argument("--treated", required=True, help="Comma-separated treated spectrum CSVs (one per run)")
+    ap.add_argument("--out", default="results/output/delta_significance.csv", help="Output table")
+    ap.add_argument("--top_n", type=int, default=5, help="Dominant baseline peaks to test")
+    ap.add_argument("--prominence", type=float, default=3.0, help="Peak prominence threshold (dB or data units)")
+    ap.add_argument("--match_tol", type=float, default=0.05, help="Relative frequency window per mode for zeta")
+    ap.add_argument("--bands", default="", help="Optional band metrics: comma bands f1-f2 or octave, 1/3, 1/6, 1/12")
+    ap.add_argument("--no_zeta", action="store_true", help="Skip the delta-zeta metrics (e.g. for SRS / PSD input)")
+    ap.add_argument("--db", action="store_true", help="Input magnitudes are already in dB")
+    ap.add_argument("--n_boot", type=int, default=2000, help="Bootstrap resamples")
+    ap.add_argument("--n_perm", type=int, default=2000, help="Permutations (exact enumeration if fewer splits exist)")
+    ap.add_argument("--ci", type=float, default=0.95, help="Confidence level of the bootstrap interval")
+    ap.add_argument("--alpha", type=float, default=0.05, help="Significance level for the summary line")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed (results are reproducible)")
+    ap.add_argument("--workers", type=int, default=1, help="Threads over metric-column blocks")
+    ap.add_argument("--max_points", type=int, default=DEFAULT_MAX_POINTS, help="Upper bound on common grid size")
+    args = ap.parse_args(argv)
+
+    baseline_files = list(parse_csv_list(args.baseline))
+    treated_files = list(parse_csv_list(args.treated))
+    spectra = load_spectra(baseline_files + treated_files)
+    grid = common_grid(spectra, max_points=args.max_points)
+    values = resample(spectra, grid)
+
+    use_db = args.db or np.nanmin(values) >= 0
+    if args.db:
+        level = values
+    elif use_db:
+        level = 20.0 * np.log10(np.maximum(values, 1e-12))
+    else:
+        level = values
+    units = "dB" if use_db else "linear"
+
+    table = significance_table(
+        grid,
+        level,
+        len(baseline_files),
+        units,
+        top_n=args.top_n,
+        prominence=args.prominence,
+        match_tol=args.match_tol,
+        bands_spec=args.bands,
+        zeta=not args.no_zeta,
+        n_boot=args.n_boot,
+        n_perm=args.n_perm,
+        ci=args.ci,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    table["significant"] = table["p_value"] < args.alpha
+
+    ensure_dir(os.path.dirname(args.out) or ".")
+    table.to_csv(args.out, index=False)
+
+    if index_path():
+        record_result(
+            "significance",
+            args.out,
+            params=argv,
+            baseline_files=baseline_files,
+            treated_files=treated_files,
+            deltas=table.rename(
+                columns={
+                    "baseline_mean": "baseline_value",
+                    "treated_mean": "treated_value",
+                    "delta_treated_minus_baseline": "delta",
+                }
+            ).to_dict("records"),
+        )
+
+    n_sig = int(table["significant"].sum())
+    print(f"[IX-Vibe] Wrote delta significance: {args.out} ({len(table)} metrics, {n_sig} with p < {args.alpha:g})")
+    n_b, n_t = len(baseline_files), len(treated_files)
+    min_p = (2.0 if n_b == n_t else 1.0) / math.comb(n_b + n_t, n_t)
+    if min_p >= args.alpha:
+        print(f"[IX-Vibe] Note: {n_b} vs {n_t} runs cannot reach p < {args.alpha:g} (min p = {min_p:.3g})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+IX-Vibe spectrum cache (v0.1)
+
+Purpose:
+- Avoid re-parsing the same spectrum CSVs every time a plot/summary script runs.
+- read_spectrum_csv consults the cache when one is enabled.
+
+How it works:
+- Key = source path + size + mtime (default) or a SHA-1 of the file bytes (--content_hash),
+  plus the column candidate lists (they change which columns get resolved) and
+  CACHE_VERSION (bumped whenever parsing / column resolution changes, so entries written
+  by an older parser are misses rather than silently reused).
+- Value = the resolved frequency/value arrays saved as a structured .npy, so hits are
+  memory-mapped instead of parsed. Field names keep the original column names.
+- Size-bounded: least-recently-used entries are evicted once the total exceeds max_mb.
+
+Enable for all scripts:
+  export IXVIBE_CACHE_DIR=.ixvibe_cache      (optional: IXVIBE_CACHE_MAX_MB=512)
+
+Warm / inspect / clear:
+python scripts/spectrum_cache.py --warm "data/raw/a.csv,data/raw/b.csv"
+python scripts/spectrum_cache.py --warm_dir data/raw
+python scripts/spectrum_cache.py --stats
+python scripts/spectrum_cache.py --clear
+
+Notes:
+- The cache never changes values; a stale source (size/mtime or content change) is a miss.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import os
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+CACHE_DIR_ENV = "IXVIBE_CACHE_DIR"
+CACHE_MAX_MB_ENV = "IXVIBE_CACHE_MAX_MB"
+CACHE_HASH_ENV = "IXVIBE_CACHE_CONTENT_HASH"
+# Part of every key. Bump when read_spectrum_csv resolves or parses files differently.
+# 2: read_spectrum_csv parses only the resolved columns (numeric-column fallback).
+CACHE_VERSION = 2
+
+
+class SpectrumCache:
+    """On-disk, size-bounded LRU cache of resolved (freq, value) arrays."""
+
+    def __init__(self, cache_dir: str, max_mb: float = 512.0, content_hash: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.content_hash = content_hash
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, path: str, freq_cols: Sequence[str], value_cols: Sequence[str]) -> str:
+        h = hashlib.sha1(f"v{CACHE_VERSION}|".encode())
+        if self.content_hash:
+            with open(path, "rb") as fh:
+                for block in iter(lambda: fh.read(1 << 20), b""):
+                    h.update(block)
+        else:
+            st = os.stat(path)
+            h.update(f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}".encode())
+        h.update(f"|{','.join(freq_cols)}|{','.join(value_cols)}".encode())
+        return h.hexdigest()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[Tuple[str, np.ndarray, str, np.ndarray]]:
+        """Return (freq_col, freq, value_col, value) as memory-mapped views, or None on a miss."""
+        entry = self._entry(key)
+        try:
+            arr = np.load(entry, mmap_mode="r")
+            os.utime(entry)  # mark as recently used
+        except (FileNotFoundError, ValueError, OSError):  # missing, or evicted by another worker
+            return None
+        freq_col, val_col = arr.dtype.names
+        return freq_col, arr[freq_col], val_col, arr[val_col]
+
+    def put(self, key: str, freq_col: str, freq: np.ndarray, val_col: str, val: np.ndarray) -> None:
+        arr = np.empty(len(freq), dtype=[(freq_col, "f8"), (val_col, "f8")])
+        arr[freq_col] = freq
+        arr[val_col] = val
+        entry = self._entry(key)
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.save(fh, arr)
+        os.replace(tmp, entry)  # atomic: concurrent readers never see a partial entry
+        self.evict()
+
+    def _entries(self):
+        paths = glob.glob(os.path.join(self.cache_dir, "*.npy"))
+        stats = []
+        for p in paths:
+            try:
+                st = os.stat(p)
+            except FileNotFoundError:
+                continue
+            stats.append((st.st_mtime, st.st_size, p))
+        return stats
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until the cache fits max_bytes. Returns entries removed."""
+        stats = sorted(self._entries())
+        total = sum(s[1] for s in stats)
+        removed = 0
+        for _, size, p in stats:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> Tuple[int, int]:
+        entries = self._entries()
+        return len(entries), sum(s[1] for s in entries)
+
+    def clear(self) -> int:
+        entries = self._entries()
+        for _, _, p in entries:
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+        return len(entries)
+
+
+def default_cache() -> Optional[SpectrumCache]:
+    """Cache configured through IXVIBE_CACHE_DIR (None when caching is disabled)."""
+    cache_dir = os.environ.get(CACHE_DIR_ENV, "").strip()
+    if not cache_dir:
+        return None
+    max_mb = float(os.environ.get(CACHE_MAX_MB_ENV, "512"))
+    content_hash = os.environ.get(CACHE_HASH_ENV, "").strip().lower() in ("1", "true", "yes")
+    return SpectrumCache(cache_dir, max_mb=max_mb, content_hash=content_hash)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    # Imported here: common_io imports this module.
+    from common_io import parse_csv_list, read_spectrum_csv
+
+    ap = argparse.ArgumentParser(description="Warm, inspect or clear the IX-Vibe spectrum cache.")
+    ap.add_argument("--cache_dir", default=os.environ.get(CACHE_DIR_ENV, ".ixvibe_cache"), help="Cache directory")
+    ap.add_argument("--max_mb", type=float, default=float(os.environ.get(CACHE_MAX_MB_ENV, "512")), help="Size bound")
+    ap.add_argument("--content_hash", action="store_true", help="Key entries by file content instead of size/mtime")
+    ap.add_argument("--warm", default="", help="Comma-separated spectrum CSVs to parse into the cache")
+    ap.add_argument("--warm_dir", default="", help="Directory whose *.csv files (recursive) are parsed into the cache")
+    ap.add_argument("--stats", action="store_true", help="Print entry count and size")
+    ap.add_argument("--clear", action="store_true", help="Remove every cache entry")
+    args = ap.parse_args(argv)
+
+    cache = SpectrumCache(args.cache_dir, max_mb=args.max_mb, content_hash=args.content_hash)
+
+    if args.clear:
+        print(f"[IX-Vibe] Cleared {cache.clear()} cache entries from {args.cache_dir}")
+
+    files = list(parse_csv_list(args.warm)) if args.warm else []
+    if args.warm_dir:
+        files += sorted(glob.glob(os.path.join(args.warm_dir, "**", "*.csv"), recursive=True))
+    warmed = 0
+    for f in files:
+        try:
+            read_spectrum_csv(f, cache=cache)
+            warmed += 1
+        except ValueError as exc:
+            print(f"[IX-Vibe] Skipped {f}: {exc}")
+    if files:
+        print(f"[IX-Vibe] Warmed {warmed}/{len(files)} files into {args.cache_dir}")
+
+    if args.stats or not (args.clear or files):
+        n, size = cache.stats()
+        print(f"[IX-Vibe] Cache {args.cache_dir}: {n} entries, {size / 1e6:.1f} MB (bound {args.max_mb:g} MB)")
+
+
+if __name__ == "__main__":
+    main()
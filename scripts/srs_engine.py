@@ -0,0 +1,251 @@
+"""
+IX-Vibe shock response spectrum engine (v0.1)
+
+Inputs:
+- One or more raw acceleration time-history CSVs (time column + one column per channel)
+
+Output:
+- One SRS CSV per channel (freq_hz, srs, primary, residual) that plot_srs.py reads directly
+
+Method:
+- Absolute-acceleration SRS using the Smallwood ramp-invariant recursive filter.
+- The whole oscillator bank is evaluated for all channels at once. The record is cut into
+  short blocks and each block's response is a matrix product against a precomputed
+  per-oscillator block operator; only the two-sample filter state is carried between blocks.
+- maximax = max |response| over record + free decay; primary = during the record;
+  residual = free decay after the record ends (one period of the lowest oscillator).
+
+Notes:
+- Damping defaults to 5% (Q = 10). Document the value used; SRS is meaningless without it.
+- Units are whatever the input is in (usually g).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from common_io import ensure_dir, parse_csv_list
+from raw_store import read_time_history
+
+# Working-set target per matrix product; keeps each chunk cache-friendly.
+_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SrsResult:
+    fn_hz: np.ndarray  # (n_fn,)
+    maximax: np.ndarray  # (n_channels, n_fn)
+    primary: np.ndarray  # (n_channels, n_fn)
+    residual: np.ndarray  # (n_channels, n_fn)
+    damping: float
+
+
+def natural_frequency_grid(f_min: float, f_max: float, points_per_octave: int = 12) -> np.ndarray:
+    """Log-spaced natural frequencies from f_min to f_max (inclusive) at N points per octave."""
+    if f_min <= 0 or f_max <= f_min:
+        raise ValueError("Natural frequency grid needs 0 < f_min < f_max.")
+    n = int(np.ceil(np.log2(f_max / f_min) * points_per_octave)) + 1
+    return np.geomspace(f_min, f_max, n)
+
+
+def _ramp_invariant_coefficients(fn_hz: np.ndarray, damping: float, fs: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Smallwood ramp-invariant coefficients for absolute acceleration.
+
+    y[n] = a1*y[n-1] + a2*y[n-2] + b0*x[n] + b1*x[n-1] + b2*x[n-2]
+
+    Returns (b, a1, a2) with b of shape (n_fn, 3).
+    """
+    omega = 2.0 * np.pi * fn_hz
+    omega_d = omega * np.sqrt(1.0 - damping**2)
+    e = np.exp(-damping * omega / fs)
+    k = omega_d / fs
+    c = e * np.cos(k)
+    sp = e * np.sin(k) / k
+    b = np.stack([1.0 - sp, 2.0 * (sp - c), e**2 - sp], axis=1)
+    return b, 2.0 * c, -(e**2)
+
+
+def _recursive_response(u: Tuple[np.ndarray, ...], a1: np.ndarray, a2: np.ndarray, n: int) -> np.ndarray:
+    """Run y[k] = a1*y[k-1] + a2*y[k-2] + u[k] from rest, where u holds the first (up to 3) forcing terms."""
+    out = np.zeros((a1.size, n))
+    for k in range(n):
+        acc = u[k] if k < len(u) else 0.0
+        if k >= 1:
+            acc = acc + a1 * out[:, k - 1]
+        if k >= 2:
+            acc = acc + a2 * out[:, k - 2]
+        out[:, k] = acc
+    return out
+
+
+def _block_operators(b: np.ndarray, a1: np.ndarray, a2: np.ndarray, block: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the per-block operators for the whole bank.
+
+    m:      (block + 2, n_fn, block) zero-state response of each block sample to the
+            extended input [x[s-2], x[s-1], x[s], ..., x[s+block-1]]
+    g1, g2: (n_fn, block) response to the carried output state y[s-1] and y[s-2]
+    """
+    n_fn = a1.size
+    b0, b1, b2 = b[:, 0], b[:, 1], b[:, 2]
+
+    # Impulse response of the full filter, and responses to the two carried input samples.
+    h = _recursive_response((b0, b1, b2), a1, a2, block)
+    hx1 = _recursive_response((b1, b2), a1, a2, block)  # from x[s-1]
+    hx2 = _recursive_response((b2,), a1, a2, block)  # from x[s-2]
+
+    m = np.zeros((block + 2, n_fn, block))
+    m[0] = hx2
+    m[1] = hx1
+    for j in range(block):
+        m[j + 2, :, j:] = h[:, : block - j]
+
+    g1 = _recursive_response((a1, a2), a1, a2, block)  # from y[s-1]
+    g2 = _recursive_response((a2,), a1, a2, block)  # from y[s-2]
+    return m, g1, g2
+
+
+def _abs_peak(y: np.ndarray, axis) -> np.ndarray:
+    # max(|y|) without writing an |y| temporary.
+    return np.maximum(y.max(axis=axis), -y.min(axis=axis))
+
+
+def compute_srs(
+    accel: np.ndarray,
+    sample_rate_hz: float,
+    fn_hz: np.ndarray,
+    damping: float = 0.05,
+    block: int = 64,
+) -> SrsResult:
+    """
+    Compute maximax / primary / residual absolute-acceleration SRS.
+
+    accel: (n_samples,) or (n_channels, n_samples)
+    fn_hz: natural frequencies (Hz); should stay below ~fs/10 for an accurate peak estimate
+    """
+    x = np.atleast_2d(np.asarray(accel, dtype=float))
+    fn_hz = np.asarray(fn_hz, dtype=float)
+    fs = float(sample_rate_hz)
+    if x.shape[1] < 2:
+        raise ValueError("Time history must contain at least 2 samples.")
+    if np.any(fn_hz <= 0) or np.any(fn_hz >= fs / 2.0):
+        raise ValueError("Natural frequencies must lie between 0 and the Nyquist frequency.")
+
+    n_ch, n = x.shape
+    n_fn = fn_hz.size
+    b, a1, a2 = _ramp_invariant_coefficients(fn_hz, damping, fs)
+    m, g1, g2 = _block_operators(b, a1, a2, block)
+    m_end = np.ascontiguousarray(m[:, :, block - 2 :]).reshape(block + 2, n_fn * 2)
+    # Per-oscillator operator applied to [extended input block | y[s-1] | y[s-2]].
+    m_aug = np.concatenate([m.transpose(1, 0, 2), g1[:, None, :], g2[:, None, :]], axis=1)
+
+    # Record + free decay long enough to see one full period of the lowest oscillator.
+    n_tail = int(np.ceil(fs / fn_hz.min())) + 2
+    n_blocks = -(-(n + n_tail) // block)
+    xp = np.zeros((n_ch, n_blocks * block + 2))
+    xp[:, 2 : n + 2] = x
+    windows = sliding_window_view(xp, block + 2, axis=1)[:, ::block][:, :n_blocks]  # (n_ch, n_blocks, block+2)
+
+    split_block, split_k = divmod(n, block)
+    prim = np.zeros((n_fn, n_ch))
+    resid = np.zeros((n_fn, n_ch))
+    y1 = np.zeros((n_fn, n_ch))
+    y2 = np.zeros((n_fn, n_ch))
+    g1_last, g1_prev = g1[:, -1, None], g1[:, -2, None]
+    g2_last, g2_prev = g2[:, -1, None], g2[:, -2, None]
+
+    per_chunk = max(1, _CHUNK_BYTES // (n_ch * n_fn * block * 8))
+    for c0 in range(0, n_blocks, per_chunk):
+        c1 = min(n_blocks, c0 + per_chunk)
+        nb = c1 - c0
+        rows = np.ascontiguousarray(windows[:, c0:c1].transpose(1, 0, 2)).reshape(nb * n_ch, block + 2)
+        aug = np.empty((n_fn, nb * n_ch, block + 4))
+        aug[:, :, : block + 2] = rows
+        state = aug[:, :, block + 2 :].reshape(n_fn, nb, n_ch, 2)
+
+        # Carry the output state across blocks using only the last two zero-state samples.
+        z_end = (rows @ m_end).reshape(nb, n_ch, n_fn, 2).transpose(0, 2, 1, 3)
+        for i in range(nb):
+            state[:, i, :, 0] = y1
+            state[:, i, :, 1] = y2
+            y1, y2 = (
+                z_end[i, :, :, 1] + g1_last * y1 + g2_last * y2,
+                z_end[i, :, :, 0] + g1_prev * y1 + g2_prev * y2,
+            )
+
+        y = np.matmul(aug, m_aug).reshape(n_fn, nb, n_ch, block)
+
+        # Split extrema at the end of the record: primary before, residual after.
+        if c1 <= split_block:
+            np.maximum(prim, _abs_peak(y, (1, 3)), out=prim)
+            continue
+        if c0 > split_block:
+            np.maximum(resid, _abs_peak(y, (1, 3)), out=resid)
+            continue
+        i = split_block - c0
+        if i > 0:
+            np.maximum(prim, _abs_peak(y[:, :i], (1, 3)), out=prim)
+        if split_k > 0:
+            np.maximum(prim, _abs_peak(y[:, i, :, :split_k], 2), out=prim)
+        np.maximum(resid, _abs_peak(y[:, i, :, split_k:], 2), out=resid)
+        if i + 1 < nb:
+            np.maximum(resid, _abs_peak(y[:, i + 1 :], (1, 3)), out=resid)
+
+    prim, resid = prim.T, resid.T
+    return SrsResult(
+        fn_hz=fn_hz,
+        maximax=np.maximum(prim, resid),
+        primary=prim,
+        residual=resid,
+        damping=float(damping),
+    )
+
+
+def srs_frame(result: SrsResult, channel: int = 0) -> pd.DataFrame:
+    """One channel of an SrsResult as a spectrum table readable by read_spectrum_csv."""
+    return pd.DataFrame(
+        {
+            "freq_hz": result.fn_hz,
+            "srs": result.maximax[channel],
+            "primary": result.primary[channel],
+            "residual": result.residual[channel],
+        }
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Compute SRS curves from raw acceleration time histories.")
+    ap.add_argument("--inputs", required=True, help="Comma-separated time-history CSV (or .ixraw) files")
+    ap.add_argument("--outdir", default="results/output", help="Output directory for SRS CSVs")
+    ap.add_argument("--sample_rate_hz", type=float, default=None, help="Sample rate if CSVs have no time column")
+    ap.add_argument("--fn_min", type=float, default=10.0, help="Lowest natural frequency (Hz)")
+    ap.add_argument("--fn_max", type=float, default=10000.0, help="Highest natural frequency (Hz)")
+    ap.add_argument("--points_per_octave", type=int, default=12, help="Natural frequencies per octave")
+    ap.add_argument("--damping", type=float, default=0.05, help="Damping ratio (0.05 = Q of 10)")
+    args = ap.parse_args(argv)
+
+    ensure_dir(args.outdir)
+    fn = natural_frequency_grid(args.fn_min, args.fn_max, args.points_per_octave)
+
+    for path in parse_csv_list(args.inputs):
+        fs, channels, data = read_time_history(path, sample_rate_hz=args.sample_rate_hz)
+        result = compute_srs(data, fs, fn[fn < fs / 2.0], damping=args.damping)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        for i, name in enumerate(channels):
+            outpath = os.path.join(args.outdir, f"{stem}_{name}_srs.csv")
+            srs_frame(result, i).to_csv(outpath, index=False)
+            print(f"[IX-Vibe] Wrote SRS: {outpath}")
+
+    print(f"[IX-Vibe] Damping ratio = {args.damping:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,13 +19,14 @@ from __future__ import annotations
 
 import argparse
 import os
-from typing import Tuple
+from typing import Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 from scipy.signal import find_peaks
 
 from common_io import ensure_dir, read_spectrum_csv
+from results_index import index_path, record_result
 
 
 def _to_db(val: np.ndarray) -> Tuple[np.ndarray, bool]:
@@ -54,14 +55,14 @@ def _dominant_peaks(freq: np.ndarray, val: np.ndarray, n: int, prominence: float
     return df.sort_values("peak_value", ascending=False).head(n).reset_index(drop=True)
 
 
-def main() -> None:
+def main(argv: Optional[Sequence[str]] = None) -> None:
     ap = argparse.ArgumentParser(description="Summarize peak deltas between baseline and treated curves.")
     ap.add_argument("--baseline", required=True, help="Baseline CSV")
     ap.add_argument("--treated", required=True, help="Treated CSV")
     ap.add_argument("--out", default="results/output/frf_delta_summary.csv", help="Output CSV summary")
     ap.add_argument("--top_n", type=int, default=5, help="Number of dominant peaks to summarize")
     ap.add_argument("--prominence", type=float, default=0.0, help="Peak prominence threshold (data units)")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     fb, vb, _ = read_spectrum_csv(args.baseline)
     ft, vt, _ = read_spectrum_csv(args.treated)
@@ -111,6 +112,18 @@ def main() -> None:
     ensure_dir(os.path.dirname(args.out))
     out_df.to_csv(args.out, index=False)
 
+    if index_path():
+        record_result(
+            "summarize_deltas",
+            args.out,
+            params=argv,
+            baseline_files=[args.baseline],
+            treated_files=[args.treated],
+            deltas=out_df.rename(
+                columns={"peak_freq_hz": "freq_hz", "delta_treated_minus_baseline": "delta"}
+            ).assign(metric="peak", units=units).to_dict("records"),
+        )
+
     print(f"[IX-Vibe] Wrote delta summary: {args.out}")
     print(f"[IX-Vibe] Units: {units}")
 
@@ -0,0 +1,244 @@
+"""
+IX-Vibe synthetic data generator (v0.1)
+
+Purpose:
+- Realistic stand-in data for demos, smoke tests and benchmarks when no measured data
+  is at hand (data/examples/ ships empty).
+- Every file follows docs/05_Data_Schema_and_Naming.md, so the normal scripts and
+  run_campaign.py consume it unchanged.
+
+What is generated (per run):
+- FRF:      freq_hz, mag, phase_deg    modal superposition + multiplicative noise
+- SHOCK:    time_s, <channels>         decaying modal ring-down per channel + noise floor
+- SRS:      freq_hz, srs               maximax SRS of the SHOCK record (srs_engine.py)
+- ACOUSTIC: freq_hz, value             sloped broadband PSD with modal peaks; Welch-like
+                                       chi-square scatter
+- metadata.yml per run (with --runs_dir) so run_campaign.py can pick the set up
+
+Physics knobs:
+- modes are drawn log-uniformly in [f_min, f_max] once per dataset and jittered per run
+- treated configs multiply the modal damping by --treated_damping_scale (a damping
+  treatment lowers and broadens every peak)
+
+Usage example:
+python scripts/synth_data.py --outdir data/examples --runs_dir tests/runs --runs 3 --modes 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from common_io import ensure_dir, parse_csv_list
+
+
+def random_modes(n_modes: int, f_min: float, f_max: float, rng: np.random.Generator) -> np.ndarray:
+    """Sorted natural frequencies drawn log-uniformly in [f_min, f_max]."""
+    return np.sort(np.exp(rng.uniform(np.log(f_min), np.log(f_max), n_modes)))
+
+
+def modal_frf(freq: np.ndarray, modes_hz: np.ndarray, zeta: np.ndarray, gains: np.ndarray) -> np.ndarray:
+    """Complex modal superposition: sum_k gain_k / (1 - r_k^2 + 2j zeta_k r_k), r_k = f / fn_k."""
+    r = np.asarray(freq, dtype=float)[None, :] / np.asarray(modes_hz, dtype=float)[:, None]
+    h = np.asarray(gains)[:, None] / (1.0 - r**2 + 2j * np.asarray(zeta)[:, None] * r)
+    return h.sum(axis=0)
+
+
+def synth_frf(
+    freq: np.ndarray,
+    modes_hz: np.ndarray,
+    zeta: np.ndarray,
+    gains: np.ndarray,
+    noise: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Measured-looking FRF: modal_frf with complex multiplicative noise of relative size `noise`."""
+    h = modal_frf(freq, modes_hz, zeta, gains)
+    scatter = 1.0 + noise * (rng.standard_normal(freq.size) + 1j * rng.standard_normal(freq.size)) / np.sqrt(2.0)
+    return h * scatter
+
+
+def synth_shock(
+    n_channels: int,
+    n_samples: int,
+    sample_rate_hz: float,
+    modes_hz: np.ndarray,
+    zeta: np.ndarray,
+    noise: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Pyroshock-like acceleration, shape (n_channels, n_samples): the impulse response of
+    each mode (damped sinusoid) with a per-channel participation, plus a noise floor.
+    """
+    t = np.arange(n_samples) / sample_rate_hz
+    x = np.zeros((n_channels, n_samples))
+    for fn, z in zip(modes_hz, zeta):
+        if fn >= sample_rate_hz / 2.0:
+            continue
+        wn = 2.0 * np.pi * fn
+        ring = np.exp(-z * wn * t) * np.sin(wn * np.sqrt(1.0 - z**2) * t)
+        x += rng.uniform(20.0, 200.0, size=(n_channels, 1)) * ring
+    return x + noise * np.abs(x).max() * rng.standard_normal(x.shape)
+
+
+def synth_acoustic_psd(
+    freq: np.ndarray,
+    modes_hz: np.ndarray,
+    zeta: np.ndarray,
+    gains: np.ndarray,
+    rng: np.random.Generator,
+    slope_db_per_octave: float = -3.0,
+    n_averages: int = 32,
+) -> np.ndarray:
+    """Sloped broadband PSD with modal peaks; scatter is that of an n_averages Welch estimate."""
+    f = np.maximum(np.asarray(freq, dtype=float), 1e-3)
+    background = 10.0 ** (slope_db_per_octave * np.log2(f / f[0]) / 10.0)
+    psd = background * (1.0 + np.abs(modal_frf(f, modes_hz, zeta, gains)) ** 2)
+    return psd * rng.gamma(n_averages, 1.0 / n_averages, size=f.size)
+
+
+def _metadata(run_id: str, stage: str, config: str, files: Dict[str, str], fs: float, damping_scale: float) -> dict:
+    return {
+        "run_id": run_id,
+        "stage": stage,
+        "config": config,
+        "operator": "SYNTHETIC",
+        "instrumentation": {"daq": {"make_model": "synth_data.py", "sample_rate_hz": fs}},
+        "treatment": {"applied": damping_scale != 1.0, "description": f"modal damping x{damping_scale:g}"},
+        "raw_data_files": [{"filename": name, "type": acq} for acq, name in files.items()],
+    }
+
+
+def write_campaign(
+    outdir: str,
+    runs_dir: Optional[str] = None,
+    stage: str = "PANEL",
+    configs: Sequence[str] = ("BASELINE", "TREATED_A"),
+    runs: int = 3,
+    date: str = "20260122",
+    kinds: Sequence[str] = ("FRF", "SRS", "ACOUSTIC"),
+    n_modes: int = 6,
+    f_min: float = 20.0,
+    f_max: float = 5000.0,
+    points: int = 4000,
+    damping: float = 0.02,
+    treated_damping_scale: float = 2.0,
+    noise: float = 0.03,
+    channels: int = 2,
+    duration_s: float = 0.5,
+    sample_rate_hz: float = 51200.0,
+    seed: int = 0,
+) -> List[str]:
+    """Write one synthetic campaign. Returns the paths written."""
+    from srs_engine import compute_srs, natural_frequency_grid
+
+    rng = np.random.default_rng(seed)
+    modes = random_modes(n_modes, f_min, f_max, rng)
+    gains = rng.uniform(0.5, 2.0, n_modes)
+    freq = np.linspace(f_min / 2.0, f_max * 1.2, points)
+    fn_srs = natural_frequency_grid(max(f_min / 2.0, 10.0), min(f_max * 2.0, sample_rate_hz / 2.5))
+    ch_names = [f"acc{i + 1}" for i in range(channels)]
+
+    ensure_dir(outdir)
+    written: List[str] = []
+    for config in configs:
+        scale = 1.0 if config == "BASELINE" else treated_damping_scale
+        for run in range(1, runs + 1):
+            run_id = f"{date}_{stage}_{config}_{run:02d}"
+            modes_run = modes * (1.0 + 0.005 * rng.standard_normal(n_modes))
+            zeta = np.full(n_modes, damping * scale)
+            files: Dict[str, str] = {}
+
+            if "FRF" in kinds:
+                h = synth_frf(freq, modes_run, zeta, gains, noise, rng)
+                name = f"{run_id}_FRF_accelsetA.csv"
+                pd.DataFrame({"freq_hz": freq, "mag": np.abs(h), "phase_deg": np.degrees(np.angle(h))}).to_csv(
+                    os.path.join(outdir, name), index=False
+                )
+                files["FRF"] = name
+
+            if "SRS" in kinds:
+                n = int(round(duration_s * sample_rate_hz))
+                x = synth_shock(channels, n, sample_rate_hz, modes_run, zeta, noise, rng)
+                name = f"{run_id}_SHOCK_accelsetA.csv"
+                shock = pd.DataFrame(x.T, columns=ch_names)
+                shock.insert(0, "time_s", np.arange(n) / sample_rate_hz)
+                shock.to_csv(os.path.join(outdir, name), index=False)
+                written.append(os.path.join(outdir, name))
+                srs = compute_srs(x, sample_rate_hz, fn_srs).maximax.max(axis=0)  # envelope over channels
+                name = f"{run_id}_SRS_accelsetA.csv"
+                pd.DataFrame({"freq_hz": fn_srs, "srs": srs}).to_csv(os.path.join(outdir, name), index=False)
+                files["SRS"] = name
+
+            if "ACOUSTIC" in kinds:
+                psd = synth_acoustic_psd(freq, modes_run, zeta, gains, rng)
+                name = f"{run_id}_ACOUSTIC_accelsetA.csv"
+                pd.DataFrame({"freq_hz": freq, "value": psd}).to_csv(os.path.join(outdir, name), index=False)
+                files["ACOUSTIC"] = name
+
+            written.extend(os.path.join(outdir, f) for f in files.values())
+            if runs_dir:
+                import yaml
+
+                run_dir = os.path.join(runs_dir, run_id)
+                ensure_dir(run_dir)
+                meta_path = os.path.join(run_dir, "metadata.yml")
+                with open(meta_path, "w", encoding="utf-8") as fh:
+                    yaml.safe_dump(_metadata(run_id, stage, config, files, sample_rate_hz, scale), fh, sort_keys=False)
+                written.append(meta_path)
+    return written
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Generate a synthetic FRF / shock / SRS / acoustic campaign.")
+    ap.add_argument("--outdir", default="data/examples", help="Directory for the data files")
+    ap.add_argument("--runs_dir", default="", help="Also write <runs_dir>/<RUN_ID>/metadata.yml per run")
+    ap.add_argument("--stage", default="PANEL", help="Stage name used in run IDs")
+    ap.add_argument("--configs", default="BASELINE,TREATED_A", help="Comma-separated configs")
+    ap.add_argument("--runs", type=int, default=3, help="Runs per config")
+    ap.add_argument("--date", default="20260122", help="Date prefix of the run IDs (YYYYMMDD)")
+    ap.add_argument("--kinds", default="FRF,SRS,ACOUSTIC", help="Comma-separated acquisition types to write")
+    ap.add_argument("--modes", type=int, default=6, help="Number of structural modes")
+    ap.add_argument("--f_min", type=float, default=20.0, help="Lowest mode frequency (Hz)")
+    ap.add_argument("--f_max", type=float, default=5000.0, help="Highest mode frequency (Hz)")
+    ap.add_argument("--points", type=int, default=4000, help="Frequency points per FRF / acoustic spectrum")
+    ap.add_argument("--damping", type=float, default=0.02, help="Baseline modal damping ratio")
+    ap.add_argument("--treated_damping_scale", type=float, default=2.0, help="Damping multiplier for treated configs")
+    ap.add_argument("--noise", type=float, default=0.03, help="Relative measurement noise")
+    ap.add_argument("--channels", type=int, default=2, help="Channels per shock record")
+    ap.add_argument("--duration_s", type=float, default=0.5, help="Shock record length (s)")
+    ap.add_argument("--sample_rate_hz", type=float, default=51200.0, help="Shock sample rate (Hz)")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = ap.parse_args(argv)
+
+    kinds = [k.upper() for k in parse_csv_list(args.kinds)]
+    written = write_campaign(
+        args.outdir,
+        runs_dir=args.runs_dir or None,
+        stage=args.stage.upper(),
+        configs=[c.upper() for c in parse_csv_list(args.configs)],
+        runs=args.runs,
+        date=args.date,
+        kinds=kinds,
+        n_modes=args.modes,
+        f_min=args.f_min,
+        f_max=args.f_max,
+        points=args.points,
+        damping=args.damping,
+        treated_damping_scale=args.treated_damping_scale,
+        noise=args.noise,
+        channels=args.channels,
+        duration_s=args.duration_s,
+        sample_rate_hz=args.sample_rate_hz,
+        seed=args.seed,
+    )
+    print(f"[IX-Vibe] Wrote {len(written)} synthetic files under {args.outdir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+IX-Vibe TMD / piezo-shunt tuning sweep (v0.1)
+
+Purpose:
+- Modules B1 (piezo + shunt) and B2 (TMD) are tuned "based on measured baseline FRF peak
+  frequency" (docs/06, docs/07). This predicts how candidate damper settings would reshape
+  the measured baseline FRF before hardware is built, and ranks a large grid of them.
+
+Inputs:
+- Baseline FRF CSVs (freq_hz, mag), one or more runs; the mean magnitude is used.
+- Target mode: --target_hz, or the largest baseline peak of a plot_frf.py peak table
+  (--peaks_table), or else the largest peak of the measured curve.
+
+Method:
+- Modal model of the measured curve: peaks (--prominence dB) give fn and half-power zeta,
+  and each mode's residue is set so the model matches the measured receptance at the peak:
+  H(w) = sum_r A_r / (w_r^2 - w^2 + 2j zeta_r w_r w), A_r = |H(f_r)| * 2 zeta_r w_r^2.
+  Accelerance / mobility inputs are converted to receptance first (--frf_type).
+- TMD (mass ratio mu, tuning f_d / f_r, damper zeta): damper mass m_d = mu / A_r (mu is
+  relative to the target modal mass) with dynamic stiffness
+  K_d = -w^2 m_d (k_d + j w c_d) / (k_d - w^2 m_d + j w c_d), and H_new = H / (1 + K_d H).
+- Piezo shunt (coupling k, electrical tuning delta = w_e / w_r, r = R C_p w_r): the target
+  mode's stiffness becomes w_r^2 (1 + k^2 Z / (1 + Z)), Z = s^2 / w_e^2 + r s / w_r for a
+  resonant RL shunt, Z = r s / w_r for a resistive one.
+- The prediction is the measured magnitude times |H_new / H| of the model, so everything
+  the modal model does not capture (noise floor, unfitted modes) is kept as measured.
+- All candidates of a block are one broadcast (n_candidates, n_freq) array expression;
+  blocks are sized to --block_mb per array and can be spread over --workers processes.
+  Cache-sized blocks (~1 MB) run about twice as fast as 10+ MB ones.
+
+Outputs:
+- CSV (--out): the --top best candidates with their parameters and
+  peak_reduction_db:  measured / predicted maximum inside the target band (dB, > 0 is better)
+  amplification_db:   largest predicted rise over measured outside the band, counted only
+                      where the prediction is within --relevance_db of the target peak
+  new_peak_hz:        frequency of the predicted maximum inside the band
+  feasible:           amplification_db <= --max_amplification_db
+  Ranking is feasible first, then by peak reduction.
+- PNG: measured baseline vs the predicted FRF of the best candidate of each device type.
+
+Notes:
+- A driving-point FRF at the damper location is assumed; for a transfer FRF the result
+  is indicative only. Den Hartog's optimum (f = 1 / (1 + mu),
+  zeta = sqrt(3 mu / (8 (1 + mu)^3))) is printed next to the best TMD as a sanity check.
+- Grid specs are "lo:hi:n" (linear), "lo:hi:n:log" or a comma list of values.
+
+Usage example:
+python scripts/tuning_sweep.py --baseline base_01.csv,base_02.csv \
+  --peaks_table results/output/frf_peaks.csv --device tmd,rl_shunt --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from aggregate import aggregate_spectra, load_spectra
+from common_io import TraceInfo, ensure_dir, parse_csv_list, parse_run_ids, trace_line
+from modal import detect_run_peaks, half_power_damping
+
+DEVICES = ("tmd", "rl_shunt", "r_shunt")
+PARAM_COLUMNS = ("mass_ratio", "tuning_ratio", "damper_zeta", "coupling_k", "shunt_tuning", "shunt_r")
+DEFAULT_ZETA = 0.02
+
+
+@dataclass(frozen=True)
+class ModalModel:
+    fn_hz: np.ndarray
+    zeta: np.ndarray
+    residue: np.ndarray
+    target: int
+
+    def receptance(self, w: np.ndarray) -> np.ndarray:
+        wr = 2.0 * np.pi * self.fn_hz[:, None]
+        terms = self.residue[:, None] / (wr**2 - w**2 + 2j * self.zeta[:, None] * wr * w)
+        return terms.sum(axis=0)
+
+
+def parse_grid(spec: str) -> np.ndarray:
+    """ "lo:hi:n" -> linspace, "lo:hi:n:log" -> geomspace, "a,b,c" -> those values."""
+    if ":" in spec:
+        parts = spec.split(":")
+        if len(parts) not in (3, 4) or (len(parts) == 4 and parts[3] != "log"):
+            raise ValueError(f"Grid spec must be lo:hi:n or lo:hi:n:log, got: {spec}")
+        lo, hi, n = float(parts[0]), float(parts[1]), int(parts[2])
+        return np.geomspace(lo, hi, n) if len(parts) == 4 else np.linspace(lo, hi, n)
+    values = np.array([float(v) for v in parse_csv_list(spec)])
+    if values.size == 0:
+        raise ValueError("Empty grid spec")
+    return values
+
+
+def to_receptance(freq: np.ndarray, mag: np.ndarray, frf_type: str) -> np.ndarray:
+    w = 2.0 * np.pi * freq
+    if frf_type == "receptance":
+        return mag
+    if frf_type == "mobility":
+        return mag / w
+    if frf_type == "accelerance":
+        return mag / w**2
+    raise ValueError(f"Unknown FRF type: {frf_type}")
+
+
+def fit_modal_model(freq: np.ndarray, rec: np.ndarray, prominence_db: float, target_hz: Optional[float]) -> ModalModel:
+    """Modal model from the peaks of a receptance magnitude curve (see module docstring)."""
+    level_db = 20.0 * np.log10(np.maximum(rec, np.finfo(float).tiny))
+    _, bins = detect_run_peaks(level_db, prominence_db)
+    if bins.size == 0:
+        raise ValueError(f"No peaks with prominence >= {prominence_db} dB in the baseline FRF")
+    hp = half_power_damping(freq, level_db, np.zeros(bins.size, dtype=int), bins)
+    fn = hp["fn_hz"].to_numpy()
+    zeta = hp["zeta_half_power"].to_numpy()
+    zeta = np.where(np.isfinite(zeta) & (zeta > 0), zeta, DEFAULT_ZETA)
+    order = np.argsort(fn)
+    fn, zeta = fn[order], zeta[order]
+    peak = 10.0 ** (hp["peak_db"].to_numpy()[order] / 20.0)
+    wr = 2.0 * np.pi * fn
+    residue = peak * 2.0 * zeta * wr**2
+    target = int(np.argmax(peak)) if target_hz is None else int(np.argmin(np.abs(np.log(fn / target_hz))))
+    return ModalModel(fn_hz=fn, zeta=zeta, residue=residue, target=target)
+
+
+def target_from_peaks_table(path: str) -> float:
+    """Frequency of the largest baseline peak in a plot_frf.py peak table."""
+    peaks = pd.read_csv(path)
+    if "config" in peaks:
+        peaks = peaks[peaks["config"] == "baseline"]
+    if peaks.empty:
+        raise ValueError(f"No baseline peaks in {path}")
+    return float(peaks.loc[peaks["peak_value"].idxmax(), "peak_freq_hz"])
+
+
+def candidate_grid(device: str, grids: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Full factorial grid of one device type; unused parameter columns are NaN."""
+    names = {
+        "tmd": ("mass_ratio", "tuning_ratio", "damper_zeta"),
+        "rl_shunt": ("coupling_k", "shunt_tuning", "shunt_r"),
+        "r_shunt": ("coupling_k", "shunt_r"),
+    }[device]
+    mesh = np.meshgrid(*(grids[n] for n in names), indexing="ij")
+    out = pd.DataFrame({n: np.nan for n in PARAM_COLUMNS}, index=range(mesh[0].size))
+    for n, m in zip(names, mesh):
+        out[n] = m.ravel()
+    out.insert(0, "device", device)
+    return out
+
+
+def response_ratio(device: str, params: np.ndarray, model: ModalModel, w: np.ndarray, h: np.ndarray) -> np.ndarray:
+    """
+    |H_new / H| for a block of candidates: (n_candidates, n_freq).
+
+    params: (n_candidates, len(PARAM_COLUMNS)) in PARAM_COLUMNS order
+    h:      (n_freq,) complex receptance of the unmodified model
+    """
+    t = model.target
+    wr = 2.0 * np.pi * model.fn_hz[t]
+    w = w[None, :]
+    if device == "tmd":
+        mu, tune, zd = params[:, 0:1], params[:, 1:2], params[:, 2:3]
+        md = mu / model.residue[t]
+        wd2 = (tune * wr) ** 2
+        # 1 / (1 + K_d H) = (a + jb) / (a + jb - md (wd^2 + jb) w^2 H), with a = wd^2 - w^2 and
+        # b = 2 zeta_d wd w (K_d divided through by md), expanded into real arrays updated in
+        # place: about 40% faster than the complex broadcast.
+        g = w**2 * h
+        a = wd2 - w**2
+        b = (2.0 * zd * tune * wr) * w
+        den_re = wd2 * g.real
+        den_re -= b * g.imag
+        den_re *= md
+        np.subtract(a, den_re, out=den_re)
+        den_im = wd2 * g.imag
+        den_im += b * g.real
+        den_im *= md
+        np.subtract(b, den_im, out=den_im)
+        a *= a
+        a += b * b
+        den_re *= den_re
+        den_re += den_im * den_im
+        np.divide(a, den_re, out=den_re)
+        return np.sqrt(den_re, out=den_re)
+    # Shunted stiffness wr^2 (1 + k^2 Z / (1 + Z)) = wr^2 (1 + k^2) - wr^2 k^2 / (1 + Z); only
+    # that last term depends on both the candidate and the frequency.
+    k2wr2 = params[:, 3:4] ** 2 * wr**2
+    one_plus_z = 1.0 + 1j * (params[:, 5:6] / wr) * w
+    if device == "rl_shunt":
+        one_plus_z -= (w / (params[:, 4:5] * wr)) ** 2
+    base = wr**2 - w**2 + 2j * model.zeta[t] * wr * w
+    shunted = k2wr2 / one_plus_z
+    np.subtract(base + k2wr2, shunted, out=shunted)
+    np.divide(model.residue[t], shunted, out=shunted)
+    shunted += h - model.residue[t] / base
+    return np.abs(shunted) / np.abs(h)
+
+
+def _evaluate_block(
+    device: str,
+    params: np.ndarray,
+    model: ModalModel,
+    w: np.ndarray,
+    h: np.ndarray,
+    meas: np.ndarray,
+    band: np.ndarray,
+    relevance_level: float,
+) -> np.ndarray:
+    """(3, n_candidates): peak_reduction_db, amplification_db, new_peak index into the band."""
+    pred = meas * response_ratio(device, params, model, w, h)
+    in_band = pred[:, band]
+    new_peak = np.argmax(in_band, axis=1)
+    reduction = 20.0 * np.log10(meas[band].max() / in_band[np.arange(in_band.shape[0]), new_peak])
+    out = pred[:, ~band]
+    rise = np.where(out >= relevance_level, out / meas[~band], 0.0)
+    amplification = 20.0 * np.log10(np.maximum(rise.max(axis=1, initial=0.0), np.finfo(float).tiny))
+    return np.vstack([reduction, np.maximum(amplification, 0.0), new_peak])
+
+
+def sweep(
+    candidates: pd.DataFrame,
+    model: ModalModel,
+    freq: np.ndarray,
+    meas: np.ndarray,
+    band: np.ndarray,
+    relevance_level: float,
+    block_mb: float = 1.0,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """Evaluate every candidate; returns candidates with the metric columns added."""
+    w = 2.0 * np.pi * freq
+    h = model.receptance(w)
+    rows = max(1, int(block_mb * 2**20 // (freq.size * 8)))
+    jobs = []
+    for device, group in candidates.groupby("device", sort=False):
+        params = group[list(PARAM_COLUMNS)].to_numpy(dtype=float)
+        for b0 in range(0, len(group), rows):
+            chunk = (device, params[b0 : b0 + rows], model, w, h, meas, band, relevance_level)
+            jobs.append((group.index[b0 : b0 + rows], chunk))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_evaluate_block, *zip(*(args for _, args in jobs))))
+    else:
+        results = [_evaluate_block(*args) for _, args in jobs]
+
+    metrics = np.empty((len(candidates), 3))
+    pos = candidates.index.get_indexer
+    for (idx, _), res in zip(jobs, results):
+        metrics[pos(idx)] = res.T
+    out = candidates.copy()
+    out["peak_reduction_db"] = metrics[:, 0]
+    out["amplification_db"] = metrics[:, 1]
+    out["new_peak_hz"] = freq[band][metrics[:, 2].astype(int)]
+    return out
+
+
+def rank_candidates(results: pd.DataFrame, max_amplification_db: float) -> pd.DataFrame:
+    ranked = results.assign(feasible=results["amplification_db"] <= max_amplification_db)
+    ranked = ranked.sort_values(["feasible", "peak_reduction_db"], ascending=[False, False], kind="stable")
+    ranked.insert(0, "rank", np.arange(1, len(ranked) + 1))
+    return ranked.reset_index(drop=True)
+
+
+def den_hartog(mass_ratio: float) -> Tuple[float, float]:
+    """Optimal tuning ratio and damper zeta for an undamped primary mode."""
+    return 1.0 / (1.0 + mass_ratio), float(np.sqrt(3.0 * mass_ratio / (8.0 * (1.0 + mass_ratio) ** 3)))
+
+
+def _describe(row: pd.Series) -> str:
+    if row["device"] == "tmd":
+        return f"mu={row['mass_ratio']:.3f} f/fr={row['tuning_ratio']:.3f} zeta={row['damper_zeta']:.3f}"
+    text = f"k={row['coupling_k']:.3f} r={row['shunt_r']:.3f}"
+    if row["device"] == "rl_shunt":
+        text += f" delta={row['shunt_tuning']:.3f}"
+    return text
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="IX-Vibe TMD / piezo-shunt tuning sweep against the baseline FRF")
+    ap.add_argument("--baseline", required=True, help="Comma-separated baseline FRF CSV files")
+    ap.add_argument(
+        "--frf_type",
+        default="accelerance",
+        choices=["accelerance", "mobility", "receptance"],
+        help="What the FRF magnitude is",
+    )
+    ap.add_argument("--target_hz", type=float, default=None, help="Target mode frequency (nearest fitted mode is used)")
+    ap.add_argument("--peaks_table", default="", help="plot_frf.py peak table; largest baseline peak is the target")
+    ap.add_argument("--prominence", type=float, default=3.0, help="Peak prominence (dB) for the modal model")
+    ap.add_argument(
+        "--device", default="tmd,rl_shunt,r_shunt", help=f"Comma-separated device types: {', '.join(DEVICES)}"
+    )
+    ap.add_argument("--mass_ratios", default="0.005:0.1:20:log", help="TMD mass ratio grid (relative to modal mass)")
+    ap.add_argument("--tuning_ratios", default="0.75:1.1:71", help="TMD tuning ratio grid f_d / f_r")
+    ap.add_argument("--damper_zetas", default="0.01:0.4:40:log", help="TMD damping ratio grid")
+    ap.add_argument("--coupling", default="0.05,0.1,0.15,0.2", help="Piezo generalized coupling k grid")
+    ap.add_argument("--shunt_tuning", default="0.8:1.2:81", help="RL shunt electrical tuning grid w_e / w_r")
+    ap.add_argument("--shunt_r", default="0.005:2:100:log", help="Shunt resistance grid r = R C_p w_r")
+    ap.add_argument(
+        "--band", type=float, default=0.3, help="Target band half-width as a fraction of the target frequency"
+    )
+    ap.add_argument(
+        "--relevance_db", type=float, default=20.0, help="Ignore amplification more than this far below the target peak"
+    )
+    ap.add_argument(
+        "--max_amplification_db",
+        type=float,
+        default=1.0,
+        help="Feasibility limit on new amplification outside the band",
+    )
+    ap.add_argument("--top", type=int, default=100, help="Rows written to the CSV")
+    ap.add_argument("--block_mb", type=float, default=1.0, help="Size of one (candidates x lines) array per block (MB)")
+    ap.add_argument("--workers", type=int, default=1, help="Processes for the sweep")
+    ap.add_argument("--run_ids_baseline", default="", help="Comma-separated baseline run_ids (traceability)")
+    ap.add_argument("--out", default="results/output/tuning_sweep.csv", help="Ranked candidates CSV")
+    ap.add_argument("--outdir", default="results/plots", help="Output directory for plots")
+    ap.add_argument("--outfile", default="tuning_sweep.png", help="Output plot filename")
+    ap.add_argument("--title", default="Tuning sweep: predicted baseline FRF", help="Plot title")
+    args = ap.parse_args(argv)
+
+    baseline_files = parse_csv_list(args.baseline)
+    if not baseline_files:
+        raise ValueError("No baseline files given")
+    devices = parse_csv_list(args.device)
+    unknown = sorted(set(devices) - set(DEVICES))
+    if unknown:
+        raise ValueError(f"Unknown device types {unknown}; expected some of {list(DEVICES)}")
+
+    agg = aggregate_spectra(load_spectra(baseline_files))
+    freq = agg.freq_hz
+    keep = freq > 0
+    freq, meas = freq[keep], to_receptance(freq[keep], agg.mean[keep], args.frf_type)
+    target_hz = args.target_hz
+    if target_hz is None and args.peaks_table:
+        target_hz = target_from_peaks_table(args.peaks_table)
+    model = fit_modal_model(freq, meas, args.prominence, target_hz)
+    f_t = model.fn_hz[model.target]
+    band = (freq >= f_t * (1.0 - args.band)) & (freq <= f_t * (1.0 + args.band))
+    if not band.any() or band.all():
+        raise ValueError(f"Target band +/-{args.band:.0%} around {f_t:.1f} Hz must contain some, but not all, lines")
+    relevance_level = meas[band].max() * 10.0 ** (-args.relevance_db / 20.0)
+
+    grids = {
+        "mass_ratio": parse_grid(args.mass_ratios),
+        "tuning_ratio": parse_grid(args.tuning_ratios),
+        "damper_zeta": parse_grid(args.damper_zetas),
+        "coupling_k": parse_grid(args.coupling),
+        "shunt_tuning": parse_grid(args.shunt_tuning),
+        "shunt_r": parse_grid(args.shunt_r),
+    }
+    candidates = pd.concat([candidate_grid(d, grids) for d in devices], ignore_index=True)
+    results = sweep(candidates, model, freq, meas, band, relevance_level, block_mb=args.block_mb, workers=args.workers)
+    ranked = rank_candidates(results, args.max_amplification_db)
+
+    ensure_dir(os.path.dirname(args.out) or ".")
+    ensure_dir(args.outdir)
+    ranked.head(args.top).to_csv(args.out, index=False)
+
+    w = 2.0 * np.pi * freq
+    h = model.receptance(w)
+    unit = {"accelerance": w**2, "mobility": w, "receptance": np.ones_like(w)}[args.frf_type]
+    best: List[pd.Series] = [ranked[ranked["device"] == d].iloc[0] for d in devices]
+    notes = (
+        f"target {f_t:.1f} Hz, zeta {model.zeta[model.target]:.4f}, "
+        f"{len(model.fn_hz)} modes, {len(candidates)} candidates"
+    )
+    trace = TraceInfo(run_ids=parse_run_ids(args.run_ids_baseline), raw_files=baseline_files, notes=notes)
+    plt.figure(figsize=(10, 6))
+    plt.plot(freq, meas * unit, color="k", label="Baseline (measured)")
+    for row in best:
+        params = row[list(PARAM_COLUMNS)].to_numpy(dtype=float)[None, :]
+        pred = meas * unit * response_ratio(row["device"], params, model, w, h)[0]
+        plt.plot(freq, pred, label=f"{row['device']}: {_describe(row)} ({row['peak_reduction_db']:+.1f} dB)")
+    plt.axvspan(freq[band][0], freq[band][-1], color="0.9", zorder=0)
+    plt.yscale("log")
+    plt.xlabel("Frequency (Hz)")
+    plt.ylabel(f"{args.frf_type.capitalize()} (units)")
+    plt.title(args.title)
+    plt.legend(fontsize=8)
+    plt.gcf().text(0.01, 0.01, f"BASELINE: {trace_line(trace)}", fontsize=8, va="bottom")
+    outpath = os.path.join(args.outdir, args.outfile)
+    plt.tight_layout(rect=(0, 0.04, 1, 1))
+    plt.savefig(outpath, dpi=200)
+    plt.close()
+
+    print(f"[IX-Vibe] Target mode {f_t:.1f} Hz (zeta {model.zeta[model.target]:.4f}); {len(candidates)} candidates")
+    for row in best:
+        print(
+            f"[IX-Vibe] best {row['device']:8s} {_describe(row)}: peak {row['peak_reduction_db']:+.1f} dB, "
+            f"amplification {row['amplification_db']:.1f} dB, new peak {row['new_peak_hz']:.1f} Hz"
+        )
+        if row["device"] == "tmd":
+            f_opt, z_opt = den_hartog(row["mass_ratio"])
+            print(f"[IX-Vibe]   Den Hartog for mu={row['mass_ratio']:.3f}: f/fr={f_opt:.3f} zeta={z_opt:.3f}")
+    print(f"[IX-Vibe] Wrote candidates: {args.out}")
+    print(f"[IX-Vibe] Wrote plot: {outpath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+IX-Vibe watch-folder ingest daemon (v0.1)
+
+Purpose:
+- During a test day the DAQ keeps dropping captures into data/raw/. Instead of re-running
+  scripts by hand between hits, watch the folder and rebuild only the comparison plots and
+  delta tables whose inputs changed, within seconds of each hit.
+
+Method:
+- One asyncio loop polls --watch_dir every --poll_s (os.scandir; no extra dependency and it
+  works on network shares where inotify does not).
+- A file counts only if its name follows docs/05_Data_Schema_and_Naming.md
+  (YYYYMMDD_<stage>_<config>_<run#>_<FRF|SRS|ACOUSTIC>_<sensor set>.csv / .ixraw) and it
+  is complete: non-empty, with size and mtime unchanged for --settle_s. Partially written
+  files are never read.
+- Runs come from tests/runs/*/metadata.yml where present (as in run_campaign.py) and from
+  the file names otherwise; incomplete files are left out of both.
+- Jobs are built by run_campaign.build_jobs and checked against the same incremental build
+  state (--state), so a new hit only rebuilds the comparisons of its stage / acquisition
+  type (and the FRF delta tables it pairs into); everything else stays up to date.
+- Stale jobs go through a bounded queue (--max_queue) onto a process pool of --workers
+  (default 1) running at lowered priority (--nice), so the acquisition machine keeps its
+  headroom. A job is never queued twice; if its inputs change while it runs it is rebuilt
+  again on the next scan.
+- A failed job is remembered by its fingerprint (inputs, parameters, code) and retried only
+  once that fingerprint changes, e.g. when a corrected capture replaces a malformed one.
+- Zero-byte captures are never read; once they stop changing they no longer hold up --once.
+
+Outputs:
+- The same plots / tables as run_campaign.py (and results index entries with --index).
+- --log: one JSON line per built job (status, seconds, and seconds from the last write
+  to its newest input to the result being written, settle time included).
+
+Usage example:
+python scripts/watch_campaign.py --watch_dir data/raw --runs_dir tests/runs --workers 1
+python scripts/watch_campaign.py --watch_dir data/raw --once    # build what is stale, then exit
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from common_io import ensure_dir
+from instrument import PERF_ENV
+from results_index import INDEX_ENV, parse_run_name
+from run_campaign import ACQ_TYPES, BuildState, Job, RunRecord, _job_key, _run_job, build_jobs, scan_runs
+
+RAW_EXTENSIONS = (".csv", ".ixraw")
+
+
+@dataclass
+class _FileState:
+    size: int
+    mtime_ns: int
+    changed_at: float  # monotonic time the size / mtime last changed
+
+
+class FolderWatch:
+    """Tracks raw files in a folder and reports which are complete (settled)."""
+
+    def __init__(self, folder: str, settle_s: float):
+        self.folder = folder
+        self.settle_s = settle_s
+        self.files: Dict[str, _FileState] = {}
+
+    def poll(self, now: Optional[float] = None) -> bool:
+        """Re-stat the folder. Returns True if any file appeared, changed or vanished."""
+        now = time.monotonic() if now is None else now
+        seen: Dict[str, os.stat_result] = {}
+        try:
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    if is_raw_capture(entry.name) and entry.is_file():
+                        seen[entry.path] = entry.stat()
+        except FileNotFoundError:
+            pass
+        changed = set(self.files) != set(seen)
+        for path, st in seen.items():
+            old = self.files.get(path)
+            if old is None:
+                # already on disk when first seen: its mtime age counts towards settling
+                age = max(0.0, time.time() - st.st_mtime)
+                self.files[path] = _FileState(st.st_size, st.st_mtime_ns, now - age)
+                changed = True
+            elif old.size != st.st_size or old.mtime_ns != st.st_mtime_ns:
+                self.files[path] = _FileState(st.st_size, st.st_mtime_ns, now)
+                changed = True
+        for path in set(self.files) - set(seen):
+            del self.files[path]
+        return changed
+
+    def settled(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Complete files -> monotonic time they settled."""
+        now = time.monotonic() if now is None else now
+        return {
+            p: s.changed_at + self.settle_s
+            for p, s in self.files.items()
+            if s.size > 0 and now - s.changed_at >= self.settle_s
+        }
+
+    def pending(self, now: Optional[float] = None) -> Set[str]:
+        """Files not (yet) usable: still changing, or empty."""
+        return set(self.files) - set(self.settled(now))
+
+    def settling(self, now: Optional[float] = None) -> Set[str]:
+        """Files whose size / mtime changed within the last settle_s (still being written)."""
+        now = time.monotonic() if now is None else now
+        return {p for p, s in self.files.items() if now - s.changed_at < self.settle_s}
+
+
+def is_raw_capture(name: str) -> bool:
+    """File name follows the raw-capture convention for an acquisition type we process."""
+    if name.startswith(".") or not name.lower().endswith(RAW_EXTENSIONS):
+        return False
+    info = parse_run_name(name)
+    return bool(info) and info.get("acq_type") in ACQ_TYPES
+
+
+def runs_from_names(paths: Sequence[str]) -> List[RunRecord]:
+    """RunRecords built from raw-capture file names alone (no metadata.yml)."""
+    by_run: Dict[str, Tuple[str, str, Dict[str, List[str]]]] = {}
+    for p in sorted(paths):
+        info = parse_run_name(p)
+        if not info or info.get("acq_type") not in ACQ_TYPES:
+            continue
+        rid = str(info["run_id"])
+        _, _, files = by_run.setdefault(rid, (str(info["stage"]), str(info["config"]), defaultdict(list)))
+        files[str(info["acq_type"])].append(p)
+    return [RunRecord(run_id=r, stage=s, config=c, files=dict(f)) for r, (s, c, f) in sorted(by_run.items())]
+
+
+def campaign_runs(runs_dir: str, watch: FolderWatch, now: Optional[float] = None) -> Tuple[List[RunRecord], List[str]]:
+    """Metadata runs plus name-only runs from the watch folder, without incomplete files."""
+    pending = {os.path.abspath(p) for p in watch.pending(now)}
+    runs, problems = scan_runs(runs_dir, watch.folder) if runs_dir else ([], [])
+    runs = [
+        RunRecord(
+            run_id=r.run_id,
+            stage=r.stage,
+            config=r.config,
+            files={acq: [p for p in ps if os.path.abspath(p) not in pending] for acq, ps in r.files.items()},
+        )
+        for r in runs
+    ]
+    known = {r.run_id for r in runs}
+    runs += [r for r in runs_from_names(list(watch.settled(now))) if r.run_id not in known]
+    # metadata written before its captures land is expected mid-test; not worth a warning each scan
+    problems = [p for p in problems if "raw file not found" not in p]
+    return runs, problems
+
+
+def _lower_priority(nice: int) -> None:
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+
+
+class Daemon:
+    """Scan -> stale jobs -> bounded queue -> process pool."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.watch = FolderWatch(args.watch_dir, args.settle_s)
+        self.state = BuildState(args.state)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, args.max_queue))
+        self.queued: Set[str] = set()
+        self.running: Set[str] = set()
+        self.failed_fp: Dict[str, Dict[str, str]] = {}  # job key -> fingerprint of its last failed build
+        self.settled_at: Dict[str, float] = {}
+        self.dirty = True
+        self.started = time.monotonic()
+        self.built = 0
+        self.failed = 0
+        self._log = None
+
+    def _scan(self) -> List[Tuple[Job, Dict[str, str], List[str]]]:
+        """Stale jobs (job, fingerprint, reasons) not already queued or running."""
+        now = time.monotonic()
+        self.settled_at = self.watch.settled(now)
+        runs, problems = campaign_runs(self.args.runs_dir, self.watch, now)
+        for p in problems:
+            print(f"[IX-Vibe] Warning: {p}")
+        stale = []
+        for job in build_jobs(runs, self.args.plots_dir, self.args.out_dir):
+            key = _job_key(job)
+            if key in self.queued or key in self.running:
+                continue
+            fp = self.state.fingerprint(job)
+            if self.failed_fp.get(key) == fp:
+                continue  # failed on exactly these inputs: retry only once something changes
+            why = self.state.stale_reasons(job, fp)
+            if why:
+                stale.append((job, fp, why))
+        return stale
+
+    async def scanner(self, once: bool) -> None:
+        while True:
+            self.watch.poll()
+            # a file settling changes nothing on disk, so compare settled sets rather than polls
+            if set(self.watch.settled()) != set(self.settled_at):
+                self.dirty = True
+            if self.dirty:
+                # inline, not in a thread: the workers save the same BuildState
+                stale = self._scan()
+                self.dirty = False
+                for job, fp, why in stale:
+                    self.queued.add(_job_key(job))
+                    print(f"[IX-Vibe] Queued {job.kind} {job.stage} {job.config} ({', '.join(why)})")
+                    await self.queue.put((job, fp))
+            if once and not self.watch.settling() and not self.queued and not self.running:
+                return
+            await asyncio.sleep(self.args.poll_s)
+
+    async def worker(self, loop: asyncio.AbstractEventLoop, pool: ProcessPoolExecutor) -> None:
+        while True:
+            job, fp = await self.queue.get()
+            key = _job_key(job)
+            self.queued.discard(key)
+            self.running.add(key)
+            try:
+                record = await loop.run_in_executor(pool, _run_job, job)
+            finally:
+                self.running.discard(key)
+                self.queue.task_done()
+            self._finish(job, fp, record)
+            self.dirty = True  # inputs may have changed while it ran
+
+    def _finish(self, job: Job, fp: Dict[str, str], record: dict) -> None:
+        settled = {os.path.abspath(p): t for p, t in self.settled_at.items()}
+        hit = max((settled.get(os.path.abspath(p), 0.0) for p in job.inputs), default=0.0) - self.args.settle_s
+        latency = time.monotonic() - hit if hit > self.started else None
+        if record["status"] == "ok":
+            self.built += 1
+            self.failed_fp.pop(_job_key(job), None)
+            self.state.record(job, fp)
+            self.state.save()
+            lat = f", {latency:.1f} s after the last write" if latency is not None else ""
+            print(
+                f"[IX-Vibe] Built {job.kind} {job.stage} {job.config} in {record['seconds']:.1f} s{lat}: "
+                f"{', '.join(job.outputs)}"
+            )
+        else:
+            self.failed += 1
+            self.failed_fp[_job_key(job)] = fp
+            print(f"[IX-Vibe] FAILED {job.kind} {job.stage} {job.config}: {record.get('error')}")
+        if self._log is not None:
+            entry = {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "kind": job.kind,
+                "stage": job.stage,
+                "config": job.config,
+                "outputs": job.outputs,
+                "status": record["status"],
+                "seconds": record["seconds"],
+                "seconds_since_write": latency,
+                "error": record.get("error"),
+            }
+            self._log.write(json.dumps(entry) + "\n")
+            self._log.flush()
+
+    async def run(self) -> None:
+        args = self.args
+        ensure_dir(args.plots_dir)
+        ensure_dir(args.out_dir)
+        ensure_dir(os.path.dirname(args.state) or ".")
+        if args.log:
+            ensure_dir(os.path.dirname(args.log) or ".")
+            self._log = open(args.log, "a", encoding="utf-8")
+        loop = asyncio.get_running_loop()
+        n = max(1, args.workers)
+        pool = ProcessPoolExecutor(max_workers=n, initializer=_lower_priority, initargs=(args.nice,))
+        workers = [asyncio.create_task(self.worker(loop, pool)) for _ in range(n)]
+        try:
+            await self.scanner(once=args.once)
+            await self.queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            pool.shutdown(wait=True)
+            if self._log is not None:
+                self._log.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(
+        description="Watch a raw-data folder and rebuild affected comparisons as captures land."
+    )
+    ap.add_argument("--watch_dir", default="data/raw", help="Folder the DAQ writes raw captures into")
+    ap.add_argument(
+        "--runs_dir", default="tests/runs", help='Directory of <RUN_ID>/metadata.yml folders ("" = names only)'
+    )
+    ap.add_argument("--plots_dir", default="results/plots", help="Output directory for plots")
+    ap.add_argument("--out_dir", default="results/output", help="Output directory for tables")
+    ap.add_argument("--state", default="results/output/campaign_state.json", help="Incremental build state JSON")
+    ap.add_argument("--workers", type=int, default=1, help="Worker processes")
+    ap.add_argument("--nice", type=int, default=10, help="Priority decrement for the worker processes (POSIX)")
+    ap.add_argument("--max_queue", type=int, default=64, help="Queued jobs before the scanner waits")
+    ap.add_argument("--poll_s", type=float, default=0.5, help="Folder poll interval (s)")
+    ap.add_argument("--settle_s", type=float, default=2.0, help="Size / mtime must be unchanged this long (s)")
+    ap.add_argument("--log", default="results/output/watch_log.jsonl", help='Built-job JSON lines ("" = off)')
+    ap.add_argument(
+        "--perf", action="store_true", help="Write a per-stage .perf.json sidecar next to every plot"
+    )
+    ap.add_argument(
+        "--index",
+        default="results/output/results_index.sqlite",
+        help='Results index (SQLite) to record into ("" = off)',
+    )
+    ap.add_argument("--once", action="store_true", help="Build everything stale once files have settled, then exit")
+    args = ap.parse_args(argv)
+    if args.poll_s <= 0 or args.settle_s < 0:
+        raise ValueError("--poll_s must be > 0 and --settle_s >= 0")
+    if args.perf:
+        os.environ[PERF_ENV] = "1"  # inherited by the worker processes
+    if args.index:
+        os.environ[INDEX_ENV] = args.index
+
+    daemon = Daemon(args)
+    print(
+        f"[IX-Vibe] Watching {args.watch_dir} "
+        f"(poll {args.poll_s:g} s, settle {args.settle_s:g} s, {args.workers} worker(s))"
+    )
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        pass
+    print(f"[IX-Vibe] Watch stopped: {daemon.built} jobs built, {daemon.failed} failed")
+
+
+if __name__ == "__main__":
+    main()
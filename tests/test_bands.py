@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from bands import band_stats, user_bands  # noqa: E402
+
+
+def test_quiet_band_after_loud_band_keeps_precision():
+    n = 1_000_000
+    freq = np.linspace(1.0, 10_000.0, n)
+    values = np.where(freq < 5_000.0, 1e3, 1e-3)  # 120 dB step between the two bands
+    bands = user_bands([(1.0, 5_000.0), (5_000.0, 10_001.0)])
+    got = band_stats(freq, values[None, :], bands, ("rms", "energy"))
+    np.testing.assert_allclose(got["rms"][0], [1e3, 1e-3], rtol=1e-12)
+    quiet = freq >= 5_000.0
+    expected = np.sum(values[quiet] * np.gradient(freq)[quiet])
+    np.testing.assert_allclose(got["energy"][0, 1], expected, rtol=1e-9)
+
+
+def test_max_rms_energy_match_direct_loop():
+    rng = np.random.default_rng(0)
+    freq = np.sort(rng.uniform(10.0, 2_000.0, 5_000))
+    values = rng.lognormal(0.0, 3.0, (3, freq.size))
+    bands = user_bands([(20.0, 100.0), (100.0, 500.0), (400.0, 900.0), (1_990.0, 1_995.0), (2_500.0, 3_000.0)])
+    got = band_stats(freq, values, bands)
+    df = np.gradient(freq)
+    for k, (f1, f2) in enumerate(zip(bands.lower, bands.upper)):
+        m = (freq >= f1) & (freq < f2)
+        if not m.any():
+            assert np.isnan(got["rms"][:, k]).all()
+            continue
+        np.testing.assert_allclose(got["max"][:, k], values[:, m].max(axis=1))
+        np.testing.assert_allclose(got["rms"][:, k], np.sqrt(np.mean(values[:, m] ** 2, axis=1)), rtol=1e-12)
+        np.testing.assert_allclose(got["energy"][:, k], (values[:, m] * df[m]).sum(axis=1), rtol=1e-12)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from health_monitor import FileReplaySource  # noqa: E402
+
+
+def test_replay_longer_than_one_read_chunk(tmp_path):
+    n, fs = 163_840, 10_000.0  # > 65536 rows: the replay crosses read-chunk boundaries
+    t = np.arange(n) / fs
+    x = np.sin(2 * np.pi * 50.0 * t)
+    path = tmp_path / "long.csv"
+    np.savetxt(path, np.column_stack([t, x, -x]), delimiter=",", header="time_s,acc1,acc2", comments="", fmt="%.9g")
+
+    source = FileReplaySource(str(path), block_size=1000)
+    blocks = list(source)
+    data = np.concatenate(blocks, axis=1)
+    assert source.channels == ["acc1", "acc2"]
+    assert data.shape == (2, n)
+    assert all(b.shape[1] <= 1000 for b in blocks)
+    np.testing.assert_allclose(data[0], x, atol=1e-6)
+    np.testing.assert_allclose(data[1], -x, atol=1e-6)
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+IXVIBE = os.path.join(os.path.dirname(__file__), "..", "scripts", "ixvibe.py")
+TARGET_MS = float(os.environ.get("IXVIBE_STARTUP_TARGET_MS", "100"))  # raise on slow CI runners
+REPEAT = 5
+
+
+def _wall(cmd):
+    """Best-of-REPEAT wall time (s) after one warm-up run; the minimum filters scheduler noise."""
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    times = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+@pytest.fixture(scope="module")
+def bare():
+    bare = _wall([sys.executable, "-c", "pass"])
+    if bare * 1e3 > TARGET_MS:
+        pytest.skip(f"bare interpreter startup {bare * 1e3:.0f} ms already exceeds the {TARGET_MS:g} ms budget")
+    return bare
+
+
+@pytest.mark.parametrize("args", [["--help"], ["index", "--help"], ["batch", "--help"]])
+def test_help_overhead_within_target(bare, args):
+    # `index` and `batch` only need the standard library, so their --help must stay lazy too.
+    overhead_ms = (_wall([sys.executable, IXVIBE, *args]) - bare) * 1e3
+    assert overhead_ms <= TARGET_MS, f"ixvibe {' '.join(args)}: {overhead_ms:.1f} ms over bare python"
+
+
+def test_lazy_subcommand_help_imports_only_stdlib():
+    code = "\n".join(
+        [
+            "import runpy, sys",
+            f"sys.path.insert(0, {os.path.dirname(IXVIBE)!r})",
+            "sys.argv = ['ixvibe', 'index', '--help']",
+            "try:",
+            f"    runpy.run_path({IXVIBE!r}, run_name='__main__')",
+            "except SystemExit:",
+            "    pass",
+            "print(' '.join(m for m in ('numpy', 'pandas', 'scipy', 'matplotlib') if m in sys.modules))",
+        ]
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    assert out.stdout.splitlines()[-1] == ""